@@ -0,0 +1,464 @@
+"""Benchmark scans, device history and the panel payload on a synthetic fleet.
+
+Builds N devices with M entities each (battery, LQI and RSSI attributes,
+areas, several integrations and a configurable unavailable/flaky mix)
+behind fake entity, device and area registries, then times each operation
+and measures its peak memory. Runs offline on a bare HomeAssistant core
+object; no configuration or real instance is needed.
+
+Run from the repository root (requires Home Assistant to be importable):
+
+    python benchmarks/fleet.py                      # 1k, 10k and 100k entities
+    python benchmarks/fleet.py --entities 10000 --update-baseline
+    python benchmarks/fleet.py --entities 10000 --check
+
+Timings depend on the machine, so the baseline is not part of the
+repository: record it with --update-baseline on the machine that will run
+the comparison (e.g. on the base branch), then run --check there after the
+change. --check fails (exit code 1) when an operation is slower or uses more
+memory than benchmarks/baseline.json allows, and exits with code 2 when
+there is no baseline yet.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import timedelta
+import gc
+import inspect
+import json
+import logging
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, NamedTuple
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import CoreState, HomeAssistant  # noqa: E402
+from homeassistant.helpers import area_registry as ar  # noqa: E402
+from homeassistant.helpers import device_registry as dr  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.cardio4ha.const import (  # noqa: E402
+    DEFAULT_HISTORY_RETENTION_DAYS,
+    READING_BATTERY,
+    READING_SIGNAL,
+    TIMELINE_BUCKET_DAY,
+)
+from custom_components.cardio4ha.coordinator import Cardio4HACoordinator  # noqa: E402
+from custom_components.cardio4ha.device_history import timeline_edges  # noqa: E402
+from custom_components.cardio4ha.websocket_api import _build_payload  # noqa: E402
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Integrations of the synthetic devices and whether they report LQI or RSSI
+INTEGRATIONS = [("zha", "linkquality"), ("mqtt", "linkquality"), ("shelly", "rssi"), ("esphome", "rssi")]
+
+# Changes below this many seconds are treated as noise by --check
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1.0
+
+
+# --- Fake registries ------------------------------------------------------
+
+
+class FakeEntityEntry(NamedTuple):
+    """The entity registry fields the registry index reads."""
+
+    entity_id: str
+    device_id: str | None
+    platform: str
+    disabled: bool = False
+
+
+class FakeDeviceEntry(NamedTuple):
+    """The device registry fields the registry index reads."""
+
+    id: str
+    name: str
+    name_by_user: str | None
+    area_id: str | None
+    connections: set
+
+
+class FakeAreaEntry(NamedTuple):
+    """The area registry fields the registry index reads."""
+
+    id: str
+    name: str
+
+
+class FakeEntityRegistry:
+    """Dict-backed stand-in for the entity registry."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.entities: dict[str, FakeEntityEntry] = {}
+
+    def async_get(self, entity_id: str) -> FakeEntityEntry | None:
+        """Return an entity entry."""
+        return self.entities.get(entity_id)
+
+
+class FakeDeviceRegistry:
+    """Dict-backed stand-in for the device registry."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.devices: dict[str, FakeDeviceEntry] = {}
+
+    def async_get(self, device_id: str) -> FakeDeviceEntry | None:
+        """Return a device entry."""
+        return self.devices.get(device_id)
+
+
+class FakeAreaRegistry:
+    """Dict-backed stand-in for the area registry."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.areas: dict[str, FakeAreaEntry] = {}
+
+    def async_get_area(self, area_id: str) -> FakeAreaEntry | None:
+        """Return an area entry."""
+        return self.areas.get(area_id)
+
+
+# --- Synthetic fleet ------------------------------------------------------
+
+
+@dataclass
+class Fleet:
+    """A synthetic fleet and the registries that describe it."""
+
+    entities: FakeEntityRegistry
+    devices: FakeDeviceRegistry
+    areas: FakeAreaRegistry
+    # device_id -> [(entity_id, state, attributes)] as first set
+    states: dict[str, list[tuple[str, str, dict[str, Any]]]]
+    flaky: list[str]
+
+    @property
+    def entity_count(self) -> int:
+        """Return the number of entities."""
+        return len(self.entities.entities)
+
+    def patch_registries(self) -> ExitStack:
+        """Return a context manager serving the fake registries to Home Assistant."""
+        stack = ExitStack()
+        stack.enter_context(patch.object(er, "async_get", lambda hass: self.entities))
+        stack.enter_context(patch.object(dr, "async_get", lambda hass: self.devices))
+        stack.enter_context(patch.object(ar, "async_get", lambda hass: self.areas))
+        return stack
+
+
+def build_fleet(
+    entities: int,
+    per_device: int = 4,
+    areas: int = 25,
+    unavailable: float = 0.05,
+    flaky: float = 0.02,
+    seed: int = 1,
+) -> Fleet:
+    """Generate a fleet of about `entities` entities.
+
+    Every device has a battery sensor (with LQI or RSSI depending on its
+    integration) and per_device - 1 other sensors. `unavailable` of the
+    devices are offline, and `flaky` of them get a history of outages.
+    """
+    rng = random.Random(seed)
+    fleet = Fleet(FakeEntityRegistry(), FakeDeviceRegistry(), FakeAreaRegistry(), {}, [])
+    for a in range(areas):
+        fleet.areas.areas[f"area_{a}"] = FakeAreaEntry(f"area_{a}", f"Area {a}")
+
+    for d in range(max(1, entities // per_device)):
+        device_id = f"device_{d:06d}"
+        platform, signal_attr = INTEGRATIONS[d % len(INTEGRATIONS)]
+        area_id = f"area_{rng.randrange(areas)}" if areas and rng.random() < 0.9 else None
+        fleet.devices.devices[device_id] = FakeDeviceEntry(
+            device_id, f"Device {d}", None, area_id, {("mac", f"{d:012x}")}
+        )
+        offline = rng.random() < unavailable
+        if rng.random() < flaky:
+            fleet.flaky.append(device_id)
+
+        states = []
+        for e in range(per_device):
+            kind = "battery" if e == 0 else f"value_{e}"
+            entity_id = f"sensor.bench_{d}_{kind}"
+            fleet.entities.entities[entity_id] = FakeEntityEntry(entity_id, device_id, platform)
+            if offline:
+                states.append((entity_id, "unavailable", {}))
+            elif e == 0:
+                signal = rng.randrange(5, 255) if signal_attr == "linkquality" else rng.randrange(-95, -40)
+                states.append((
+                    entity_id,
+                    str(rng.randrange(1, 101)),
+                    {"device_class": "battery", "unit_of_measurement": "%", signal_attr: signal},
+                ))
+            else:
+                states.append((entity_id, f"{rng.uniform(15, 30):.1f}", {}))
+        fleet.states[device_id] = states
+    return fleet
+
+
+# --- Measurement ----------------------------------------------------------
+
+
+class Result(NamedTuple):
+    """Best time and peak memory of one operation."""
+
+    seconds: float
+    peak_mib: float
+
+
+async def _call(func: Callable[[], Any]) -> Any:
+    """Call a sync or async function."""
+    result = func()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def measure(
+    run: Callable[[], Any | Awaitable[Any]],
+    setup: Callable[[], Any | Awaitable[Any]] | None = None,
+    repeat: int = 3,
+) -> Result:
+    """Return the best of `repeat` timed runs and the peak memory of one more.
+
+    setup runs before every run and is not measured. Memory is traced in a
+    separate run so tracing overhead does not skew the timings.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            await _call(setup)
+        gc.collect()
+        start = time.perf_counter()
+        await _call(run)
+        best = min(best, time.perf_counter() - start)
+
+    if setup is not None:
+        await _call(setup)
+    gc.collect()
+    tracemalloc.start()
+    base, _peak = tracemalloc.get_traced_memory()
+    await _call(run)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(round(best, 4), round((peak - base) / 1048576, 2))
+
+
+# --- Operations -----------------------------------------------------------
+
+
+async def run_fleet(fleet: Fleet, history_hours: int, repeat: int) -> dict[str, Result]:
+    """Run every benchmarked operation against one fleet."""
+    results: dict[str, Result] = {}
+    rng = random.Random(2)
+
+    with tempfile.TemporaryDirectory() as config_dir, fleet.patch_registries():
+        hass = HomeAssistant(config_dir)
+        if hasattr(hass.config, "async_set_time_zone"):
+            await hass.config.async_set_time_zone("UTC")
+        else:
+            hass.config.set_time_zone("UTC")
+        for states in fleet.states.values():
+            for entity_id, state, attributes in states:
+                hass.states.async_set(entity_id, state, attributes)
+        # Scan right away instead of waiting out the startup delay
+        hass.set_state(CoreState.running)
+
+        entry = SimpleNamespace(entry_id="benchmark", data={}, options={})
+        coordinator = Cardio4HACoordinator(hass, entry, timedelta(seconds=60))
+        # Never reach out to GitHub
+        coordinator.update_check_enabled = False
+        await hass.async_block_till_done()
+
+        history = coordinator.device_history
+        device_ids = list(fleet.states)
+        now = time.time()
+        for device_id in device_ids:
+            for h in range(history_hours, 0, -1):
+                history.record_battery_reading(device_id, 100 - h // 24, now - h * 3600)
+                history.record_signal_reading(device_id, -60.0 - h % 20, now - h * 3600)
+        # One outage on every fifth device as background noise, 15 on flaky ones
+        flaky = set(fleet.flaky)
+        for i in range(15, 0, -1):
+            ts = now - i * 86400
+            for n, device_id in enumerate(device_ids):
+                if i <= (15 if device_id in flaky else int(n % 5 == 0)):
+                    history.record_offline_event(device_id, ts)
+                    history.record_online_event(device_id, ts + 1800)
+
+        async def scan() -> None:
+            await coordinator.async_refresh()
+            if not coordinator.last_update_success:
+                raise RuntimeError("scan failed") from coordinator.last_exception
+
+        results["scan_full"] = await measure(scan, coordinator.request_full_scan, repeat)
+        summary = coordinator.data["summary"]
+        print(
+            f"  scan found {summary['unavailable_count']} unavailable, "
+            f"{summary['low_battery_count']} low battery, {summary['weak_signal_count']} weak signal, "
+            f"{summary['flaky_count']} flaky"
+        )
+
+        async def change_states() -> None:
+            # Flip the value of 1% of the entities
+            for entity_id in rng.sample(list(fleet.entities.entities), max(1, fleet.entity_count // 100)):
+                hass.states.async_set(entity_id, f"{rng.uniform(15, 30):.1f}")
+            await hass.async_block_till_done()
+
+        results["scan_incremental"] = await measure(scan, change_states, repeat)
+        results["build_payload"] = await measure(lambda: _build_payload(hass, coordinator), repeat=repeat)
+
+        clock = [now]
+
+        def readings() -> None:
+            # One battery and one signal reading per device, an hour apart per run
+            clock[0] += 3600
+            for device_id in device_ids:
+                history.record_battery_reading(device_id, rng.randrange(1, 101), clock[0])
+                history.record_signal_reading(device_id, -60.0, clock[0])
+
+        results["history_record"] = await measure(readings, repeat=repeat)
+        results["history_record_batch"] = await measure(
+            lambda: history.record_readings(
+                [(READING_BATTERY, d, 50) for d in device_ids]
+                + [(READING_SIGNAL, d, -70.0) for d in device_ids]
+            ),
+            repeat=repeat,
+        )
+
+        def query() -> None:
+            end = dt_util.start_of_local_day() + timedelta(days=1)
+            edges = timeline_edges(end - timedelta(days=30), end, TIMELINE_BUCKET_DAY)
+            history.fleet_timeline(
+                history.snapshot_timelines(device_ids), edges, TIMELINE_BUCKET_DAY, time.time()
+            )
+            for device_id in device_ids:
+                history.predict_battery(device_id)
+                history.get_offline_event_count(device_id)
+
+        results["history_query"] = await measure(query, repeat=repeat)
+
+        def expire() -> None:
+            # Age out readings past the retention period on every device
+            old = time.time() - (DEFAULT_HISTORY_RETENTION_DAYS + 5) * 86400
+            for device_id in device_ids:
+                history.record_offline_event(device_id, old)
+                history.record_online_event(device_id, old + 60)
+
+        results["history_purge"] = await measure(
+            lambda: history.purge_old_data(DEFAULT_HISTORY_RETENTION_DAYS), expire, repeat
+        )
+
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+
+    return results
+
+
+# --- Baseline -------------------------------------------------------------
+
+
+def compare(
+    results: dict[str, dict[str, Result]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    """Return a line for every operation that regressed against the baseline."""
+    regressions = []
+    for size, ops in results.items():
+        for op, result in ops.items():
+            base = baseline.get(size, {}).get(op)
+            if base is None:
+                continue
+            if (
+                result.seconds > base["seconds"] * (1 + time_tolerance)
+                and result.seconds - base["seconds"] > MIN_TIME_DELTA
+            ):
+                regressions.append(
+                    f"{size} {op}: {result.seconds:.4f}s vs baseline {base['seconds']:.4f}s"
+                )
+            if (
+                result.peak_mib > base["peak_mib"] * (1 + memory_tolerance)
+                and result.peak_mib - base["peak_mib"] > MIN_MEMORY_DELTA
+            ):
+                regressions.append(
+                    f"{size} {op}: {result.peak_mib:.2f} MiB vs baseline {base['peak_mib']:.2f} MiB"
+                )
+    return regressions
+
+
+async def async_main(args: argparse.Namespace) -> int:
+    """Run the benchmarks and return the exit code."""
+    results: dict[str, dict[str, Result]] = {}
+    for size in args.entities:
+        fleet = build_fleet(
+            size, args.per_device, args.areas, args.unavailable, args.flaky, args.seed
+        )
+        print(f"entities={fleet.entity_count} devices={len(fleet.states)} flaky={len(fleet.flaky)}")
+        ops = await run_fleet(fleet, args.history_hours, args.repeat)
+        for op, result in ops.items():
+            print(f"  {op:<22} {result.seconds * 1000:10.1f} ms {result.peak_mib:10.2f} MiB")
+        results[str(size)] = ops
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    if args.check and not args.update_baseline and not baseline:
+        print(f"no baseline at {BASELINE_FILE}; record one with --update-baseline first")
+        return 2
+    if args.update_baseline:
+        for size, ops in results.items():
+            baseline[size] = {op: result._asdict() for op, result in ops.items()}
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {BASELINE_FILE}")
+        return 0
+
+    if args.check:
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("no regressions against baseline")
+    return 0
+
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--per-device", type=int, default=4)
+    parser.add_argument("--areas", type=int, default=25)
+    parser.add_argument("--unavailable", type=float, default=0.05)
+    parser.add_argument("--flaky", type=float, default=0.02)
+    parser.add_argument("--history-hours", type=int, default=48)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(async_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare DeviceHistory memory: legacy list-of-dicts vs typed ring buffers.
+
+Run from the repository root (requires Home Assistant to be importable):
+
+    python benchmarks/history_memory.py --devices 2000 --days 30
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.cardio4ha.device_history import (  # noqa: E402
+    EVENT_OFFLINE,
+    EVENT_ONLINE,
+    _DeviceSeries,
+)
+
+
+def build_legacy(devices: int, days: int, events: int) -> dict:
+    """Build the pre-ring-buffer layout: one dict per reading."""
+    now = time.time()
+    hours = days * 24
+    data = {}
+    for d in range(devices):
+        data[f"device_{d}"] = {
+            "events": [
+                {"type": "offline" if i % 2 == 0 else "online", "ts": now - i * 3600.0}
+                for i in range(events)
+            ],
+            "battery_readings": [
+                {"ts": now - h * 3600.0, "level": 100 - h % 100} for h in range(hours)
+            ],
+            "signal_readings": [
+                {"ts": now - h * 3600.0, "value": -60.0 - h % 30} for h in range(hours)
+            ],
+        }
+    return data
+
+
+def build_ring(devices: int, days: int, events: int) -> dict:
+    """Build the ring-buffer layout with the same readings."""
+    now = time.time()
+    hours = days * 24
+    data = {}
+    for d in range(devices):
+        series = _DeviceSeries()
+        for i in range(events - 1, -1, -1):
+            series.events.append(now - i * 3600.0, EVENT_OFFLINE if i % 2 == 0 else EVENT_ONLINE)
+        for h in range(hours - 1, -1, -1):
+            series.battery.append(now - h * 3600.0, 100 - h % 100)
+            series.signal.append(now - h * 3600.0, -60.0 - h % 30)
+        data[f"device_{d}"] = series
+    return data
+
+
+def measure(builder, *args) -> int:
+    """Return the bytes retained by the structure the builder returns."""
+    tracemalloc.start()
+    data = builder(*args)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main() -> None:
+    """Print the retained memory for both layouts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    legacy = measure(build_legacy, args.devices, args.days, args.events)
+    ring = measure(build_ring, args.devices, args.days, args.events)
+
+    print(f"devices={args.devices} days={args.days} events/device={args.events}")
+    print(f"legacy dict layout: {legacy / 1048576:8.1f} MiB")
+    print(f"ring buffer layout: {ring / 1048576:8.1f} MiB")
+    print(f"ratio:              {legacy / ring:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ from .const import (
     SERVICE_CLEAR_IGNORE,
 )
 from .coordinator import Cardio4HACoordinator
+from .persistence import PERSIST_HISTORY, PERSIST_UNAVAILABLE
 from .websocket_api import async_register_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
@@ -71,8 +72,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Setup services
     await _async_setup_services(hass)
 
-    # Setup options update listener
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    # Options changes are applied in place, without reloading the entry
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     _LOGGER.info("Cardio4HA v%s setup complete", CURRENT_VERSION)
     return True
@@ -115,28 +116,28 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         coordinator = hass.data[DOMAIN].pop(entry.entry_id)
-        await coordinator.async_save_unavailable_data()
-        await coordinator.async_save_ignore_data()
-        await coordinator.device_history.async_save()
-
-    # Remove sidebar panel only on true unload (not during reload)
-    if not hass.data.get(DOMAIN) and not hass.data.get(f"{DOMAIN}_reloading"):
+        feed = hass.data.get(f"{DOMAIN}_feeds", {}).pop(entry.entry_id, None)
+        if feed is not None:
+            feed.close()
+        # Flushes every pending write-behind save
+        await coordinator.async_shutdown()
+
+    # Remove sidebar panel once the last entry is unloaded
+    if not hass.data.get(DOMAIN):
         try:
             async_remove_panel(hass, DOMAIN)
         except Exception:
             pass
         hass.data.pop(f"{DOMAIN}_frontend", None)
+        hass.data.pop(f"{DOMAIN}_feeds", None)
 
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry (options changed)."""
-    # Mark as reloading so unload won't remove the sidebar panel
-    hass.data[f"{DOMAIN}_reloading"] = True
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
-    hass.data.pop(f"{DOMAIN}_reloading", None)
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator."""
+    coordinator: Cardio4HACoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_apply_options()
 
 
 def _get_coordinator(hass: HomeAssistant) -> Cardio4HACoordinator | None:
@@ -170,10 +171,9 @@ async def _async_setup_services(hass: HomeAssistant) -> None:
         entity_id = call.data.get("entity_id")
         if entity_id:
             coordinator.unavailable_tracking.pop(entity_id, None)
-            await coordinator.async_save_unavailable_data()
         else:
             coordinator.unavailable_tracking = {}
-            await coordinator.async_save_unavailable_data()
+        coordinator.persistence.mark_dirty(PERSIST_UNAVAILABLE)
 
     async def handle_force_scan(call) -> None:
         coordinator = _get_coordinator(hass)
@@ -190,7 +190,7 @@ async def _async_setup_services(hass: HomeAssistant) -> None:
             coordinator.device_history.clear_device(device_key)
         else:
             coordinator.device_history.clear_all()
-        await coordinator.device_history.async_save()
+        coordinator.persistence.mark_dirty(PERSIST_HISTORY)
 
     async def handle_set_ignore(call) -> None:
         coordinator = _get_coordinator(hass)
@@ -0,0 +1,92 @@
+"""Pure per-entity classification for Cardio4HA scans.
+
+Everything here works on immutable inputs (a State and a RegistryIndexEntry)
+and touches no shared state, so it can run in an executor thread. History
+readings are returned instead of recorded and applied on the event loop.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from homeassistant.core import State
+
+from .const import BATTERY_KEYWORDS, READING_BATTERY, READING_SIGNAL, UNAVAILABLE_STATES
+from .records import EntityRecord
+from .registry_index import RegistryIndexEntry
+
+# (entity_id, state, registry info, device_key) captured on the event loop
+EntitySnapshot = tuple[str, State, RegistryIndexEntry, str]
+# (kind, device_key, value)
+Reading = tuple[str, str, float]
+
+
+def is_battery_entity(entity_id: str, attributes: dict) -> bool:
+    """Check if entity is a battery sensor."""
+    if attributes.get("device_class") == "battery":
+        return True
+    lower_id = entity_id.lower()
+    return any(keyword in lower_id for keyword in BATTERY_KEYWORDS)
+
+
+def classify_state(
+    entity_id: str,
+    state: State,
+    info: RegistryIndexEntry,
+    device_key: str,
+) -> tuple[EntityRecord, list[Reading]]:
+    """Build the classification record of a monitored entity and its readings."""
+    readings: list[Reading] = []
+    record = EntityRecord(
+        entity_id,
+        state.name or entity_id,
+        info.device_id,
+        device_key,
+        info.device_name,
+        info.area_name,
+        info.platform or "unknown",
+        state.state,
+        state.state in UNAVAILABLE_STATES,
+        state.last_updated,
+    )
+
+    # Battery level
+    if is_battery_entity(entity_id, state.attributes):
+        try:
+            battery_level = float(state.state)
+            if 0 <= battery_level <= 100:
+                readings.append((READING_BATTERY, device_key, int(battery_level)))
+                record.battery_level = battery_level
+        except (ValueError, TypeError):
+            pass
+
+    # Signal strength
+    linkquality = state.attributes.get("linkquality")
+    if linkquality is not None:
+        try:
+            record.linkquality = float(linkquality)
+            readings.append((READING_SIGNAL, device_key, record.linkquality))
+        except (ValueError, TypeError):
+            pass
+
+    rssi = state.attributes.get("rssi") or state.attributes.get("wifi_signal")
+    if rssi is not None:
+        try:
+            record.rssi = float(rssi)
+            readings.append((READING_SIGNAL, device_key, record.rssi))
+        except (ValueError, TypeError):
+            pass
+
+    return record, readings
+
+
+def classify_batch(
+    snapshots: Iterable[EntitySnapshot],
+) -> tuple[list[tuple[str, EntityRecord]], list[Reading]]:
+    """Classify snapshots; return ([(entity_id, record)], readings in order)."""
+    results = []
+    readings: list[Reading] = []
+    for entity_id, state, info, device_key in snapshots:
+        record, entity_readings = classify_state(entity_id, state, info, device_key)
+        results.append((entity_id, record))
+        readings.extend(entity_readings)
+    return results, readings
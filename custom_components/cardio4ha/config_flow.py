@@ -15,6 +15,7 @@ import homeassistant.helpers.config_validation as cv
 from .const import (
     DOMAIN,
     CONF_UPDATE_INTERVAL,
+    CONF_ANALYTICS_INTERVAL,
     CONF_BATTERY_CRITICAL,
     CONF_BATTERY_WARNING,
     CONF_BATTERY_LOW,
@@ -27,7 +28,11 @@ from .const import (
     CONF_EXCLUDE_AREAS,
     CONF_MONITOR_ZIGBEE2MQTT,
     CONF_HISTORY_RETENTION_DAYS,
+    CONF_GROUP_SENSORS,
+    CONF_SCAN_SLICE_MS,
+    CONF_CLASSIFY_IN_EXECUTOR,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_ANALYTICS_INTERVAL,
     DEFAULT_BATTERY_CRITICAL,
     DEFAULT_BATTERY_WARNING,
     DEFAULT_BATTERY_LOW,
@@ -40,8 +45,15 @@ from .const import (
     DEFAULT_EXCLUDE_AREAS,
     DEFAULT_MONITOR_ZIGBEE2MQTT,
     DEFAULT_HISTORY_RETENTION_DAYS,
+    DEFAULT_GROUP_SENSORS,
+    DEFAULT_SCAN_SLICE_MS,
+    DEFAULT_CLASSIFY_IN_EXECUTOR,
     MIN_UPDATE_INTERVAL,
     MAX_UPDATE_INTERVAL,
+    MIN_ANALYTICS_INTERVAL,
+    MAX_ANALYTICS_INTERVAL,
+    MIN_SCAN_SLICE_MS,
+    MAX_SCAN_SLICE_MS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -65,6 +77,7 @@ class Cardio4HAConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data={},
                 options={
                     CONF_UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL,
+                    CONF_ANALYTICS_INTERVAL: DEFAULT_ANALYTICS_INTERVAL,
                     CONF_BATTERY_CRITICAL: DEFAULT_BATTERY_CRITICAL,
                     CONF_BATTERY_WARNING: DEFAULT_BATTERY_WARNING,
                     CONF_BATTERY_LOW: DEFAULT_BATTERY_LOW,
@@ -77,6 +90,9 @@ class Cardio4HAConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_EXCLUDE_AREAS: DEFAULT_EXCLUDE_AREAS,
                     CONF_MONITOR_ZIGBEE2MQTT: DEFAULT_MONITOR_ZIGBEE2MQTT,
                     CONF_HISTORY_RETENTION_DAYS: DEFAULT_HISTORY_RETENTION_DAYS,
+                    CONF_GROUP_SENSORS: DEFAULT_GROUP_SENSORS,
+                    CONF_SCAN_SLICE_MS: DEFAULT_SCAN_SLICE_MS,
+                    CONF_CLASSIFY_IN_EXECUTOR: DEFAULT_CLASSIFY_IN_EXECUTOR,
                 },
             )
 
@@ -142,6 +158,7 @@ class Cardio4HAOptionsFlow(config_entries.OptionsFlow):
         options = self.config_entry.options
 
         current_interval = options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        current_analytics = options.get(CONF_ANALYTICS_INTERVAL, DEFAULT_ANALYTICS_INTERVAL)
         current_critical = options.get(CONF_BATTERY_CRITICAL, DEFAULT_BATTERY_CRITICAL)
         current_warning = options.get(CONF_BATTERY_WARNING, DEFAULT_BATTERY_WARNING)
         current_low = options.get(CONF_BATTERY_LOW, DEFAULT_BATTERY_LOW)
@@ -153,6 +170,9 @@ class Cardio4HAOptionsFlow(config_entries.OptionsFlow):
         current_integrations = options.get(CONF_EXCLUDE_INTEGRATIONS, DEFAULT_EXCLUDE_INTEGRATIONS)
         current_areas = options.get(CONF_EXCLUDE_AREAS, DEFAULT_EXCLUDE_AREAS)
         current_monitor_z2m = options.get(CONF_MONITOR_ZIGBEE2MQTT, DEFAULT_MONITOR_ZIGBEE2MQTT)
+        current_group_sensors = options.get(CONF_GROUP_SENSORS, DEFAULT_GROUP_SENSORS)
+        current_slice_ms = options.get(CONF_SCAN_SLICE_MS, DEFAULT_SCAN_SLICE_MS)
+        current_executor = options.get(CONF_CLASSIFY_IN_EXECUTOR, DEFAULT_CLASSIFY_IN_EXECUTOR)
 
         wildcards_str = ", ".join(current_wildcards) if current_wildcards else ""
 
@@ -176,6 +196,14 @@ class Cardio4HAOptionsFlow(config_entries.OptionsFlow):
                         cv.positive_int,
                         vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL),
                     ),
+                    vol.Optional(
+                        CONF_ANALYTICS_INTERVAL,
+                        default=current_analytics,
+                        description={"suggested_value": current_analytics},
+                    ): vol.All(
+                        cv.positive_int,
+                        vol.Range(min=MIN_ANALYTICS_INTERVAL, max=MAX_ANALYTICS_INTERVAL),
+                    ),
                     vol.Optional(
                         CONF_BATTERY_CRITICAL,
                         default=current_critical,
@@ -231,6 +259,24 @@ class Cardio4HAOptionsFlow(config_entries.OptionsFlow):
                         default=current_monitor_z2m,
                         description={"suggested_value": current_monitor_z2m},
                     ): bool,
+                    vol.Optional(
+                        CONF_GROUP_SENSORS,
+                        default=current_group_sensors,
+                        description={"suggested_value": current_group_sensors},
+                    ): bool,
+                    vol.Optional(
+                        CONF_SCAN_SLICE_MS,
+                        default=current_slice_ms,
+                        description={"suggested_value": current_slice_ms},
+                    ): vol.All(
+                        cv.positive_int,
+                        vol.Range(min=MIN_SCAN_SLICE_MS, max=MAX_SCAN_SLICE_MS),
+                    ),
+                    vol.Optional(
+                        CONF_CLASSIFY_IN_EXECUTOR,
+                        default=current_executor,
+                        description={"suggested_value": current_executor},
+                    ): bool,
                 }
             ),
         )
@@ -11,6 +11,7 @@ UPDATE_CHECK_INTERVAL = 86400  # 24 hours
 
 # Configuration - Basic
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_ANALYTICS_INTERVAL = "analytics_interval"
 CONF_BATTERY_CRITICAL = "battery_critical"
 CONF_BATTERY_WARNING = "battery_warning"
 CONF_BATTERY_LOW = "battery_low"
@@ -31,8 +32,37 @@ CONF_MONITOR_ZIGBEE2MQTT = "monitor_zigbee2mqtt"
 # Configuration - History
 CONF_HISTORY_RETENTION_DAYS = "history_retention_days"
 
+# Configuration - Per-area / per-integration health sensors
+CONF_GROUP_SENSORS = "group_sensors"
+
+# Configuration - Scan slicing
+CONF_SCAN_SLICE_MS = "scan_slice_ms"
+CONF_CLASSIFY_IN_EXECUTOR = "classify_in_executor"
+
+# Options applied in place when changed: thresholds re-evaluate cached
+# results, monitoring options reclassify every entity. Others are read live.
+THRESHOLD_OPTIONS = (
+    CONF_BATTERY_CRITICAL,
+    CONF_BATTERY_WARNING,
+    CONF_BATTERY_LOW,
+    CONF_LINKQUALITY_WARNING,
+    CONF_RSSI_WARNING,
+    CONF_UNAVAILABLE_WARNING,
+    CONF_UNAVAILABLE_CRITICAL,
+)
+MONITORING_OPTIONS = (
+    CONF_EXCLUDE_DOMAINS,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_ENTITY_WILDCARDS,
+    CONF_EXCLUDE_INTEGRATIONS,
+    CONF_EXCLUDE_AREAS,
+    CONF_MONITOR_ZIGBEE2MQTT,
+    CONF_INCLUDE_DISABLED,
+)
+
 # Defaults - Basic
 DEFAULT_UPDATE_INTERVAL = 60
+DEFAULT_ANALYTICS_INTERVAL = 300
 DEFAULT_BATTERY_CRITICAL = 15
 DEFAULT_BATTERY_WARNING = 30
 DEFAULT_BATTERY_LOW = 50
@@ -111,6 +141,29 @@ DEFAULT_MONITOR_ZIGBEE2MQTT = True
 
 # Defaults - History
 DEFAULT_HISTORY_RETENTION_DAYS = 30
+DEFAULT_ROLLUP_RETENTION_DAYS = 730  # daily uptime rollups outlive raw history
+
+# Defaults - Group sensors
+DEFAULT_GROUP_SENSORS = False
+
+# Defaults - Off-loop classification (only used for scans of at least this many entities)
+DEFAULT_CLASSIFY_IN_EXECUTOR = False
+CLASSIFY_EXECUTOR_MIN_ENTITIES = 200
+
+# Defaults - Scan slicing: milliseconds of work per slice before yielding to the event loop
+DEFAULT_SCAN_SLICE_MS = 20
+MIN_SCAN_SLICE_MS = 5
+MAX_SCAN_SLICE_MS = 1000
+# Items processed between clock checks inside a slice
+SCAN_SLICE_CHECK_EVERY = 32
+
+# Recent scans kept for cardio4ha/scan_stats and diagnostics
+SCAN_STATS_HISTORY = 50
+
+# Health rollup groupings
+GROUP_BY_AREA = "area"
+GROUP_BY_INTEGRATION = "integration"
+GROUP_BY = [GROUP_BY_AREA, GROUP_BY_INTEGRATION]
 
 # Sensor types
 SENSOR_UNAVAILABLE_COUNT = "unavailable_count"
@@ -122,6 +175,8 @@ SENSOR_HEALTHY_COUNT = "healthy_count"
 SENSOR_LAST_SCAN_DURATION = "last_scan_duration"
 SENSOR_HEALTH_SCORE = "health_score"
 SENSOR_FLAKY_DEVICES_COUNT = "flaky_devices_count"
+SENSOR_GROUP_HEALTH = "group_health"
+SENSOR_SCAN_THROUGHPUT = "scan_throughput"
 
 # Health Score Weights
 HEALTH_WEIGHT_UNAVAILABLE = 0.40
@@ -136,16 +191,74 @@ STORAGE_VERSION = 1
 # Device History Storage
 DEVICE_HISTORY_STORAGE_KEY = f"{DOMAIN}.device_history"
 DEVICE_HISTORY_STORAGE_VERSION = 1
+DEVICE_HISTORY_SHARDS = 16  # cardio4ha.device_history.0 .. .15
+
+# Last-scan snapshot served (marked stale) until the first scan after a restart
+SNAPSHOT_STORAGE_KEY = f"{DOMAIN}.last_scan"
+SNAPSHOT_STORAGE_VERSION = 1
+# Seconds between snapshot saves; it is also written on unload and HA stop
+SNAPSHOT_SAVE_INTERVAL = 900
+
+# Write-behind persistence: seconds after the last change / after the first unsaved change
+PERSIST_DELAY = 10
+PERSIST_MAX_LATENCY = 60
+
+# Seconds coordinator updates are gathered into one push to WebSocket subscribers
+PAYLOAD_COALESCE_WINDOW = 0.5
+
+# Device history ring buffer capacities (entries per device)
+HISTORY_EVENT_CAPACITY = 2048
+HISTORY_READING_CAPACITY = 24 * 60  # 60 days of hourly readings
 
 # Battery Prediction
 BATTERY_READING_INTERVAL = 3600  # 1hr dedup
 MIN_BATTERY_READINGS_FOR_PREDICTION = 5
+BATTERY_PREDICTION_WINDOW_DAYS = 30
+BATTERY_PREDICTION_MAX_DAYS = 365
+BATTERY_PREDICTION_Z = 1.96  # ~95% interval on the regression slope
+
+# Timeline buckets (aligned to local midnight; weeks start on Monday)
+TIMELINE_BUCKET_HOUR = "hour"
+TIMELINE_BUCKET_DAY = "day"
+TIMELINE_BUCKET_WEEK = "week"
+TIMELINE_BUCKETS = [TIMELINE_BUCKET_HOUR, TIMELINE_BUCKET_DAY, TIMELINE_BUCKET_WEEK]
+TIMELINE_MAX_BUCKETS = 2000
+FLEET_TIMELINE_MAX_CELLS = 1_000_000  # devices x buckets per fleet timeline request
+
+# Issue query categories (maintenance and ignored devices are their own categories)
+QUERY_CATEGORY_UNAVAILABLE = "unavailable"
+QUERY_CATEGORY_LOW_BATTERY = "low_battery"
+QUERY_CATEGORY_WEAK_SIGNAL = "weak_signal"
+QUERY_CATEGORY_FLAKY = "flaky"
+QUERY_CATEGORY_MAINTENANCE = "maintenance"
+QUERY_CATEGORY_IGNORED = "ignored"
+QUERY_CATEGORIES = [
+    QUERY_CATEGORY_UNAVAILABLE,
+    QUERY_CATEGORY_LOW_BATTERY,
+    QUERY_CATEGORY_WEAK_SIGNAL,
+    QUERY_CATEGORY_FLAKY,
+    QUERY_CATEGORY_MAINTENANCE,
+    QUERY_CATEGORY_IGNORED,
+]
+QUERY_DEFAULT_LIMIT = 50
+QUERY_MAX_LIMIT = 500
+
+# Battery prediction confidence (interval width relative to the estimate)
+PREDICTION_CONFIDENCE_HIGH = "high"
+PREDICTION_CONFIDENCE_MEDIUM = "medium"
+PREDICTION_CONFIDENCE_LOW = "low"
 
 # Severity levels
 SEVERITY_CRITICAL = "critical"
 SEVERITY_WARNING = "warning"
 SEVERITY_LOW = "low"
 SEVERITY_OK = "ok"
+SEVERITY_RANK = {
+    SEVERITY_OK: 0,
+    SEVERITY_LOW: 1,
+    SEVERITY_WARNING: 2,
+    SEVERITY_CRITICAL: 3,
+}
 
 # Signal types
 SIGNAL_TYPE_ZIGBEE = "zigbee"
@@ -155,16 +268,35 @@ SIGNAL_TYPE_WIFI = "wifi"
 MIN_UPDATE_INTERVAL = 30
 MAX_UPDATE_INTERVAL = 300
 
-# Startup delay (seconds) - wait for HA to fully start before first scan
+# Analytics (flaky detection, battery predictions, group rollups) run on
+# their own slower cadence (seconds), piggybacking on the next scan
+MIN_ANALYTICS_INTERVAL = 60
+MAX_ANALYTICS_INTERVAL = 3600
+
+# Background housekeeping (history purge and the GitHub update check) runs
+# on this schedule (seconds), off the scan
+HOUSEKEEPING_INTERVAL = 3600
+
+# Startup delay (seconds) - the first scan runs once HA has started, or after
+# this long if the started event hasn't fired by then
 STARTUP_DELAY = 120
 
+# Incremental scanning - only changed entities are re-classified between
+# full rescans, which still run on this schedule (seconds) as a safety net
+FULL_RESCAN_INTERVAL = 1800
+
 # States to track as unavailable
 UNAVAILABLE_STATES = ["unavailable", "unknown"]
 
 # Battery detection keywords
 BATTERY_KEYWORDS = ["battery", "batt"]
 
+# Kinds of device history readings gathered during classification
+READING_BATTERY = "battery"
+READING_SIGNAL = "signal"
+
 # Flaky detection
+FLAKY_WINDOW_DAYS = 30
 FLAKY_MIN_EVENTS = 3
 FLAKY_STDDEV_MULTIPLIER = 1.5
 
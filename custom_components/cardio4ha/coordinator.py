@@ -2,20 +2,19 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Iterable
 from datetime import datetime, timedelta
-import fnmatch
 import logging
 import math
-import statistics
+import time
 from typing import Any
 
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers import area_registry as ar
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
@@ -33,7 +32,12 @@ from .const import (
     MAINTENANCE_STORAGE_VERSION,
     IGNORE_STORAGE_KEY,
     IGNORE_STORAGE_VERSION,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
+    SNAPSHOT_SAVE_INTERVAL,
     STARTUP_DELAY,
+    FULL_RESCAN_INTERVAL,
+    HOUSEKEEPING_INTERVAL,
     CONF_BATTERY_CRITICAL,
     CONF_BATTERY_WARNING,
     CONF_BATTERY_LOW,
@@ -41,14 +45,14 @@ from .const import (
     CONF_RSSI_WARNING,
     CONF_UNAVAILABLE_WARNING,
     CONF_UNAVAILABLE_CRITICAL,
-    CONF_EXCLUDE_DOMAINS,
-    CONF_EXCLUDE_ENTITIES,
     CONF_INCLUDE_DISABLED,
-    CONF_EXCLUDE_ENTITY_WILDCARDS,
-    CONF_EXCLUDE_INTEGRATIONS,
-    CONF_EXCLUDE_AREAS,
-    CONF_MONITOR_ZIGBEE2MQTT,
     CONF_HISTORY_RETENTION_DAYS,
+    CONF_ANALYTICS_INTERVAL,
+    CONF_SCAN_SLICE_MS,
+    CONF_CLASSIFY_IN_EXECUTOR,
+    CONF_UPDATE_INTERVAL,
+    THRESHOLD_OPTIONS,
+    MONITORING_OPTIONS,
     DEFAULT_BATTERY_CRITICAL,
     DEFAULT_BATTERY_WARNING,
     DEFAULT_BATTERY_LOW,
@@ -56,34 +60,116 @@ from .const import (
     DEFAULT_RSSI_WARNING,
     DEFAULT_UNAVAILABLE_WARNING,
     DEFAULT_UNAVAILABLE_CRITICAL,
-    DEFAULT_EXCLUDE_DOMAINS,
-    DEFAULT_EXCLUDE_ENTITIES,
     DEFAULT_INCLUDE_DISABLED,
-    DEFAULT_EXCLUDE_ENTITY_WILDCARDS,
-    DEFAULT_EXCLUDE_INTEGRATIONS,
-    DEFAULT_EXCLUDE_AREAS,
-    DEFAULT_MONITOR_ZIGBEE2MQTT,
     DEFAULT_HISTORY_RETENTION_DAYS,
-    UNAVAILABLE_STATES,
-    BATTERY_KEYWORDS,
+    DEFAULT_ANALYTICS_INTERVAL,
+    DEFAULT_SCAN_SLICE_MS,
+    DEFAULT_CLASSIFY_IN_EXECUTOR,
+    DEFAULT_UPDATE_INTERVAL,
+    CLASSIFY_EXECUTOR_MIN_ENTITIES,
+    SCAN_SLICE_CHECK_EVERY,
     SEVERITY_CRITICAL,
     SEVERITY_WARNING,
     SEVERITY_LOW,
     SEVERITY_OK,
+    SEVERITY_RANK,
     SIGNAL_TYPE_ZIGBEE,
     SIGNAL_TYPE_WIFI,
+    QUERY_CATEGORY_UNAVAILABLE,
+    QUERY_CATEGORY_LOW_BATTERY,
+    QUERY_CATEGORY_WEAK_SIGNAL,
+    QUERY_CATEGORY_FLAKY,
+    QUERY_CATEGORY_MAINTENANCE,
+    QUERY_CATEGORY_IGNORED,
     HEALTH_WEIGHT_UNAVAILABLE,
     HEALTH_WEIGHT_BATTERY,
     HEALTH_WEIGHT_SIGNAL,
     HEALTH_WEIGHT_FLAKY,
-    FLAKY_MIN_EVENTS,
-    FLAKY_STDDEV_MULTIPLIER,
+    GROUP_BY_AREA,
+    GROUP_BY_INTEGRATION,
 )
+from .classify import EntitySnapshot, classify_batch, classify_state
 from .device_history import DeviceHistory
+from .exclusions import ExclusionRules
+from .issue_index import IssueIndex
+from .persistence import (
+    PERSIST_HISTORY,
+    PERSIST_IGNORE,
+    PERSIST_MAINTENANCE,
+    PERSIST_SNAPSHOT,
+    PERSIST_UNAVAILABLE,
+    PersistenceManager,
+)
+from .records import (
+    BatteryRecord,
+    EntityRecord,
+    SignalRecord,
+    UnavailableRecord,
+    record_key,
+    reuse_or_create,
+)
+from .registry_index import RegistryIndex, RegistryIndexEntry
+from .scan_stats import (
+    COUNTER_CLASSIFIED,
+    COUNTER_DEVICES,
+    COUNTER_EXCLUDED,
+    COUNTER_HISTORY_WRITES,
+    COUNTER_VISITED,
+    PHASE_CLASSIFY,
+    PHASE_EVALUATE,
+    PHASE_EXCLUSION,
+    PHASE_FLAKY,
+    PHASE_HISTORY,
+    PHASE_INDEX,
+    PHASE_PREDICTIONS,
+    PHASE_REGISTRY,
+    PHASE_SEVERITY,
+    ScanProfile,
+    ScanStats,
+)
+from .scheduler import DEADLINE_ESCALATION, DEADLINE_MAINTENANCE, DeadlineScheduler
+from .snapshot import build_snapshot, restore_snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class _ScanSlicer:
+    """Splits a scan into slices of bounded wall time.
+
+    due() is cheap and only reads the clock every SCAN_SLICE_CHECK_EVERY
+    calls; when it returns True the caller awaits next_slice(), which yields
+    to the event loop once before the next slice starts.
+    """
+
+    __slots__ = ("_budget", "_deadline", "_calls", "slices")
+
+    def __init__(self, budget_ms: float) -> None:
+        """Start the first slice."""
+        self._budget = budget_ms / 1000
+        self._deadline = time.monotonic() + self._budget
+        self._calls = 0
+        self.slices = 1
+
+    def due(self) -> bool:
+        """Return True when the current slice has used up its budget."""
+        self._calls += 1
+        if self._calls < SCAN_SLICE_CHECK_EVERY:
+            return False
+        self._calls = 0
+        return time.monotonic() >= self._deadline
+
+    def over_budget(self) -> bool:
+        """Return True when the slice is used up, reading the clock right away."""
+        return time.monotonic() >= self._deadline
+
+    async def next_slice(self) -> None:
+        """Yield to the event loop and start a new slice."""
+        await asyncio.sleep(0)
+        self.slices += 1
+        self._calls = 0
+        self._deadline = time.monotonic() + self._budget
+
+
 class Cardio4HACoordinator(DataUpdateCoordinator):
     """Class to manage fetching Cardio4HA data."""
 
@@ -106,6 +192,11 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
         self._maintenance_store = Store(hass, MAINTENANCE_STORAGE_VERSION, MAINTENANCE_STORAGE_KEY)
         self.maintenance_devices: dict[str, dict[str, Any]] = {}
         self._ignore_store = Store(hass, IGNORE_STORAGE_VERSION, IGNORE_STORAGE_KEY)
+        # Last completed scan, served as stale data until the first scan after startup
+        self._snapshot_store = Store(hass, SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY)
+        self._stale_data: dict[str, Any] | None = None
+        self._snapshot_saved: datetime | None = None
+        self._last_snapshot_mark: float | None = None
         self.ignored_devices: dict[str, dict[str, Any]] = {}
         self.unavailable_devices: list[dict[str, Any]] = []
         self.low_battery_devices: list[dict[str, Any]] = []
@@ -114,20 +205,98 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
         # v1.0.0: Device history for timeline, flaky detection, battery prediction
         self.device_history = DeviceHistory(hass)
 
+        # Write-behind saves for all stores, flushed on unload and HA stop
+        self.persistence = PersistenceManager(hass)
+        self.persistence.register(PERSIST_UNAVAILABLE, self.async_save_unavailable_data)
+        self.persistence.register(PERSIST_MAINTENANCE, self.async_save_maintenance_data)
+        self.persistence.register(PERSIST_IGNORE, self.async_save_ignore_data)
+        self.persistence.register(PERSIST_HISTORY, self.device_history.async_save)
+        self.persistence.register(PERSIST_SNAPSHOT, self.async_save_snapshot, flush_on_stop=True)
+        self.persistence.async_start()
+        self._shutdown = False
+
         # v1.0.0: Track previous unavailable keys for state transition detection
         self._previous_unavailable_keys: set[str] = set()
 
-        # v1.1.0: Startup delay - wait for HA to fully initialize
+        # Incremental scanning: per-entity classification cache, re-classified
+        # only for entities that changed since the last scan
+        self._entity_cache: dict[str, EntityRecord] = {}
+        self._key_members: dict[str, set[str]] = {}
+        # device_key -> (areas, integrations) of its entities, for group rollups
+        self._key_groups: dict[str, tuple[frozenset[str | None], frozenset[str]]] = {}
+        self._unavailable_records: dict[str, UnavailableRecord] = {}
+        self._battery_records: dict[str, BatteryRecord] = {}
+        self._signal_records: dict[str, SignalRecord] = {}
+        self._dirty_entities: set[str] = set()
+        self._full_scan_requested = True
+        # Set when thresholds change: re-evaluate every device from the cache
+        self._reevaluate_all = False
+        self._last_full_scan: float = 0
+        self._scan_lock = asyncio.Lock()
+        self._scanning = False
+
+        # Per-phase timings and counters of recent scans
+        self.scan_stats = ScanStats()
+        self._scan_profile: ScanProfile | None = None
+        self._unsub_state_changed = hass.bus.async_listen(
+            EVENT_STATE_CHANGED, self._async_on_state_changed
+        )
+
+        # Exclusion rules compiled once, with cached per-entity verdicts:
+        # entity_id -> (device_key, excluded) and device_key -> entity_ids
+        self._exclusion_rules = ExclusionRules.from_config(self._get_config_value)
+        self._exclusion_verdicts: dict[str, tuple[str, bool]] = {}
+        self._verdict_entities: dict[str, set[str]] = {}
+        # Options the rules and thresholds were last built from, to apply changes in place
+        self._applied_options = self._current_options()
+
+        # Maintenance expiry and unavailable severity escalation deadlines
+        self._maintenance_expiry: dict[str, datetime] = {}
+        self._scheduler = DeadlineScheduler(hass, self._async_on_deadlines)
+
+        # Current issues indexed for cardio4ha/query, synced after every scan
+        self.issue_index = IssueIndex(self._describe_issue)
+
+        # Analytics (flaky detection, battery predictions, group rollups) run
+        # on their own slower cadence; fast passes reuse the last results
+        self._last_analytics: float = 0
+        self._analytics_updated: datetime | None = None
+        self._flaky_devices: list[dict[str, Any]] = []
+        self._flaky_device_keys: set[str] = set()
+        self._battery_predictions: dict[str, dict[str, Any]] = {}
+        self._group_rollups: dict[str, dict[str | None, dict[str, int]]] = {
+            GROUP_BY_AREA: {}, GROUP_BY_INTEGRATION: {},
+        }
+
+        # History purge and the update check run on a background timer,
+        # never inside a scan
+        self.last_purge_ms: float | None = None
+        self._housekeeping_task: asyncio.Task | None = None
+        self._unsub_housekeeping: CALLBACK_TYPE | None = async_track_time_interval(
+            hass, self._async_housekeeping, timedelta(seconds=HOUSEKEEPING_INTERVAL)
+        )
+
+        # Registry snapshot: entity -> device/area/platform, invalidated by registry events
+        self._registry_index = RegistryIndex(hass, self._async_on_registry_changed)
+        self._registry_index.async_start()
+
+        # v1.1.0: Startup delay - wait for HA to fully initialize. The first
+        # scan runs when HA fires its started event (right away if it already
+        # has), with STARTUP_DELAY as the fallback
         self._startup_time = dt_util.utcnow()
         self._startup_delay = STARTUP_DELAY
+        self._ha_started = False
+        self._unsub_started: CALLBACK_TYPE | None = async_at_started(hass, self._async_on_ha_started)
 
         # v1.1.2: GitHub update check
         self._latest_version: str | None = None
         self._update_url: str | None = None
         self._last_update_check: float = 0
+        # Cleared by callers that must stay offline, such as the benchmarks
+        self.update_check_enabled = True
 
         # Load saved data
-        hass.async_create_task(self._async_load_all_data())
+        self._load_task = hass.async_create_task(self._async_load_all_data())
 
     async def _async_load_all_data(self) -> None:
         """Load all persistent data."""
@@ -135,9 +304,38 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             self._async_load_unavailable_data(),
             self._async_load_maintenance_data(),
             self._async_load_ignore_data(),
+            self._async_load_snapshot(),
             self.device_history.async_load(),
         )
 
+    async def _async_load_snapshot(self) -> None:
+        """Load the last-scan snapshot served until the first scan."""
+        try:
+            stored = await self._snapshot_store.async_load()
+            if stored:
+                self._stale_data = restore_snapshot(stored)
+                if self._stale_data is not None:
+                    self._snapshot_saved = self._stale_data["last_update"]
+                    self._stale_data["stale"] = True
+                    _LOGGER.info(
+                        "Loaded last scan snapshot from %s", self._stale_data["last_update"]
+                    )
+        except Exception as err:
+            _LOGGER.error("Error loading last scan snapshot: %s", err)
+
+    async def async_save_snapshot(self) -> None:
+        """Save the last completed scan, if newer than the stored one."""
+        data = self.data
+        if not data or data.get("stale") or not data.get("summary") or not data.get("scan_mode"):
+            return
+        if data["last_update"] == self._snapshot_saved:
+            return
+        try:
+            await self._snapshot_store.async_save(build_snapshot(data))
+            self._snapshot_saved = data["last_update"]
+        except Exception as err:
+            _LOGGER.error("Error saving last scan snapshot: %s", err)
+
     async def _async_load_unavailable_data(self) -> None:
         """Load unavailable tracking data from storage."""
         try:
@@ -161,6 +359,9 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             data = await self._maintenance_store.async_load()
             if data is not None:
                 self.maintenance_devices = data.get("devices", {})
+                for device_key in self.maintenance_devices:
+                    self._track_maintenance(device_key)
+                self._invalidate_exclusions(self.maintenance_devices)
                 _LOGGER.info(
                     "Loaded %d maintenance device(s) from storage",
                     len(self.maintenance_devices)
@@ -195,6 +396,7 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             data = await self._ignore_store.async_load()
             if data is not None:
                 self.ignored_devices = data.get("devices", {})
+                self._invalidate_exclusions(self.ignored_devices)
                 _LOGGER.info(
                     "Loaded %d ignored device(s) from storage",
                     len(self.ignored_devices)
@@ -216,6 +418,45 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             key, self.entry.data.get(key, default)
         )
 
+    def _current_options(self) -> dict[str, Any]:
+        """Return the effective configuration, options over data."""
+        return {**self.entry.data, **self.entry.options}
+
+    @callback
+    def async_apply_options(self) -> set[str]:
+        """Apply changed options in place and return the changed keys.
+
+        Monitoring options recompile the exclusion rules and reclassify
+        every entity; thresholds re-evaluate devices from the cached
+        classifications; update_interval reschedules the refresh timer.
+        Everything else is read live by the next scan.
+        """
+        options = self._current_options()
+        changed = {
+            key for key in options.keys() | self._applied_options.keys()
+            if options.get(key) != self._applied_options.get(key)
+        }
+        self._applied_options = options
+        if not changed:
+            return changed
+
+        if not changed.isdisjoint(MONITORING_OPTIONS):
+            self._exclusion_rules = ExclusionRules.from_config(self._get_config_value)
+            self._exclusion_verdicts.clear()
+            self._verdict_entities.clear()
+            self.request_full_scan()
+        if not changed.isdisjoint(THRESHOLD_OPTIONS):
+            self._reevaluate_all = True
+        if CONF_UPDATE_INTERVAL in changed:
+            self.update_interval = timedelta(
+                seconds=self._get_config_value(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+            )
+
+        _LOGGER.info("Applied changed options: %s", ", ".join(sorted(changed)))
+        # The refresh also reschedules the timer on the new interval
+        self.hass.async_create_task(self.async_refresh())
+        return changed
+
     @staticmethod
     def _format_duration(duration: timedelta) -> str:
         """Format duration to human-readable string."""
@@ -259,80 +500,307 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
 
     def _is_under_maintenance(self, key: str) -> bool:
         """Check if key (entity_id or device_key) is under maintenance."""
-        if key in self.maintenance_devices:
-            maintenance_info = self.maintenance_devices[key]
-            if maintenance_info.get("expires_at"):
-                expires_at = dt_util.parse_datetime(maintenance_info["expires_at"])
-                if expires_at and dt_util.utcnow() < expires_at:
-                    return True
-        return False
+        expires_at = self._maintenance_expiry.get(key)
+        return expires_at is not None and dt_util.utcnow() < expires_at
+
+    def _track_maintenance(self, key: str) -> None:
+        """Parse a maintenance expiry once and schedule its removal."""
+        info = self.maintenance_devices[key]
+        expires_at = dt_util.parse_datetime(info.get("expires_at") or "")
+        if expires_at is None:
+            # Unparseable entries are treated as already expired
+            expires_at = dt_util.utcnow()
+        self._maintenance_expiry[key] = expires_at
+        self._scheduler.schedule(DEADLINE_MAINTENANCE, key, expires_at)
+
+    def _untrack_maintenance(self, key: str) -> None:
+        """Forget the parsed expiry and deadline of a maintenance entry."""
+        self._maintenance_expiry.pop(key, None)
+        self._scheduler.cancel(DEADLINE_MAINTENANCE, key)
+
+    @callback
+    def _async_on_deadlines(self, due: dict[str, set[str]]) -> None:
+        """Handle maintenance expiries and severity escalations that came due."""
+        expired = due.get(DEADLINE_MAINTENANCE, set())
+        expired = {key for key in expired if key in self.maintenance_devices}
+        if expired:
+            for key in expired:
+                del self.maintenance_devices[key]
+                self._maintenance_expiry.pop(key, None)
+            self._invalidate_exclusions(expired)
+            _LOGGER.info("Maintenance expired for %d device(s)", len(expired))
+            # The refresh re-classifies the affected entities and escalates too
+            self._async_maintenance_changed()
+        elif due.get(DEADLINE_ESCALATION):
+            self._async_escalate()
+
+    @callback
+    def _async_escalate(self) -> None:
+        """Push updated unavailable severities without rescanning."""
+        if (
+            not self.data or not self.data.get("last_update")
+            or self.startup_remaining or self._scanning or self.data.get("stale")
+        ):
+            # A running scan refreshes severities itself
+            return
+        self._refresh_unavailable_records(self._get_scan_config(), dt_util.utcnow())
+        unavailable_devices = sorted(
+            self._unavailable_records.values(),
+            key=lambda x: x["duration_seconds"],
+            reverse=True,
+        )
+        critical_count, warning_count = self._count_severities(
+            unavailable_devices, self.data["low_battery"], self.data["weak_signal"]
+        )
+        self.unavailable_devices = unavailable_devices
+        self._sync_issue_index()
+        self.async_set_updated_data({
+            **self.data,
+            "unavailable": unavailable_devices,
+            "summary": {
+                **self.data["summary"],
+                "critical_count": critical_count,
+                "warning_count": warning_count,
+            },
+        })
+
+    def _refresh_unavailable_records(self, cfg: dict[str, Any], now: datetime) -> None:
+        """Update durations and severities, scheduling the next escalation of each record."""
+        boundaries = sorted((cfg["unavailable_warning"], cfg["unavailable_critical"]))
+        for key, record in self._unavailable_records.items():
+            duration = now - record["since"]
+            duration_seconds = duration.total_seconds()
+            if duration_seconds >= cfg["unavailable_critical"]:
+                severity = SEVERITY_CRITICAL
+            elif duration_seconds >= cfg["unavailable_warning"]:
+                severity = SEVERITY_WARNING
+            else:
+                severity = SEVERITY_LOW
+            record["duration_seconds"] = duration_seconds
+            record["duration_human"] = self._format_duration(duration)
+            record["severity"] = severity
+
+            # Wake up exactly when this record crosses its next severity boundary
+            next_boundary = next((b for b in boundaries if b > duration_seconds), None)
+            if next_boundary is None:
+                self._scheduler.cancel(DEADLINE_ESCALATION, key)
+            else:
+                self._scheduler.schedule(
+                    DEADLINE_ESCALATION, key, record["since"] + timedelta(seconds=next_boundary)
+                )
+
+    @staticmethod
+    def _count_severities(*result_lists: list[dict[str, Any]]) -> tuple[int, int]:
+        """Return (critical, warning) counts across result lists."""
+        critical_count = warning_count = 0
+        for results in result_lists:
+            for result in results:
+                if result["severity"] == SEVERITY_CRITICAL:
+                    critical_count += 1
+                elif result["severity"] == SEVERITY_WARNING:
+                    warning_count += 1
+        return critical_count, warning_count
+
+    @staticmethod
+    def _health_score(
+        total: int, unavailable: int, low_battery: int, weak_signal: int, flaky: int
+    ) -> int:
+        """Return the weighted 0-100 health score of a set of monitored devices."""
+        if not total:
+            return 100
+        health_score = 100.0
+        health_score -= unavailable / total * 100 * HEALTH_WEIGHT_UNAVAILABLE
+        health_score -= low_battery / total * 100 * HEALTH_WEIGHT_BATTERY
+        health_score -= weak_signal / total * 100 * HEALTH_WEIGHT_SIGNAL
+        health_score -= flaky / total * 100 * HEALTH_WEIGHT_FLAKY
+        return max(0, round(health_score))
+
+    def _compute_group_rollups(
+        self, flaky_device_keys: set[str]
+    ) -> dict[str, dict[str | None, dict[str, int]]]:
+        """Return per-area and per-integration counts and health scores.
+
+        One pass over the monitored devices; a device whose entities span
+        several areas or integrations counts towards each of them.
+        """
+        rollups: dict[str, dict[str | None, list[int]]] = {
+            GROUP_BY_AREA: {},
+            GROUP_BY_INTEGRATION: {},
+        }
+        # Weak signal records of standalone entities are keyed per signal type
+        weak_signal_keys = {record["device_key"] for record in self._signal_records.values()}
+        for key, (areas, integrations) in self._key_groups.items():
+            flags = (
+                1,
+                key in self._unavailable_records,
+                key in self._battery_records,
+                key in weak_signal_keys,
+                key in flaky_device_keys,
+            )
+            for group_by, names in ((GROUP_BY_AREA, areas), (GROUP_BY_INTEGRATION, integrations)):
+                groups = rollups[group_by]
+                for name in names:
+                    counts = groups.get(name)
+                    if counts is None:
+                        counts = groups[name] = [0, 0, 0, 0, 0]
+                    for i, flag in enumerate(flags):
+                        counts[i] += flag
+
+        return {
+            group_by: {
+                name: {
+                    "monitored": counts[0],
+                    "unavailable": counts[1],
+                    "low_battery": counts[2],
+                    "weak_signal": counts[3],
+                    "flaky": counts[4],
+                    "health_score": self._health_score(*counts),
+                }
+                for name, counts in groups.items()
+            }
+            for group_by, groups in rollups.items()
+        }
+
+    def device_severity(self, key: str) -> str:
+        """Return the worst current severity of a monitored device."""
+        worst = SEVERITY_OK
+        records = [self._unavailable_records.get(key), self._battery_records.get(key)]
+        records.extend(self._signal_records.get(signal_key) for signal_key in self._signal_keys(key))
+        for record in records:
+            if record and SEVERITY_RANK.get(record.get("severity"), 0) > SEVERITY_RANK[worst]:
+                worst = record["severity"]
+        return worst
+
+    def filter_device_keys(
+        self,
+        area: str | None = None,
+        integration: str | None = None,
+        severity: str | None = None,
+    ) -> list[str]:
+        """Return monitored device keys matching every given filter."""
+        result = []
+        for key, members in self._key_members.items():
+            entities = [self._entity_cache[entity_id] for entity_id in members]
+            if area is not None and not any(e.area_name == area for e in entities):
+                continue
+            if integration is not None and not any(e.integration == integration for e in entities):
+                continue
+            if severity is not None and self.device_severity(key) != severity:
+                continue
+            result.append(key)
+        result.sort()
+        return result
+
+    def describe_device_key(self, key: str) -> tuple[str, str | None]:
+        """Return (display name, area) for a device key from the scan cache or registry."""
+        members = self._key_members.get(key)
+        if members:
+            entity = self._entity_cache[min(members)]
+            if entity.device_id:
+                return entity.device_name or entity.name, entity.area_name
+            return entity.name, entity.area_name
+        name, area = self._registry_index.device_info(key)
+        return name or key, area
+
+    def _describe_issue(self, key: str, record: dict[str, Any]) -> tuple[set[str | None], set[str]]:
+        """Return the (areas, integrations) of a device for the issue index."""
+        groups = self._key_groups.get(record.get("device_key") or key)
+        if groups is None:
+            integration = record.get("integration")
+            return set(), {integration} if integration else set()
+        return groups
+
+    def _sync_issue_index(self, flaky_devices: list[dict[str, Any]] | None = None) -> None:
+        """Bring the issue index in line with the current results."""
+        index = self.issue_index
+        index.sync(QUERY_CATEGORY_UNAVAILABLE, self._unavailable_records)
+        if flaky_devices is None:
+            # Only unavailable severities change between scans
+            return
+        index.sync(QUERY_CATEGORY_LOW_BATTERY, self._battery_records)
+        index.sync(QUERY_CATEGORY_WEAK_SIGNAL, self._signal_records)
+        index.sync(QUERY_CATEGORY_FLAKY, {dev["device_key"]: dev for dev in flaky_devices})
+        index.sync(QUERY_CATEGORY_MAINTENANCE, self.maintenance_devices)
+        index.sync(QUERY_CATEGORY_IGNORED, self.ignored_devices)
+
+    def _index_stale_data(self, data: dict[str, Any]) -> None:
+        """Index the snapshot results so queries work before the first scan."""
+        index = self.issue_index
+        for category, name in (
+            (QUERY_CATEGORY_UNAVAILABLE, "unavailable"),
+            (QUERY_CATEGORY_LOW_BATTERY, "low_battery"),
+            (QUERY_CATEGORY_WEAK_SIGNAL, "weak_signal"),
+            (QUERY_CATEGORY_FLAKY, "flaky_devices"),
+        ):
+            index.sync(category, {record_key(record): record for record in data[name]})
+        index.sync(QUERY_CATEGORY_MAINTENANCE, self.maintenance_devices)
+        index.sync(QUERY_CATEGORY_IGNORED, self.ignored_devices)
 
     def _should_exclude_entity(
         self,
         entity_id: str,
         domain: str,
-        entity_entry: er.RegistryEntry | None = None,
+        platform: str | None = None,
         area_name: str | None = None,
         device_id: str | None = None,
     ) -> bool:
-        """Check if entity should be excluded."""
-        device_key = self._get_device_key(device_id, entity_id)
-
-        # Check maintenance by entity_id (backward compat) and device_key
-        if self._is_under_maintenance(entity_id) or self._is_under_maintenance(device_key):
-            return True
-
-        # Check if device is permanently ignored
-        if device_key in self.ignored_devices:
-            return True
-
-        # Zigbee2MQTT Override
-        monitor_z2m = self._get_config_value(CONF_MONITOR_ZIGBEE2MQTT, DEFAULT_MONITOR_ZIGBEE2MQTT)
-        if monitor_z2m and entity_entry and entity_entry.platform == "mqtt":
-            if any(z2m in entity_id.lower() for z2m in ["zigbee", "z2m", "0x"]):
-                return False
-
-        exclude_domains = self._get_config_value(CONF_EXCLUDE_DOMAINS, DEFAULT_EXCLUDE_DOMAINS)
-        exclude_entities = self._get_config_value(CONF_EXCLUDE_ENTITIES, DEFAULT_EXCLUDE_ENTITIES)
-        exclude_wildcards = self._get_config_value(CONF_EXCLUDE_ENTITY_WILDCARDS, DEFAULT_EXCLUDE_ENTITY_WILDCARDS)
-        exclude_integrations = self._get_config_value(CONF_EXCLUDE_INTEGRATIONS, DEFAULT_EXCLUDE_INTEGRATIONS)
-        exclude_areas = self._get_config_value(CONF_EXCLUDE_AREAS, DEFAULT_EXCLUDE_AREAS)
-
-        if domain in exclude_domains:
-            return True
-        if entity_entry and entity_entry.platform and entity_entry.platform in exclude_integrations:
-            return True
-        if area_name and area_name in exclude_areas:
-            return True
-
-        for pattern in exclude_entities:
-            if pattern.endswith("*"):
-                if entity_id.startswith(pattern[:-1]):
-                    return True
-            elif entity_id == pattern:
-                return True
-
-        for pattern in exclude_wildcards:
-            if fnmatch.fnmatch(entity_id, pattern):
-                return True
-
-        return False
+        """Check if entity should be excluded, reusing the cached verdict if any."""
+        cached = self._exclusion_verdicts.get(entity_id)
+        if cached is not None:
+            return cached[1]
 
-    @staticmethod
-    def _is_battery_entity(entity_id: str, attributes: dict) -> bool:
-        """Check if entity is a battery sensor."""
-        if attributes.get("device_class") == "battery":
-            return True
-        lower_id = entity_id.lower()
-        return any(keyword in lower_id for keyword in BATTERY_KEYWORDS)
+        device_key = self._get_device_key(device_id, entity_id)
+        excluded = (
+            # Check maintenance by entity_id (backward compat) and device_key
+            self._is_under_maintenance(entity_id)
+            or self._is_under_maintenance(device_key)
+            # Check if device is permanently ignored
+            or device_key in self.ignored_devices
+            or self._exclusion_rules.matches(entity_id, domain, platform, area_name)
+        )
+        self._exclusion_verdicts[entity_id] = (device_key, excluded)
+        self._verdict_entities.setdefault(device_key, set()).add(entity_id)
+        return excluded
+
+    def _drop_verdict(self, entity_id: str) -> None:
+        """Forget the cached exclusion verdict for one entity."""
+        cached = self._exclusion_verdicts.pop(entity_id, None)
+        if cached is None:
+            return
+        entity_ids = self._verdict_entities.get(cached[0])
+        if entity_ids is not None:
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self._verdict_entities[cached[0]]
+
+    def _invalidate_exclusions(self, keys: Iterable[str]) -> None:
+        """Drop cached verdicts for device keys or entity ids and re-classify them."""
+        for key in keys:
+            entity_ids = set(self._verdict_entities.get(key, ()))
+            if key in self._exclusion_verdicts:
+                entity_ids.add(key)
+            for entity_id in entity_ids:
+                self._drop_verdict(entity_id)
+            self._dirty_entities.update(entity_ids)
 
     def _get_device_key(self, device_id: str | None, entity_id: str) -> str:
         """Get a stable key for device history tracking."""
         return device_id or entity_id
 
+    @callback
+    def _async_on_ha_started(self, _hass: HomeAssistant) -> None:
+        """Start scanning as soon as Home Assistant has started."""
+        self._unsub_started = None
+        self._ha_started = True
+        if self.data is not None:
+            # Setup already served the startup result; don't wait for the next interval
+            self.hass.async_create_task(self.async_refresh())
+
     @property
     def startup_remaining(self) -> int:
         """Seconds remaining in startup delay."""
+        if self._ha_started:
+            return 0
         elapsed = (dt_util.utcnow() - self._startup_time).total_seconds()
         remaining = self._startup_delay - elapsed
         return max(0, int(remaining))
@@ -351,10 +819,9 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
 
     async def _check_for_updates(self) -> None:
         """Check GitHub for newer releases (max once per 24h)."""
-        import time
         from aiohttp import ClientTimeout
         now = time.monotonic()
-        if now - self._last_update_check < UPDATE_CHECK_INTERVAL:
+        if not self.update_check_enabled or now - self._last_update_check < UPDATE_CHECK_INTERVAL:
             return
         self._last_update_check = now
         try:
@@ -373,14 +840,373 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
         except Exception as err:
             _LOGGER.debug("Update check failed (non-critical): %s", err)
 
+    @callback
+    def _async_housekeeping(self, _now: datetime | None = None) -> None:
+        """Start the history purge and update check as a background task."""
+        if self.startup_remaining or (
+            self._housekeeping_task is not None and not self._housekeeping_task.done()
+        ):
+            return
+        self._housekeeping_task = self.hass.async_create_background_task(
+            self._async_run_housekeeping(), f"{DOMAIN} housekeeping"
+        )
+
+    async def _async_run_housekeeping(self) -> None:
+        """Purge expired history and check GitHub for a newer release.
+
+        The purge runs one device per step in the same time-bounded slices
+        as scans, yielding to the event loop in between.
+        """
+        start = time.perf_counter()
+        slicer = _ScanSlicer(self._get_config_value(CONF_SCAN_SLICE_MS, DEFAULT_SCAN_SLICE_MS))
+        for _ in self.device_history.iter_purge(
+            self._get_config_value(CONF_HISTORY_RETENTION_DAYS, DEFAULT_HISTORY_RETENTION_DAYS)
+        ):
+            if slicer.due():
+                await slicer.next_slice()
+        self.last_purge_ms = round((time.perf_counter() - start) * 1000, 2)
+        if self.device_history.is_dirty:
+            self.persistence.mark_dirty(PERSIST_HISTORY)
+        await self._check_for_updates()
+
+    @callback
+    def _async_on_state_changed(self, event: Event) -> None:
+        """Mark an entity for re-classification on the next scan."""
+        self._dirty_entities.add(event.data["entity_id"])
+
+    @callback
+    def _async_on_registry_changed(self, entity_ids: set[str]) -> None:
+        """Re-classify entities whose registry facts changed."""
+        for entity_id in entity_ids:
+            self._drop_verdict(entity_id)
+        self._dirty_entities.update(entity_ids)
+
+    def request_full_scan(self) -> None:
+        """Re-classify every entity on the next scan, not only changed ones."""
+        self._full_scan_requested = True
+
+    async def async_shutdown(self) -> None:
+        """Stop listeners and timers, flush pending saves and cancel scheduled refreshes.
+
+        Runs once: unload calls it directly and the base class also
+        registers it on the config entry.
+        """
+        if self._shutdown:
+            return
+        self._shutdown = True
+        if self._unsub_state_changed:
+            self._unsub_state_changed()
+            self._unsub_state_changed = None
+        if self._unsub_started:
+            self._unsub_started()
+            self._unsub_started = None
+        if self._unsub_housekeeping:
+            self._unsub_housekeeping()
+            self._unsub_housekeeping = None
+        if self._housekeeping_task and not self._housekeeping_task.done():
+            self._housekeeping_task.cancel()
+        self._registry_index.async_stop()
+        self._scheduler.async_stop()
+        await self.persistence.async_stop()
+        await super().async_shutdown()
+
+    def _get_scan_config(self) -> dict[str, Any]:
+        """Read the thresholds used to classify results in one place."""
+        return {
+            "battery_critical": self._get_config_value(CONF_BATTERY_CRITICAL, DEFAULT_BATTERY_CRITICAL),
+            "battery_warning": self._get_config_value(CONF_BATTERY_WARNING, DEFAULT_BATTERY_WARNING),
+            "battery_low": self._get_config_value(CONF_BATTERY_LOW, DEFAULT_BATTERY_LOW),
+            "linkquality_warning": self._get_config_value(CONF_LINKQUALITY_WARNING, DEFAULT_LINKQUALITY_WARNING),
+            "rssi_warning": self._get_config_value(CONF_RSSI_WARNING, DEFAULT_RSSI_WARNING),
+            "unavailable_warning": self._get_config_value(CONF_UNAVAILABLE_WARNING, DEFAULT_UNAVAILABLE_WARNING),
+            "unavailable_critical": self._get_config_value(CONF_UNAVAILABLE_CRITICAL, DEFAULT_UNAVAILABLE_CRITICAL),
+            "include_disabled": self._get_config_value(CONF_INCLUDE_DISABLED, DEFAULT_INCLUDE_DISABLED),
+        }
+
+    def _snapshot_entity(self, entity_id: str, cfg: dict[str, Any]) -> EntitySnapshot | None:
+        """Capture what classifying an entity needs, or return None if it is not monitored.
+
+        Lookup and exclusion time are charged to their own scan phases.
+        """
+        profile = self._scan_profile
+        started = time.perf_counter()
+        found = self._lookup_entity(entity_id, cfg)
+        looked_up = time.perf_counter()
+        if profile is not None:
+            profile.add(PHASE_REGISTRY, looked_up - started)
+        if found is None:
+            return None
+
+        state, info = found
+        excluded = self._should_exclude_entity(
+            entity_id, state.domain, info.platform, info.area_name, info.device_id
+        )
+        if profile is not None:
+            profile.add(PHASE_EXCLUSION, time.perf_counter() - looked_up)
+            if excluded:
+                profile.count(COUNTER_EXCLUDED)
+        if excluded:
+            return None
+
+        # State objects and registry entries are immutable, so this is safe to hand off
+        return entity_id, state, info, self._get_device_key(info.device_id, entity_id)
+
+    def _lookup_entity(
+        self, entity_id: str, cfg: dict[str, Any]
+    ) -> tuple[State, RegistryIndexEntry] | None:
+        """Return the state and registry facts of an entity that may be monitored."""
+        state = self.hass.states.get(entity_id)
+        if not state:
+            self._drop_verdict(entity_id)
+            return None
+
+        info = self._registry_index.get(entity_id)
+
+        # Skip Cardio4HA's own sensors
+        if info.platform == DOMAIN:
+            return None
+
+        # Skip disabled entities unless configured
+        if info.disabled and not cfg["include_disabled"]:
+            return None
+
+        # Skip virtual/software devices (no physical connections like MAC/Zigbee IEEE)
+        if not info.is_physical:
+            return None
+
+        return state, info
+
+    def _classify_entity(self, entity_id: str, cfg: dict[str, Any]) -> EntityRecord | None:
+        """Classify a single entity, or return None if it is not monitored.
+
+        Also records battery and signal readings into device history.
+        """
+        snapshot = self._snapshot_entity(entity_id, cfg)
+        if snapshot is None:
+            return None
+        record, readings = classify_state(*snapshot)
+        if readings:
+            self.device_history.record_readings(readings)
+        return record
+
+    async def _async_classify_in_executor(
+        self,
+        entity_ids: Iterable[str],
+        cfg: dict[str, Any],
+        slicer: _ScanSlicer,
+        touched_keys: set[str],
+    ) -> None:
+        """Classify entities in an executor thread and merge the results on the loop.
+
+        Snapshots are taken and results applied on the event loop (in slices);
+        only the pure classification runs in the thread, and the history
+        readings it returns are recorded in one batch.
+        """
+        snapshots: list[EntitySnapshot] = []
+        for entity_id in entity_ids:
+            snapshot = self._snapshot_entity(entity_id, cfg)
+            if snapshot is None:
+                self._apply_entity(entity_id, None, touched_keys)
+            else:
+                snapshots.append(snapshot)
+            if slicer.due():
+                await slicer.next_slice()
+
+        results, readings = await self.hass.async_add_executor_job(classify_batch, snapshots)
+        if self._scan_profile:
+            self._scan_profile.count(COUNTER_CLASSIFIED, len(results))
+
+        for entity_id, record in results:
+            self._apply_entity(entity_id, record, touched_keys)
+            if slicer.due():
+                await slicer.next_slice()
+        self.device_history.record_readings(readings)
+
+    def _apply_entity(self, entity_id: str, record: EntityRecord | None, touched_keys: set[str]) -> None:
+        """Store a classification result and note which device keys it affects."""
+        old = self._entity_cache.get(entity_id)
+        old_key = old.device_key if old else None
+        new_key = record.device_key if record else None
+
+        if old_key and old_key != new_key:
+            members = self._key_members.get(old_key)
+            if members is not None:
+                members.discard(entity_id)
+                if not members:
+                    del self._key_members[old_key]
+            touched_keys.add(old_key)
+
+        if record is None:
+            if old is not None:
+                del self._entity_cache[entity_id]
+                if self.unavailable_tracking.pop(entity_id, None) is not None:
+                    self.persistence.mark_dirty(PERSIST_UNAVAILABLE)
+            return
+
+        self._entity_cache[entity_id] = record
+        self._key_members.setdefault(new_key, set()).add(entity_id)
+        touched_keys.add(new_key)
+
+    def _evaluate_key(self, key: str, cfg: dict[str, Any]) -> None:
+        """Rebuild the unavailable, low battery and weak signal results for one device key."""
+        members = self._key_members.get(key)
+        if not members:
+            self._unavailable_records.pop(key, None)
+            self._scheduler.cancel(DEADLINE_ESCALATION, key)
+            self._battery_records.pop(key, None)
+            for signal_key in self._signal_keys(key):
+                self._signal_records.pop(signal_key, None)
+            self._key_groups.pop(key, None)
+            return
+
+        entities = [self._entity_cache[entity_id] for entity_id in sorted(members)]
+        self._key_groups[key] = (
+            frozenset(entity.area_name for entity in entities),
+            frozenset(entity.integration for entity in entities if entity.integration),
+        )
+        first = entities[0]
+        device_id = first.device_id
+        device_name = first.device_name
+        area_name = first.area_name
+
+        # ── UNAVAILABILITY ──
+        # A device only counts as unavailable when ALL its entities are unavailable
+        if all(entity.unavailable for entity in entities):
+            tracked = next(
+                (entity for entity in entities if entity.entity_id in self.unavailable_tracking),
+                first,
+            )
+            entity_id = tracked.entity_id
+            if entity_id not in self.unavailable_tracking:
+                self.unavailable_tracking[entity_id] = {
+                    "since": dt_util.utcnow(),
+                    "entity_id": entity_id,
+                    "name": tracked.name,
+                    "domain": tracked.domain,
+                }
+                self.persistence.mark_dirty(PERSIST_UNAVAILABLE)
+            since = self.unavailable_tracking[entity_id]["since"]
+
+            fields = {
+                "entity_id": entity_id,
+                "name": (device_name or tracked.name) if device_id else tracked.name,
+                "domain": tracked.domain,
+                "area": area_name,
+                "device": device_name,
+                "device_id": device_id,
+                "device_key": key,
+                "since": since,
+                "last_seen": since,
+                "integration": "multiple" if device_id else tracked.integration,
+            }
+            if device_id:
+                fields["unavailable_count"] = len(entities)
+                fields["total_count"] = len(entities)
+            # Unchanged devices keep their record (and its cached JSON form)
+            self._unavailable_records[key] = reuse_or_create(
+                self._unavailable_records.get(key), UnavailableRecord, fields
+            )
+        else:
+            self._unavailable_records.pop(key, None)
+            self._scheduler.cancel(DEADLINE_ESCALATION, key)
+            for entity in entities:
+                if self.unavailable_tracking.pop(entity.entity_id, None) is not None:
+                    self.persistence.mark_dirty(PERSIST_UNAVAILABLE)
+
+        # ── BATTERY LEVEL ──
+        # The first battery entity below the threshold reports for the device
+        entity = next(
+            (
+                entity for entity in entities
+                if entity.battery_level is not None and entity.battery_level < cfg["battery_low"]
+            ),
+            None,
+        )
+        if entity is not None:
+            self._battery_records[key] = reuse_or_create(self._battery_records.get(key), BatteryRecord, {
+                "entity_id": entity.entity_id,
+                "name": (device_name or entity.name) if device_id else entity.name,
+                "battery_level": entity.battery_level,
+                "severity": self._get_battery_severity(
+                    entity.battery_level, cfg["battery_critical"], cfg["battery_warning"], cfg["battery_low"]
+                ),
+                "area": area_name,
+                "device": device_name,
+                "device_id": device_id,
+                "device_key": key,
+                "last_updated": entity.last_updated,
+            })
+        else:
+            self._battery_records.pop(key, None)
+
+        # ── SIGNAL STRENGTH ──
+        # The first weak reading reports for a device (Zigbee before WiFi within
+        # an entity); a standalone entity reports each of its weak readings
+        weak = [
+            (entity, signal_type, value, threshold)
+            for entity in entities
+            for signal_type, value, threshold in (
+                (SIGNAL_TYPE_ZIGBEE, entity.linkquality, cfg["linkquality_warning"]),
+                (SIGNAL_TYPE_WIFI, entity.rssi, cfg["rssi_warning"]),
+            )
+            if value is not None and value < threshold
+        ]
+        if device_id:
+            weak = weak[:1]
+        signal_keys = set()
+        for entity, signal_type, value, threshold in weak:
+            fields = {
+                "entity_id": entity.entity_id,
+                "name": (device_name or entity.name) if device_id else entity.name,
+                "signal_type": signal_type,
+                "linkquality": value if signal_type == SIGNAL_TYPE_ZIGBEE else None,
+                "rssi": value if signal_type == SIGNAL_TYPE_WIFI else None,
+                "severity": self._get_signal_severity(signal_type, value, threshold),
+                "area": area_name,
+                "device": device_name,
+                "device_id": device_id,
+                "device_key": key,
+            }
+            signal_key = record_key(fields)
+            signal_keys.add(signal_key)
+            self._signal_records[signal_key] = reuse_or_create(
+                self._signal_records.get(signal_key), SignalRecord, fields
+            )
+        for signal_key in self._signal_keys(key) - signal_keys:
+            self._signal_records.pop(signal_key, None)
+
+    @staticmethod
+    def _signal_keys(key: str) -> set[str]:
+        """Return every key a device's weak signal records can be stored under."""
+        return {key, f"{key}|{SIGNAL_TYPE_ZIGBEE}", f"{key}|{SIGNAL_TYPE_WIFI}"}
+
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from Home Assistant."""
+        """Fetch data from Home Assistant, one scan at a time."""
+        # Scans yield between slices, so a forced refresh must wait its turn
+        async with self._scan_lock:
+            self._scanning = True
+            try:
+                return await self._async_scan()
+            finally:
+                self._scanning = False
+
+    async def _async_scan(self) -> dict[str, Any]:
+        """Scan entity states and build the result."""
+        # Stored tracking, maintenance, ignore and history data must be in
+        # place before anything is classified or recorded
+        if not self._load_task.done():
+            await self._load_task
+
         # v1.1.0: Startup delay - wait for HA to fully start
         remaining = self.startup_remaining
         if remaining > 0:
             _LOGGER.debug(
                 "Startup delay: %d seconds remaining before first scan", remaining
             )
+            # Warm start: serve the last scan from before the restart, marked stale
+            if self._stale_data is not None:
+                self._index_stale_data(self._stale_data)
+                return {**self._stale_data, "startup_remaining": remaining}
             return {
                 "unavailable": [],
                 "low_battery": [],
@@ -401,326 +1227,83 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
                 "flaky_device_keys": set(),
                 "flaky_count": 0,
                 "battery_predictions": {},
+                "group_rollups": {GROUP_BY_AREA: {}, GROUP_BY_INTEGRATION: {}},
                 "last_update": dt_util.utcnow(),
                 "scan_duration": 0,
+                "scan_slices": 0,
+                "entities_per_second": None,
                 "startup_remaining": remaining,
             }
 
         start_time = dt_util.utcnow()
 
+        # Decide between a full rescan and an incremental pass over changed entities
+        full_scan = (
+            self._full_scan_requested
+            or time.monotonic() - self._last_full_scan >= FULL_RESCAN_INTERVAL
+        )
+        dirty_entities, self._dirty_entities = self._dirty_entities, set()
+        if full_scan:
+            self._full_scan_requested = False
+            self._last_full_scan = time.monotonic()
+            dirty_entities = set(self.hass.states.async_entity_ids()) | set(self._entity_cache)
+
+        profile = self._scan_profile = ScanProfile("full" if full_scan else "incremental")
+        profile.count(COUNTER_VISITED, len(dirty_entities))
+        history_writes = self.device_history.write_count
+
         try:
-            # Get configuration
-            battery_critical = self._get_config_value(CONF_BATTERY_CRITICAL, DEFAULT_BATTERY_CRITICAL)
-            battery_warning = self._get_config_value(CONF_BATTERY_WARNING, DEFAULT_BATTERY_WARNING)
-            battery_low = self._get_config_value(CONF_BATTERY_LOW, DEFAULT_BATTERY_LOW)
-            linkquality_warning = self._get_config_value(CONF_LINKQUALITY_WARNING, DEFAULT_LINKQUALITY_WARNING)
-            rssi_warning = self._get_config_value(CONF_RSSI_WARNING, DEFAULT_RSSI_WARNING)
-            unavailable_warning = self._get_config_value(CONF_UNAVAILABLE_WARNING, DEFAULT_UNAVAILABLE_WARNING)
-            unavailable_critical = self._get_config_value(CONF_UNAVAILABLE_CRITICAL, DEFAULT_UNAVAILABLE_CRITICAL)
-            include_disabled = self._get_config_value(CONF_INCLUDE_DISABLED, DEFAULT_INCLUDE_DISABLED)
-            retention_days = self._get_config_value(CONF_HISTORY_RETENTION_DAYS, DEFAULT_HISTORY_RETENTION_DAYS)
-
-            # Result containers
-            unavailable_devices = []
-            low_battery_devices = []
-            weak_signal_devices = []
-
-            # Device-level dedup
-            low_battery_device_ids = set()
-            weak_signal_device_ids = set()
-
-            # Track device entity counts for smart unavailable detection
-            device_entity_counts = {}
-
-            # Track all monitored device count for health score
-            all_monitored_device_keys = set()
-
-            # Track current unavailable keys for state transition detection
-            current_unavailable_keys = set()
-
-            # Registries
-            entity_registry = er.async_get(self.hass)
-            device_registry = dr.async_get(self.hass)
-            area_registry = ar.async_get(self.hass)
+            cfg = self._get_scan_config()
+            analytics_due = time.monotonic() - self._last_analytics >= self._get_config_value(
+                CONF_ANALYTICS_INTERVAL, DEFAULT_ANALYTICS_INTERVAL
+            )
+            profile.analytics = analytics_due
 
             # ====== MAIN SCAN LOOP ======
-            for entity_id in self.hass.states.async_entity_ids():
-                state = self.hass.states.get(entity_id)
-                if not state:
-                    continue
-
-                domain = entity_id.split(".")[0]
-                entity_entry = entity_registry.async_get(entity_id)
-
-                # Skip Cardio4HA's own sensors
-                if entity_entry and entity_entry.platform == DOMAIN:
-                    continue
-
-                # Skip disabled entities unless configured
-                if entity_entry and entity_entry.disabled and not include_disabled:
-                    continue
-
-                # Get device and area info
-                device_name = None
-                area_name = None
-                device_id = entity_entry.device_id if entity_entry else None
-
-                if entity_entry and entity_entry.device_id:
-                    device_entry = device_registry.async_get(entity_entry.device_id)
-                    if device_entry:
-                        # Skip virtual/software devices (no physical connections like MAC/Zigbee IEEE)
-                        if not device_entry.connections:
-                            continue
-                        device_name = device_entry.name_by_user or device_entry.name
-                        if device_entry.area_id:
-                            area_entry = area_registry.async_get_area(device_entry.area_id)
-                            if area_entry:
-                                area_name = area_entry.name
-
-                # Exclusion check
-                if self._should_exclude_entity(entity_id, domain, entity_entry, area_name, device_id):
-                    continue
-
-                device_key = self._get_device_key(device_id, entity_id)
-                all_monitored_device_keys.add(device_key)
-
-                # ── 1. TRACK DEVICE ENTITY COUNTS ──
-                if device_id:
-                    if device_id not in device_entity_counts:
-                        device_entity_counts[device_id] = {
-                            "total": 0,
-                            "unavailable": 0,
-                            "device_name": device_name,
-                            "area_name": area_name,
-                            "entities": [],
-                        }
-                    device_entity_counts[device_id]["total"] += 1
-
-                    if state.state in UNAVAILABLE_STATES:
-                        device_entity_counts[device_id]["unavailable"] += 1
-                        device_entity_counts[device_id]["entities"].append({
-                            "entity_id": entity_id,
-                            "name": state.name or entity_id,
-                            "domain": domain,
-                            "state": state.state,
-                        })
-
-                # ── 2. STANDALONE ENTITY UNAVAILABILITY ──
-                if not device_id and state.state in UNAVAILABLE_STATES:
-                    now = dt_util.utcnow()
-                    if entity_id not in self.unavailable_tracking:
-                        self.unavailable_tracking[entity_id] = {
-                            "since": now,
-                            "entity_id": entity_id,
-                            "name": state.name or entity_id,
-                            "domain": domain,
-                        }
-
-                    since = self.unavailable_tracking[entity_id]["since"]
-                    duration = now - since
-                    duration_seconds = duration.total_seconds()
-
-                    if duration_seconds >= unavailable_critical:
-                        severity = SEVERITY_CRITICAL
-                    elif duration_seconds >= unavailable_warning:
-                        severity = SEVERITY_WARNING
-                    else:
-                        severity = SEVERITY_LOW
-
-                    current_unavailable_keys.add(device_key)
-
-                    unavailable_devices.append({
-                        "entity_id": entity_id,
-                        "name": state.name or entity_id,
-                        "domain": domain,
-                        "area": area_name,
-                        "device": device_name,
-                        "device_id": None,
-                        "device_key": device_key,
-                        "since": since,
-                        "duration_seconds": duration_seconds,
-                        "duration_human": self._format_duration(duration),
-                        "last_seen": since,
-                        "severity": severity,
-                        "integration": entity_entry.platform if entity_entry else "unknown",
-                    })
-                elif not device_id:
-                    self.unavailable_tracking.pop(entity_id, None)
-
-                # ── 3. BATTERY LEVEL ──
-                if self._is_battery_entity(entity_id, state.attributes):
-                    try:
-                        battery_level = float(state.state)
-                        if 0 <= battery_level <= 100:
-                            # Record battery reading for history
-                            self.device_history.record_battery_reading(device_key, int(battery_level))
-
-                            if battery_level < battery_low:
-                                severity = self._get_battery_severity(
-                                    battery_level, battery_critical, battery_warning, battery_low
-                                )
-                                dev_id = entity_entry.device_id if entity_entry else None
-                                if dev_id:
-                                    if dev_id not in low_battery_device_ids:
-                                        low_battery_device_ids.add(dev_id)
-                                        low_battery_devices.append({
-                                            "entity_id": entity_id,
-                                            "name": device_name or state.name or entity_id,
-                                            "battery_level": battery_level,
-                                            "severity": severity,
-                                            "area": area_name,
-                                            "device": device_name,
-                                            "device_id": dev_id,
-                                            "device_key": device_key,
-                                            "last_updated": state.last_updated,
-                                        })
-                                else:
-                                    low_battery_devices.append({
-                                        "entity_id": entity_id,
-                                        "name": state.name or entity_id,
-                                        "battery_level": battery_level,
-                                        "severity": severity,
-                                        "area": area_name,
-                                        "device": device_name,
-                                        "device_id": None,
-                                        "device_key": device_key,
-                                        "last_updated": state.last_updated,
-                                    })
-                    except (ValueError, TypeError):
-                        pass
-
-                # ── 4. SIGNAL STRENGTH ──
-                linkquality = state.attributes.get("linkquality")
-                if linkquality is not None:
-                    try:
-                        lqi = float(linkquality)
-                        # Record signal reading for history
-                        self.device_history.record_signal_reading(device_key, lqi)
-
-                        if lqi < linkquality_warning:
-                            severity = self._get_signal_severity(SIGNAL_TYPE_ZIGBEE, lqi, linkquality_warning)
-                            dev_id = entity_entry.device_id if entity_entry else None
-                            if dev_id:
-                                if dev_id not in weak_signal_device_ids:
-                                    weak_signal_device_ids.add(dev_id)
-                                    weak_signal_devices.append({
-                                        "entity_id": entity_id,
-                                        "name": device_name or state.name or entity_id,
-                                        "signal_type": SIGNAL_TYPE_ZIGBEE,
-                                        "linkquality": lqi,
-                                        "rssi": None,
-                                        "severity": severity,
-                                        "area": area_name,
-                                        "device": device_name,
-                                        "device_id": dev_id,
-                                        "device_key": device_key,
-                                    })
-                            else:
-                                weak_signal_devices.append({
-                                    "entity_id": entity_id,
-                                    "name": state.name or entity_id,
-                                    "signal_type": SIGNAL_TYPE_ZIGBEE,
-                                    "linkquality": lqi,
-                                    "rssi": None,
-                                    "severity": severity,
-                                    "area": area_name,
-                                    "device": device_name,
-                                    "device_id": None,
-                                    "device_key": device_key,
-                                })
-                    except (ValueError, TypeError):
-                        pass
-
-                rssi = state.attributes.get("rssi") or state.attributes.get("wifi_signal")
-                if rssi is not None:
-                    try:
-                        rssi_value = float(rssi)
-                        self.device_history.record_signal_reading(device_key, rssi_value)
-
-                        if rssi_value < rssi_warning:
-                            severity = self._get_signal_severity(SIGNAL_TYPE_WIFI, rssi_value, rssi_warning)
-                            dev_id = entity_entry.device_id if entity_entry else None
-                            if dev_id:
-                                if dev_id not in weak_signal_device_ids:
-                                    weak_signal_device_ids.add(dev_id)
-                                    weak_signal_devices.append({
-                                        "entity_id": entity_id,
-                                        "name": device_name or state.name or entity_id,
-                                        "signal_type": SIGNAL_TYPE_WIFI,
-                                        "linkquality": None,
-                                        "rssi": rssi_value,
-                                        "severity": severity,
-                                        "area": area_name,
-                                        "device": device_name,
-                                        "device_id": dev_id,
-                                        "device_key": device_key,
-                                    })
-                            else:
-                                weak_signal_devices.append({
-                                    "entity_id": entity_id,
-                                    "name": state.name or entity_id,
-                                    "signal_type": SIGNAL_TYPE_WIFI,
-                                    "linkquality": None,
-                                    "rssi": rssi_value,
-                                    "severity": severity,
-                                    "area": area_name,
-                                    "device": device_name,
-                                    "device_id": None,
-                                    "device_key": device_key,
-                                })
-                    except (ValueError, TypeError):
-                        pass
-
-            # ====== DEVICE-LEVEL UNAVAILABILITY ======
-            now = dt_util.utcnow()
-            for device_id, device_info in device_entity_counts.items():
-                if device_info["unavailable"] == device_info["total"] and device_info["unavailable"] > 0:
-                    first_entity = device_info["entities"][0] if device_info["entities"] else None
-                    if first_entity:
-                        entity_id = first_entity["entity_id"]
-                        device_key = device_id
-
-                        if entity_id not in self.unavailable_tracking:
-                            self.unavailable_tracking[entity_id] = {
-                                "since": now,
-                                "entity_id": entity_id,
-                                "name": first_entity["name"],
-                                "domain": first_entity["domain"],
-                            }
-
-                        since = self.unavailable_tracking[entity_id]["since"]
-                        duration = now - since
-                        duration_seconds = duration.total_seconds()
-
-                        if duration_seconds >= unavailable_critical:
-                            severity = SEVERITY_CRITICAL
-                        elif duration_seconds >= unavailable_warning:
-                            severity = SEVERITY_WARNING
-                        else:
-                            severity = SEVERITY_LOW
-
-                        current_unavailable_keys.add(device_key)
-
-                        unavailable_devices.append({
-                            "entity_id": entity_id,
-                            "name": device_info["device_name"] or first_entity["name"],
-                            "domain": first_entity["domain"],
-                            "area": device_info["area_name"],
-                            "device": device_info["device_name"],
-                            "device_id": device_id,
-                            "device_key": device_key,
-                            "since": since,
-                            "duration_seconds": duration_seconds,
-                            "duration_human": self._format_duration(duration),
-                            "last_seen": since,
-                            "severity": severity,
-                            "integration": "multiple",
-                            "unavailable_count": device_info["unavailable"],
-                            "total_count": device_info["total"],
-                        })
-                else:
-                    for entity_info in device_info["entities"]:
-                        self.unavailable_tracking.pop(entity_info["entity_id"], None)
+            # Processed in time-bounded slices so large scans don't stall the event loop
+            slicer = _ScanSlicer(self._get_config_value(CONF_SCAN_SLICE_MS, DEFAULT_SCAN_SLICE_MS))
+            touched_keys: set[str] = set()
+            if (
+                self._get_config_value(CONF_CLASSIFY_IN_EXECUTOR, DEFAULT_CLASSIFY_IN_EXECUTOR)
+                and len(dirty_entities) >= CLASSIFY_EXECUTOR_MIN_ENTITIES
+            ):
+                await self._async_classify_in_executor(dirty_entities, cfg, slicer, touched_keys)
+            else:
+                classified = 0
+                for entity_id in dirty_entities:
+                    record = self._classify_entity(entity_id, cfg)
+                    self._apply_entity(entity_id, record, touched_keys)
+                    if record is not None:
+                        classified += 1
+                    if slicer.due():
+                        await slicer.next_slice()
+                profile.count(COUNTER_CLASSIFIED, classified)
+            if self._reevaluate_all:
+                # Thresholds changed: rebuild every device's results from the cache
+                self._reevaluate_all = False
+                touched_keys.update(self._key_members)
+            profile.mark(PHASE_CLASSIFY)
+
+            # ====== PATCH DEVICE RESULTS ======
+            flaky_tracker = self.device_history.flaky
+            for key in touched_keys:
+                self._evaluate_key(key, cfg)
+                flaky_tracker.set_monitored(key, key in self._key_members)
+                if slicer.due():
+                    await slicer.next_slice()
+            profile.count(COUNTER_DEVICES, len(touched_keys))
+            profile.mark(PHASE_EVALUATE)
+
+            all_monitored_device_keys = self._key_members.keys()
+            current_unavailable_keys = set(self._unavailable_records)
+
+            # ====== UNAVAILABLE DURATION & SEVERITY ======
+            self._refresh_unavailable_records(cfg, dt_util.utcnow())
+
+            unavailable_devices = list(self._unavailable_records.values())
+            low_battery_devices = list(self._battery_records.values())
+            weak_signal_devices = list(self._signal_records.values())
+            profile.mark(PHASE_SEVERITY)
 
             # ====== RECORD HISTORY EVENTS ======
             newly_offline = current_unavailable_keys - self._previous_unavailable_keys
@@ -728,69 +1311,75 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
 
             for key in newly_offline:
                 self.device_history.record_offline_event(key)
+                if slicer.due():
+                    await slicer.next_slice()
             for key in newly_online:
                 self.device_history.record_online_event(key)
+                if slicer.due():
+                    await slicer.next_slice()
 
             self._previous_unavailable_keys = current_unavailable_keys
-
-            # ====== FLAKY DEVICE DETECTION ======
-            flaky_devices = []
-            flaky_device_keys = set()
-            offline_counts = {}
-
-            for device_key in all_monitored_device_keys:
-                count = self.device_history.get_offline_event_count(device_key, 30)
-                if count > 0:
-                    offline_counts[device_key] = count
-
-            if offline_counts:
-                counts = list(offline_counts.values())
-                mean_count = statistics.mean(counts)
-                stddev_count = statistics.pstdev(counts) if len(counts) > 1 else 0.0
-                threshold = mean_count + FLAKY_STDDEV_MULTIPLIER * stddev_count
-
-                for device_key, count in offline_counts.items():
-                    if count > threshold and count >= FLAKY_MIN_EVENTS:
-                        flaky_device_keys.add(device_key)
-                        # Find device info from unavailable list or create entry
-                        device_info = None
-                        for d in unavailable_devices:
-                            if d.get("device_key") == device_key:
-                                device_info = d
-                                break
-                        flaky_devices.append({
-                            "device_key": device_key,
-                            "offline_count_30d": count,
-                            "name": device_info["name"] if device_info else device_key,
-                            "area": device_info.get("area") if device_info else None,
-                        })
-
-            # ====== BATTERY PREDICTIONS ======
+            profile.count(COUNTER_HISTORY_WRITES, self.device_history.write_count - history_writes)
+            profile.mark(PHASE_HISTORY)
+
+            # ====== FLAKY DEVICE DETECTION (analytics) ======
+            if analytics_due:
+                flaky_tracker.expire(time.time())
+                flaky_devices = []
+                for device_key in flaky_tracker.flaky_keys():
+                    name, area = self.describe_device_key(device_key)
+                    flaky_devices.append({
+                        "device_key": device_key,
+                        "offline_count_30d": flaky_tracker.count(device_key),
+                        "name": name,
+                        "area": area,
+                    })
+                flaky_devices.sort(key=lambda x: (-x["offline_count_30d"], x["device_key"]))
+                self._flaky_devices = flaky_devices
+                self._flaky_device_keys = {dev["device_key"] for dev in flaky_devices}
+                profile.mark(PHASE_FLAKY)
+            flaky_devices = self._flaky_devices
+            flaky_device_keys = self._flaky_device_keys
+
+            # ====== BATTERY PREDICTIONS (analytics, cached between) ======
+            if analytics_due:
+                self._battery_predictions = {}
+                for dev in low_battery_devices:
+                    dk = dev.get("device_key")
+                    if dk:
+                        prediction = self.device_history.predict_battery(dk)
+                        if prediction is not None:
+                            self._battery_predictions[dk] = prediction
             battery_predictions = {}
             for dev in low_battery_devices:
-                dk = dev.get("device_key")
-                if dk:
-                    days = self.device_history.predict_battery_days(dk)
-                    if days is not None:
-                        battery_predictions[dk] = days
-                        dev["days_remaining"] = days
+                prediction = self._battery_predictions.get(dev.get("device_key"))
+                if prediction is not None:
+                    battery_predictions[dev["device_key"]] = prediction["days"]
+                    dev["days_remaining"] = prediction["days"]
+                    dev["days_remaining_range"] = [prediction["low"], prediction["high"]]
+                    dev["prediction_confidence"] = prediction["confidence"]
+                else:
+                    dev.pop("days_remaining", None)
+                    dev.pop("days_remaining_range", None)
+                    dev.pop("prediction_confidence", None)
+            profile.mark(PHASE_PREDICTIONS)
 
-            # ====== HEALTH SCORE ======
-            total_monitored = len(all_monitored_device_keys)
-            if total_monitored > 0:
-                unavailable_ratio = len(current_unavailable_keys) / total_monitored
-                low_battery_ratio = len(low_battery_devices) / total_monitored
-                weak_signal_ratio = len(weak_signal_devices) / total_monitored
-                flaky_ratio = len(flaky_device_keys) / total_monitored
-            else:
-                unavailable_ratio = low_battery_ratio = weak_signal_ratio = flaky_ratio = 0.0
+            if slicer.over_budget():
+                await slicer.next_slice()
+            self._sync_issue_index(flaky_devices)
 
-            health_score = 100.0
-            health_score -= unavailable_ratio * 100 * HEALTH_WEIGHT_UNAVAILABLE
-            health_score -= low_battery_ratio * 100 * HEALTH_WEIGHT_BATTERY
-            health_score -= weak_signal_ratio * 100 * HEALTH_WEIGHT_SIGNAL
-            health_score -= flaky_ratio * 100 * HEALTH_WEIGHT_FLAKY
-            health_score = max(0, round(health_score))
+            # ====== HEALTH SCORE ======
+            health_score = self._health_score(
+                len(all_monitored_device_keys),
+                len(current_unavailable_keys),
+                len(low_battery_devices),
+                len(weak_signal_devices),
+                len(flaky_device_keys),
+            )
+            if analytics_due:
+                self._group_rollups = self._compute_group_rollups(flaky_device_keys)
+                self._last_analytics = time.monotonic()
+                self._analytics_updated = dt_util.utcnow()
 
             # ====== SORT RESULTS ======
             unavailable_devices.sort(key=lambda x: x["duration_seconds"], reverse=True)
@@ -805,29 +1394,18 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             self.weak_signal_devices = weak_signal_devices
 
             # ====== SUMMARY STATS ======
-            total_entities = len(list(self.hass.states.async_entity_ids()))
+            total_entities = self.hass.states.async_entity_ids_count()
             unavailable_count = len(unavailable_devices)
             low_battery_count = len(low_battery_devices)
             weak_signal_count = len(weak_signal_devices)
             flaky_count = len(flaky_devices)
 
-            critical_count = sum(
-                1 for d in unavailable_devices if d["severity"] == SEVERITY_CRITICAL
-            ) + sum(
-                1 for d in low_battery_devices if d["severity"] == SEVERITY_CRITICAL
-            ) + sum(
-                1 for d in weak_signal_devices if d["severity"] == SEVERITY_CRITICAL
-            )
-
-            warning_count = sum(
-                1 for d in unavailable_devices if d["severity"] == SEVERITY_WARNING
-            ) + sum(
-                1 for d in low_battery_devices if d["severity"] == SEVERITY_WARNING
-            ) + sum(
-                1 for d in weak_signal_devices if d["severity"] == SEVERITY_WARNING
+            critical_count, warning_count = self._count_severities(
+                unavailable_devices, low_battery_devices, weak_signal_devices
             )
 
             healthy_count = total_entities - unavailable_count
+            profile.mark(PHASE_INDEX)
 
             end_time = dt_util.utcnow()
             scan_duration = (end_time - start_time).total_seconds()
@@ -853,28 +1431,58 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
                 "flaky_device_keys": flaky_device_keys,
                 "flaky_count": flaky_count,
                 "battery_predictions": battery_predictions,
+                "group_rollups": self._group_rollups,
+                "analytics_updated": self._analytics_updated,
                 "last_update": end_time,
                 "scan_duration": scan_duration,
+                "scan_mode": "full" if full_scan else "incremental",
+                "entities_scanned": len(dirty_entities),
+                "scan_slices": slicer.slices,
+                "stale": False,
             }
 
             # ====== PERSIST DATA ======
-            await self.async_save_unavailable_data()
-            self.device_history.purge_old_data(retention_days)
-            await self.device_history.async_save()
+            # Stores are marked dirty where they change and written behind by
+            # the persistence manager; purge runs in housekeeping
+            if self.device_history.is_dirty:
+                self.persistence.mark_dirty(PERSIST_HISTORY)
+            profile.slices = slicer.slices
+            self.scan_stats.add(profile)
+            # Incremental scans that touch nothing keep the last throughput
+            eps = profile.entities_per_second
+            if eps is None and self.data:
+                eps = self.data.get("entities_per_second")
+            result["entities_per_second"] = eps
 
             _LOGGER.info(
-                "Scan complete: %d unavailable, %d low battery, %d weak signal, "
-                "%d flaky, health=%d (%.2fs)",
+                "Scan complete (%s%s, %d entities, %d slices): %d unavailable, "
+                "%d low battery, %d weak signal, %d flaky, health=%d (%.2fs)",
+                result["scan_mode"], " + analytics" if analytics_due else "",
+                len(dirty_entities), slicer.slices,
                 unavailable_count, low_battery_count, weak_signal_count,
                 flaky_count, health_score, scan_duration
             )
+            _LOGGER.debug(
+                "Scan phases (ms): %s",
+                ", ".join(f"{name}={value * 1000:.1f}" for name, value in profile.phases.items()),
+            )
+
+            # First scan after startup: run housekeeping now rather than in an hour
+            if self.last_purge_ms is None:
+                self._async_housekeeping()
 
-            # ====== CHECK FOR UPDATES ======
-            await self._check_for_updates()
+            # The snapshot is saved now and then, and always on unload and HA stop
+            self._stale_data = None
+            now = time.monotonic()
+            if self._last_snapshot_mark is None or now - self._last_snapshot_mark >= SNAPSHOT_SAVE_INTERVAL:
+                self._last_snapshot_mark = now
+                self.persistence.mark_dirty(PERSIST_SNAPSHOT)
 
             return result
 
         except Exception as err:
+            # Partially applied results can't be trusted, so rebuild everything next time
+            self._full_scan_requested = True
             _LOGGER.error("Error updating Cardio4HA data: %s", err, exc_info=True)
             raise UpdateFailed(f"Error updating Cardio4HA data: {err}") from err
 
@@ -890,29 +1498,37 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             "name": name,
             "area": area,
         }
+        self._track_maintenance(device_key)
+        self._invalidate_exclusions([device_key])
         _LOGGER.info(
             "Device %s marked as maintenance for %d seconds (until %s)",
             device_key, duration_seconds, expires_at.isoformat()
         )
-        self.hass.async_create_task(self._async_save_maintenance_and_refresh())
+        self._async_maintenance_changed()
 
     def clear_maintenance(self, device_key: str) -> None:
         """Clear maintenance status for a device."""
         if device_key in self.maintenance_devices:
             del self.maintenance_devices[device_key]
+            self._untrack_maintenance(device_key)
+            self._invalidate_exclusions([device_key])
             _LOGGER.info("Device %s maintenance status cleared", device_key)
-            self.hass.async_create_task(self._async_save_maintenance_and_refresh())
+            self._async_maintenance_changed()
 
     def clear_all_maintenance(self) -> None:
         """Clear all maintenance status."""
+        self._invalidate_exclusions(self.maintenance_devices)
+        for device_key in self.maintenance_devices:
+            self._untrack_maintenance(device_key)
         self.maintenance_devices = {}
         _LOGGER.info("All maintenance status cleared")
-        self.hass.async_create_task(self._async_save_maintenance_and_refresh())
+        self._async_maintenance_changed()
 
-    async def _async_save_maintenance_and_refresh(self) -> None:
-        """Save maintenance data and trigger a rescan."""
-        await self.async_save_maintenance_data()
-        await self.async_refresh()
+    @callback
+    def _async_maintenance_changed(self) -> None:
+        """Schedule a maintenance save and a rescan."""
+        self.persistence.mark_dirty(PERSIST_MAINTENANCE)
+        self.hass.async_create_task(self.async_request_refresh())
 
     # ==================== Ignore Mode ====================
 
@@ -923,28 +1539,33 @@ class Cardio4HACoordinator(DataUpdateCoordinator):
             "name": name,
             "area": area,
         }
+        self._invalidate_exclusions([device_key])
         _LOGGER.info("Device %s permanently ignored", device_key)
-        self.hass.async_create_task(self._async_save_ignore_and_refresh())
+        self._async_ignore_changed()
 
     def clear_ignore(self, device_key: str) -> None:
         """Clear ignore status for a device."""
         if device_key in self.ignored_devices:
             del self.ignored_devices[device_key]
+            self._invalidate_exclusions([device_key])
             _LOGGER.info("Device %s ignore status cleared", device_key)
-            self.hass.async_create_task(self._async_save_ignore_and_refresh())
+            self._async_ignore_changed()
 
     def clear_all_ignored(self) -> None:
         """Clear all ignored devices."""
+        self._invalidate_exclusions(self.ignored_devices)
         self.ignored_devices = {}
         _LOGGER.info("All ignored devices cleared")
-        self.hass.async_create_task(self._async_save_ignore_and_refresh())
+        self._async_ignore_changed()
 
-    async def _async_save_ignore_and_refresh(self) -> None:
-        """Save ignore data and trigger a rescan."""
-        await self.async_save_ignore_data()
-        await self.async_refresh()
+    @callback
+    def _async_ignore_changed(self) -> None:
+        """Schedule an ignore save and a rescan."""
+        self.persistence.mark_dirty(PERSIST_IGNORE)
+        self.hass.async_create_task(self.async_request_refresh())
 
     def force_scan(self) -> None:
         """Force an immediate scan."""
         _LOGGER.info("Force scan initiated")
+        self.request_full_scan()
         self.hass.async_create_task(self.async_refresh())
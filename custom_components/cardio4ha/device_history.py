@@ -1,203 +1,849 @@
 """Device history tracking for Cardio4HA with persistent storage."""
 from __future__ import annotations
 
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time as dt_time, timedelta
 import logging
 import math
 import time
 from typing import Any
+import zlib
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DEVICE_HISTORY_STORAGE_KEY,
     DEVICE_HISTORY_STORAGE_VERSION,
+    DEVICE_HISTORY_SHARDS,
     BATTERY_READING_INTERVAL,
+    READING_BATTERY,
+    BATTERY_PREDICTION_MAX_DAYS,
+    BATTERY_PREDICTION_WINDOW_DAYS,
+    BATTERY_PREDICTION_Z,
     MIN_BATTERY_READINGS_FOR_PREDICTION,
+    PREDICTION_CONFIDENCE_HIGH,
+    PREDICTION_CONFIDENCE_LOW,
+    PREDICTION_CONFIDENCE_MEDIUM,
+    TIMELINE_BUCKET_DAY,
+    TIMELINE_BUCKET_HOUR,
+    TIMELINE_BUCKET_WEEK,
     DEFAULT_HISTORY_RETENTION_DAYS,
+    DEFAULT_ROLLUP_RETENTION_DAYS,
+    FLAKY_WINDOW_DAYS,
+    HISTORY_EVENT_CAPACITY,
+    HISTORY_READING_CAPACITY,
 )
+from .flaky import FlakyTracker
+from .rollups import DailyRollups
 
 _LOGGER = logging.getLogger(__name__)
 
+# Event type codes stored in the events buffer
+EVENT_ONLINE = 0
+EVENT_OFFLINE = 1
+_EVENT_TYPES = {EVENT_ONLINE: "online", EVENT_OFFLINE: "offline"}
+_EVENT_CODES = {name: code for code, name in _EVENT_TYPES.items()}
+
+
+def timeline_edges(start: datetime, end: datetime, bucket: str) -> list[datetime]:
+    """Return bucket boundaries covering [start, end), aligned in local time.
+
+    The first edge is start floored to the local hour, midnight or Monday
+    midnight, and the last edge is the first boundary at or after end.
+    Boundaries are built from local calendar fields, so days stay aligned to
+    midnight across DST changes.
+    """
+    local_start = dt_util.as_local(start)
+    local_end = dt_util.as_local(end)
+    if bucket == TIMELINE_BUCKET_HOUR:
+        # Hours are fixed-length, so step in UTC to get DST hours right
+        edge = dt_util.as_utc(local_start.replace(minute=0, second=0, microsecond=0))
+        step = timedelta(hours=1)
+        edges = [edge]
+        while edge < end:
+            edge += step
+            edges.append(edge)
+        return [dt_util.as_local(e) for e in edges]
+
+    day = local_start.date()
+    if bucket == TIMELINE_BUCKET_WEEK:
+        day -= timedelta(days=day.weekday())
+        step_days = 7
+    else:
+        step_days = 1
+    tz = local_start.tzinfo
+    edges = [datetime.combine(day, dt_time(), tzinfo=tz)]
+    while edges[-1] < local_end:
+        day += timedelta(days=step_days)
+        edges.append(datetime.combine(day, dt_time(), tzinfo=tz))
+    return edges
+
+
+def _uptime_pcts(edges: list[datetime], offline: list[float], now: float) -> list[float]:
+    """Return uptime percentages per bucket, counting only elapsed time."""
+    result = []
+    for i, offline_seconds in enumerate(offline):
+        start_ts = edges[i].timestamp()
+        elapsed = min(edges[i + 1].timestamp(), now) - start_ts
+        uptime_pct = (
+            max(0.0, min(100.0, 100.0 * (1.0 - offline_seconds / elapsed)))
+            if elapsed > 0 else 100.0
+        )
+        result.append(round(uptime_pct, 1))
+    return result
+
+
+def _sweep_offline(
+    events: RingBuffer | None, edges: list[float], now: float
+) -> tuple[list[float], list[int]]:
+    """Split offline time and event counts across buckets in one pass.
+
+    Returns per-bucket offline seconds and transition counts for the buckets
+    between consecutive edges. Time after `now` is never counted as offline.
+    """
+    buckets = len(edges) - 1
+    offline = [0.0] * buckets
+    counts = [0] * buckets
+    if buckets <= 0 or not events:
+        return offline, counts
+
+    range_start, range_end = edges[0], edges[-1]
+    # State at the start of the range comes from the last earlier event
+    first = events.bisect(range_start)
+    is_offline = first > 0 and events.at(first - 1)[1] == EVENT_OFFLINE
+
+    i = 0
+    cursor = range_start
+
+    def add_offline(until: float) -> None:
+        """Add [cursor, until) to the buckets it overlaps."""
+        nonlocal i, cursor
+        while cursor < until:
+            bucket_end = edges[i + 1]
+            step_end = min(bucket_end, until)
+            offline[i] += step_end - cursor
+            cursor = step_end
+            if cursor >= bucket_end and i < buckets - 1:
+                i += 1
+
+    for ts, code in events.items(range_start):
+        if ts >= range_end:
+            break
+        if is_offline:
+            add_offline(ts)
+        else:
+            while edges[i + 1] <= ts:
+                i += 1
+            cursor = ts
+        counts[i] += 1
+        is_offline = code == EVENT_OFFLINE
+
+    if is_offline:
+        add_offline(min(range_end, now))
+    return offline, counts
+
+
+class RingBuffer:
+    """Fixed-capacity time series stored in two typed arrays.
+
+    Timestamps live in an array('d') and values in an array of the given
+    typecode. The arrays grow until capacity is reached; after that each
+    append overwrites the oldest entry. Entries are kept in time order, so
+    lookups by time use binary search over the logical (oldest-first) index.
+    """
+
+    __slots__ = ("capacity", "_ts", "_values", "_start")
+
+    def __init__(self, typecode: str, capacity: int) -> None:
+        """Initialize an empty buffer."""
+        self.capacity = capacity
+        self._ts = array("d")
+        self._values = array(typecode)
+        # Physical index of the oldest entry once the buffer has wrapped
+        self._start = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        return len(self._ts)
+
+    def copy(self) -> RingBuffer:
+        """Return an independent copy."""
+        other = RingBuffer(self._values.typecode, self.capacity)
+        other._ts = array("d", self._ts)
+        other._values = array(self._values.typecode, self._values)
+        other._start = self._start
+        return other
+
+    def _index(self, i: int) -> int:
+        """Map a logical (oldest-first) index to a physical one."""
+        return (self._start + i) % len(self._ts)
+
+    def append(self, ts: float, value: float) -> None:
+        """Append an entry, overwriting the oldest one when full."""
+        if len(self._ts) < self.capacity:
+            self._ts.append(ts)
+            self._values.append(value)
+            return
+        self._ts[self._start] = ts
+        self._values[self._start] = value
+        self._start = (self._start + 1) % self.capacity
+
+    def at(self, i: int) -> tuple[float, Any]:
+        """Return the (ts, value) entry at a logical (oldest-first) index."""
+        j = self._index(i)
+        return self._ts[j], self._values[j]
+
+    def last(self) -> tuple[float, Any] | None:
+        """Return the newest (ts, value) entry."""
+        if not self._ts:
+            return None
+        i = self._index(len(self._ts) - 1)
+        return self._ts[i], self._values[i]
+
+    def first_ts(self) -> float | None:
+        """Return the oldest timestamp."""
+        if not self._ts:
+            return None
+        return self._ts[self._start]
+
+    def bisect(self, cutoff: float) -> int:
+        """Return the logical index of the first entry with ts >= cutoff."""
+        lo, hi = 0, len(self._ts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts[self._index(mid)] < cutoff:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def items(self, since: float | None = None) -> Iterator[tuple[float, Any]]:
+        """Yield (ts, value) entries oldest first, optionally from a cutoff."""
+        n = len(self._ts)
+        first = self.bisect(since) if since is not None else 0
+        ts, values = self._ts, self._values
+        for i in range(first, n):
+            j = (self._start + i) % n
+            yield ts[j], values[j]
+
+    def drop_before(self, cutoff: float) -> int:
+        """Remove entries older than cutoff and return how many were removed."""
+        first_ts = self.first_ts()
+        if first_ts is None or first_ts >= cutoff:
+            return 0
+        removed = self.bisect(cutoff)
+        ts = self._ts[self._start:] + self._ts[:self._start]
+        values = self._values[self._start:] + self._values[:self._start]
+        self._ts = ts[removed:]
+        self._values = values[removed:]
+        self._start = 0
+        return removed
+
+    def as_dict(self) -> dict[str, list]:
+        """Return a JSON-serializable columnar copy."""
+        ts = self._ts[self._start:] + self._ts[:self._start]
+        values = self._values[self._start:] + self._values[:self._start]
+        return {"ts": ts.tolist(), "v": values.tolist()}
+
+    def load(self, stored: dict[str, list] | list[dict], value_key: str) -> None:
+        """Fill the buffer from columnar storage or the legacy list of dicts."""
+        if isinstance(stored, dict):
+            pairs = zip(stored.get("ts", []), stored.get("v", []))
+        else:
+            pairs = ((item["ts"], item[value_key]) for item in stored)
+        for ts, value in pairs:
+            self.append(ts, value)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the bytes used by the underlying arrays."""
+        return (
+            self._ts.buffer_info()[1] * self._ts.itemsize
+            + self._values.buffer_info()[1] * self._values.itemsize
+        )
+
+
+class _BatteryFit:
+    """Running least-squares sums over the newest battery readings.
+
+    Covers the newest `n` entries of the battery buffer that fall inside the
+    prediction window. Times are kept in days relative to `origin` so the
+    squared sums stay well conditioned. A new reading adds one term and
+    readings leaving the window subtract theirs, so a prediction is O(1) and
+    is cached until the sums change.
+    """
+
+    __slots__ = ("n", "origin", "st", "sv", "stt", "stv", "svv", "cached")
+
+    def __init__(self) -> None:
+        """Initialize empty sums."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every term."""
+        self.n = 0
+        self.origin = 0.0
+        self.st = self.sv = self.stt = self.stv = self.svv = 0.0
+        self.cached: dict[str, Any] | None = None
+
+    def add(self, ts: float, level: float) -> None:
+        """Add a reading."""
+        if not self.n:
+            self.reset()
+            self.origin = ts
+        t = (ts - self.origin) / 86400
+        self.n += 1
+        self.st += t
+        self.sv += level
+        self.stt += t * t
+        self.stv += t * level
+        self.svv += level * level
+        self.cached = None
+
+    def remove(self, ts: float, level: float) -> None:
+        """Subtract a reading previously added."""
+        t = (ts - self.origin) / 86400
+        self.n -= 1
+        self.st -= t
+        self.sv -= level
+        self.stt -= t * t
+        self.stv -= t * level
+        self.svv -= level * level
+        self.cached = None
+
+    def expire(self, buffer: RingBuffer, cutoff: float) -> None:
+        """Subtract covered readings older than cutoff."""
+        first = len(buffer) - self.n
+        while self.n:
+            ts, level = buffer.at(first)
+            if ts >= cutoff:
+                break
+            self.remove(ts, level)
+            first += 1
+
+    def rebuild(self, buffer: RingBuffer, cutoff: float) -> None:
+        """Recompute the sums from the buffer readings newer than cutoff."""
+        self.reset()
+        for ts, level in buffer.items(cutoff):
+            self.add(ts, level)
+
+    def predict(self, current_level: float) -> dict[str, Any] | None:
+        """Fit level = slope * t + intercept and extrapolate to 0%."""
+        n = self.n
+        if n < MIN_BATTERY_READINGS_FOR_PREDICTION:
+            return None
+        sxx = self.stt - self.st * self.st / n
+        if sxx <= 0:
+            return None
+        sxy = self.stv - self.st * self.sv / n
+        slope = sxy / sxx  # level change per day
+        if slope >= -1e-9:
+            # Battery not draining (tolerate rounding left over by the running sums)
+            return None
+        if current_level <= 0:
+            return {"days": 0, "low": 0, "high": 0, "confidence": PREDICTION_CONFIDENCE_HIGH}
+
+        # Residual standard error of the slope for an approximate 95% interval
+        syy = self.svv - self.sv * self.sv / n
+        sse = max(0.0, syy - slope * sxy)
+        slope_se = math.sqrt(sse / (n - 2) / sxx) if n > 2 else 0.0
+        steep = slope - BATTERY_PREDICTION_Z * slope_se
+        shallow = slope + BATTERY_PREDICTION_Z * slope_se
+
+        days = min(int(-current_level / slope), BATTERY_PREDICTION_MAX_DAYS)
+        low = min(int(-current_level / steep), BATTERY_PREDICTION_MAX_DAYS)
+        high = (
+            min(int(-current_level / shallow), BATTERY_PREDICTION_MAX_DAYS)
+            if shallow < 0 else BATTERY_PREDICTION_MAX_DAYS
+        )
+        spread = (high - low) / max(days, 1)
+        if spread <= 0.5:
+            confidence = PREDICTION_CONFIDENCE_HIGH
+        elif spread <= 1.0:
+            confidence = PREDICTION_CONFIDENCE_MEDIUM
+        else:
+            confidence = PREDICTION_CONFIDENCE_LOW
+        return {"days": days, "low": low, "high": high, "confidence": confidence}
+
+
+class _DeviceSeries:
+    """History buffers for a single device."""
+
+    __slots__ = ("events", "battery", "signal", "battery_fit", "rollups")
+
+    def __init__(self) -> None:
+        """Initialize empty buffers."""
+        self.events = RingBuffer("b", HISTORY_EVENT_CAPACITY)
+        self.battery = RingBuffer("b", HISTORY_READING_CAPACITY)
+        self.signal = RingBuffer("f", HISTORY_READING_CAPACITY)
+        self.battery_fit = _BatteryFit()
+        self.rollups = DailyRollups()
+
+    def __bool__(self) -> bool:
+        """Return True if any buffer or rollup holds data."""
+        return bool(
+            len(self.events) or len(self.battery) or len(self.signal) or len(self.rollups)
+        )
+
+    def timeline_snapshot(self) -> _DeviceSeries:
+        """Return a copy of the events and rollups that timelines read."""
+        series = _DeviceSeries()
+        series.events = self.events.copy()
+        series.rollups = self.rollups.copy()
+        return series
+
+    def first_day(self) -> int | None:
+        """Return the local day ordinal of the oldest raw entry."""
+        first = [
+            ts for ts in (buf.first_ts() for buf in (self.events, self.battery, self.signal))
+            if ts is not None
+        ]
+        if not first:
+            return None
+        return dt_util.as_local(dt_util.utc_from_timestamp(min(first))).date().toordinal()
+
+    def as_dict(self) -> dict[str, dict[str, list]]:
+        """Return a JSON-serializable copy."""
+        return {
+            "events": self.events.as_dict(),
+            "battery_readings": self.battery.as_dict(),
+            "signal_readings": self.signal.as_dict(),
+            "daily": self.rollups.as_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict[str, Any]) -> _DeviceSeries:
+        """Restore buffers from storage (columnar or legacy layout)."""
+        series = cls()
+        events = stored.get("events", [])
+        if isinstance(events, list):
+            # Legacy layout stores event types as strings
+            events = [
+                {"ts": e["ts"], "v": _EVENT_CODES.get(e["type"], EVENT_ONLINE)} for e in events
+            ]
+        series.events.load(events, "v")
+        series.battery.load(stored.get("battery_readings", []), "level")
+        series.signal.load(stored.get("signal_readings", []), "value")
+        series.rollups.load(stored.get("daily", {}))
+        series.battery_fit.rebuild(
+            series.battery, time.time() - BATTERY_PREDICTION_WINDOW_DAYS * 86400
+        )
+        return series
+
 
 class DeviceHistory:
-    """Manages persistent device event history using HA Store API."""
+    """Manages persistent device event history using HA Store API.
+
+    Devices are spread over DEVICE_HISTORY_SHARDS stores by a CRC32 of their
+    key, and only shards touched since the last save are written.
+    """
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize device history."""
         self._hass = hass
-        self._store = Store(hass, DEVICE_HISTORY_STORAGE_VERSION, DEVICE_HISTORY_STORAGE_KEY)
-        self._data: dict[str, dict[str, Any]] = {}
-        self._dirty = False
+        self._stores = [
+            Store(hass, DEVICE_HISTORY_STORAGE_VERSION, f"{DEVICE_HISTORY_STORAGE_KEY}.{shard}")
+            for shard in range(DEVICE_HISTORY_SHARDS)
+        ]
+        self._data: dict[str, _DeviceSeries] = {}
+        self._shard_keys: list[set[str]] = [set() for _ in range(DEVICE_HISTORY_SHARDS)]
+        self._dirty_shards: set[int] = set()
+        # Writes since startup, for scan profiling
+        self.write_count = 0
+        # Sliding-window offline counts, kept in step with the events buffers
+        self.flaky = FlakyTracker()
+        # Local day ordinal through which every device has been rolled up
+        self._closed_through: int | None = None
+
+    @property
+    def is_dirty(self) -> bool:
+        """Return True if any shard has unsaved changes."""
+        return bool(self._dirty_shards)
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of devices with history."""
+        return len(self._data)
+
+    @staticmethod
+    def _shard_of(device_key: str) -> int:
+        """Return the shard index a device is stored in."""
+        return zlib.crc32(device_key.encode()) % DEVICE_HISTORY_SHARDS
+
+    def _mark_dirty(self, device_key: str) -> None:
+        """Flag the shard holding a device for the next save."""
+        self._dirty_shards.add(self._shard_of(device_key))
+        self.write_count += 1
+
+    def _load_devices(self, devices: dict[str, Any]) -> None:
+        """Add stored devices to the in-memory history."""
+        for device_key, device in devices.items():
+            self._data[device_key] = _DeviceSeries.from_dict(device)
+            self._shard_keys[self._shard_of(device_key)].add(device_key)
 
     async def async_load(self) -> None:
         """Load history data from storage."""
+        self._data = {}
+        self._shard_keys = [set() for _ in range(DEVICE_HISTORY_SHARDS)]
+        self._dirty_shards = set()
         try:
-            stored = await self._store.async_load()
-            if stored and isinstance(stored, dict):
-                self._data = stored.get("devices", {})
-                _LOGGER.info("Loaded device history for %d devices", len(self._data))
-            else:
-                self._data = {}
+            found = False
+            for store in self._stores:
+                stored = await store.async_load()
+                if stored and isinstance(stored, dict):
+                    found = True
+                    self._load_devices(stored.get("devices", {}))
+            if not found:
+                await self._async_migrate_single_file()
+            window_start = time.time() - FLAKY_WINDOW_DAYS * 86400
+            self.flaky.load(
+                (ts, device_key)
+                for device_key, device in self._data.items()
+                for ts, code in device.events.items(window_start)
+                if code == EVENT_OFFLINE
+            )
+            _LOGGER.info("Loaded device history for %d devices", len(self._data))
         except Exception as err:
             _LOGGER.error("Error loading device history: %s", err)
             self._data = {}
+            self._shard_keys = [set() for _ in range(DEVICE_HISTORY_SHARDS)]
 
-    async def async_save(self) -> None:
-        """Save history data to storage if dirty."""
-        if not self._dirty:
+    async def _async_migrate_single_file(self) -> None:
+        """Move history from the pre-sharding single store into the shards."""
+        legacy = Store(self._hass, DEVICE_HISTORY_STORAGE_VERSION, DEVICE_HISTORY_STORAGE_KEY)
+        stored = await legacy.async_load()
+        if not stored or not isinstance(stored, dict):
             return
-        try:
-            await self._store.async_save({"devices": self._data})
-            self._dirty = False
-            _LOGGER.debug("Saved device history for %d devices", len(self._data))
-        except Exception as err:
-            _LOGGER.error("Error saving device history: %s", err)
 
-    def _ensure_device(self, device_key: str) -> dict:
+        self._load_devices(stored.get("devices", {}))
+        self._dirty_shards = {
+            shard for shard, keys in enumerate(self._shard_keys) if keys
+        }
+        # Only drop the old file once every shard has been written
+        if await self.async_save():
+            await legacy.async_remove()
+            _LOGGER.info(
+                "Migrated device history for %d devices to %d shards",
+                len(self._data), DEVICE_HISTORY_SHARDS,
+            )
+
+    async def async_save(self) -> bool:
+        """Save shards changed since the last save. Returns True if all succeeded."""
+        if not self._dirty_shards:
+            return True
+        ok = True
+        data = self._data
+        for shard in sorted(self._dirty_shards):
+            try:
+                await self._stores[shard].async_save({
+                    "devices": {
+                        device_key: data[device_key].as_dict()
+                        for device_key in self._shard_keys[shard]
+                    }
+                })
+                self._dirty_shards.discard(shard)
+            except Exception as err:
+                ok = False
+                _LOGGER.error("Error saving device history shard %d: %s", shard, err)
+        _LOGGER.debug("Saved device history for %d devices", len(self._data))
+        return ok
+
+    def _ensure_device(self, device_key: str) -> _DeviceSeries:
         """Ensure device entry exists and return it."""
-        if device_key not in self._data:
-            self._data[device_key] = {
-                "events": [],
-                "battery_readings": [],
-                "signal_readings": [],
-            }
-        return self._data[device_key]
+        device = self._data.get(device_key)
+        if device is None:
+            device = self._data[device_key] = _DeviceSeries()
+            self._shard_keys[self._shard_of(device_key)].add(device_key)
+        return device
 
-    def record_offline_event(self, device_key: str) -> None:
-        """Record a device going offline."""
+    def _record_event(self, device_key: str, code: int, now: float | None) -> None:
+        """Record an online/offline transition, skipping repeats."""
         device = self._ensure_device(device_key)
-        now = time.time()
-        # Avoid duplicate offline events (check last event)
-        events = device["events"]
-        if events and events[-1]["type"] == "offline":
+        last = device.events.last()
+        if last and last[1] == code:
             return
-        events.append({"type": "offline", "ts": now})
-        self._dirty = True
+        if now is None:
+            now = time.time()
+        device.events.append(now, code)
+        if code == EVENT_OFFLINE:
+            self.flaky.add_event(device_key, now)
+        self._mark_dirty(device_key)
+
+    def record_offline_event(self, device_key: str, now: float | None = None) -> None:
+        """Record a device going offline."""
+        self._record_event(device_key, EVENT_OFFLINE, now)
 
-    def record_online_event(self, device_key: str) -> None:
+    def record_online_event(self, device_key: str, now: float | None = None) -> None:
         """Record a device coming back online."""
-        device = self._ensure_device(device_key)
-        now = time.time()
-        events = device["events"]
-        if events and events[-1]["type"] == "online":
-            return
-        events.append({"type": "online", "ts": now})
-        self._dirty = True
+        self._record_event(device_key, EVENT_ONLINE, now)
 
-    def record_battery_reading(self, device_key: str, level: int) -> None:
+    def record_battery_reading(self, device_key: str, level: int, now: float | None = None) -> None:
         """Record a battery level reading. Deduplicates: only if level changed or >1hr since last."""
         device = self._ensure_device(device_key)
-        readings = device["battery_readings"]
-        now = time.time()
+        if now is None:
+            now = time.time()
 
-        if readings:
-            last = readings[-1]
-            if last["level"] == level and (now - last["ts"]) < BATTERY_READING_INTERVAL:
-                return
+        battery = device.battery
+        last = battery.last()
+        if last and last[1] == level and (now - last[0]) < BATTERY_READING_INTERVAL:
+            return
 
-        readings.append({"ts": now, "level": level})
-        self._dirty = True
+        fit = device.battery_fit
+        if len(battery) == battery.capacity and fit.n == len(battery):
+            # The oldest reading is about to be overwritten while still covered
+            fit.remove(*battery.at(0))
+        battery.append(now, level)
+        fit.add(now, level)
+        self._mark_dirty(device_key)
 
-    def record_signal_reading(self, device_key: str, value: float) -> None:
+    def record_signal_reading(self, device_key: str, value: float, now: float | None = None) -> None:
         """Record a signal strength reading. Throttled to 1/hr/device."""
         device = self._ensure_device(device_key)
-        readings = device["signal_readings"]
-        now = time.time()
+        if now is None:
+            now = time.time()
 
-        if readings and (now - readings[-1]["ts"]) < BATTERY_READING_INTERVAL:
+        last = device.signal.last()
+        if last and (now - last[0]) < BATTERY_READING_INTERVAL:
             return
 
-        readings.append({"ts": now, "value": value})
-        self._dirty = True
+        device.signal.append(now, value)
+        self._mark_dirty(device_key)
+
+    def record_readings(self, readings: Iterable[tuple[str, str, float]]) -> None:
+        """Record a batch of (kind, device_key, value) readings in order.
+
+        Used to apply readings gathered off the event loop in one go; all
+        get the same timestamp.
+        """
+        now = time.time()
+        for kind, device_key, value in readings:
+            if kind == READING_BATTERY:
+                self.record_battery_reading(device_key, int(value), now)
+            else:
+                self.record_signal_reading(device_key, value, now)
 
     def get_device_timeline(self, device_key: str, days: int = 30) -> list[dict]:
         """Get daily uptime percentages for timeline visualization.
 
         Returns list of {date: "YYYY-MM-DD", uptime_pct: float, events: int}
-        for each day in the range.
+        for each local calendar day of the last `days` days, ending today.
         """
-        device = self._data.get(device_key)
-        if not device:
+        if device_key not in self._data:
             return []
-
+        end = dt_util.start_of_local_day() + timedelta(days=1)
+        start = end - timedelta(days=days)
+        return self.get_timeline(device_key, start, end, TIMELINE_BUCKET_DAY)
+
+    def get_timeline(
+        self,
+        device_key: str,
+        start: datetime,
+        end: datetime,
+        bucket: str = TIMELINE_BUCKET_DAY,
+    ) -> list[dict]:
+        """Get uptime per hour/day/week bucket between start and end.
+
+        Buckets are aligned to local midnight (weeks start on Monday). Each is
+        {date, start, uptime_pct, events, offline_seconds}; uptime of the
+        current bucket only counts the part that has already elapsed.
+        """
+        edges = timeline_edges(start, end, bucket)
         now = time.time()
-        cutoff = now - (days * 86400)
-        events = [e for e in device["events"] if e["ts"] >= cutoff]
-
-        if not events:
-            # No events = fully online for the period
-            return self._generate_empty_timeline(days)
-
-        # Build per-day stats
-        timeline = {}
-        for day_offset in range(days):
-            day_start = now - ((days - day_offset) * 86400)
-            day_end = day_start + 86400
-            date_str = self._ts_to_date(day_start)
-
-            day_events = [e for e in events if day_start <= e["ts"] < day_end]
-            event_count = len(day_events)
-
-            # Calculate offline seconds for this day
-            offline_seconds = self._calc_offline_seconds(events, day_start, day_end)
-            uptime_pct = max(0.0, min(100.0, 100.0 * (1.0 - offline_seconds / 86400.0)))
-
-            timeline[date_str] = {
-                "date": date_str,
-                "uptime_pct": round(uptime_pct, 1),
-                "events": event_count,
+        offline, counts = self._bucket_totals(self._data.get(device_key), edges, bucket, now)
+        uptime = _uptime_pcts(edges, offline, now)
+        return [
+            {
+                "date": bucket_start.date().isoformat(),
+                "start": bucket_start.isoformat(),
+                "uptime_pct": uptime[i],
+                "events": counts[i],
+                "offline_seconds": round(offline[i]),
             }
+            for i, bucket_start in enumerate(edges[:-1])
+        ]
+
+    def snapshot_timelines(self, device_keys: Iterable[str]) -> dict[str, _DeviceSeries | None]:
+        """Copy the timeline inputs of several devices for use off the event loop."""
+        data = self._data
+        return {
+            device_key: data[device_key].timeline_snapshot() if device_key in data else None
+            for device_key in device_keys
+        }
+
+    @classmethod
+    def fleet_timeline(
+        cls,
+        snapshot: dict[str, _DeviceSeries | None],
+        edges: list[datetime],
+        bucket: str,
+        now: float,
+    ) -> dict[str, Any]:
+        """Compute the timelines of a snapshot as one columnar result.
+
+        Pure function of its arguments, so it can run in the executor. Rows
+        of uptime_pct, events and offline_seconds follow device_keys, and
+        columns follow starts.
+        """
+        device_keys = list(snapshot)
+        uptime_rows = []
+        event_rows = []
+        offline_rows = []
+        for device_key in device_keys:
+            offline, counts = cls._bucket_totals(snapshot[device_key], edges, bucket, now)
+            uptime_rows.append(_uptime_pcts(edges, offline, now))
+            event_rows.append(counts)
+            offline_rows.append([round(v) for v in offline])
+        return {
+            "bucket": bucket,
+            "starts": [edge.isoformat() for edge in edges[:-1]],
+            "device_keys": device_keys,
+            "uptime_pct": uptime_rows,
+            "events": event_rows,
+            "offline_seconds": offline_rows,
+        }
 
-        return list(timeline.values())
-
-    def _calc_offline_seconds(self, events: list[dict], day_start: float, day_end: float) -> float:
-        """Calculate total offline seconds within a time window."""
-        offline_seconds = 0.0
-        # Find state at day_start by looking at events before this window
-        is_offline = False
-        for e in events:
-            if e["ts"] >= day_start:
-                break
-            is_offline = (e["type"] == "offline")
-
-        current_time = day_start
-        for e in events:
-            if e["ts"] >= day_end:
-                break
-            if e["ts"] < day_start:
+    @staticmethod
+    def _bucket_totals(
+        device: _DeviceSeries | None,
+        edges: list[datetime],
+        bucket: str,
+        now: float,
+    ) -> tuple[list[float], list[int]]:
+        """Return offline seconds and transitions per bucket.
+
+        Closed days are read from the daily rollups; only days without a
+        rollup (usually just today) are swept from the raw events.
+        """
+        if device is None:
+            return _sweep_offline(None, [edge.timestamp() for edge in edges], now)
+        if bucket == TIMELINE_BUCKET_HOUR or not device.rollups:
+            return _sweep_offline(device.events, [edge.timestamp() for edge in edges], now)
+
+        day_edges = edges if bucket == TIMELINE_BUCKET_DAY else timeline_edges(
+            edges[0], edges[-1], TIMELINE_BUCKET_DAY
+        )
+        day_ts = [edge.timestamp() for edge in day_edges]
+        days = len(day_edges) - 1
+        offline = [0.0] * days
+        counts = [0] * days
+        rollups = device.rollups
+        i = 0
+        while i < days:
+            rollup = rollups.get(day_edges[i].date().toordinal())
+            if rollup is not None:
+                offline[i] = rollup.offline_seconds
+                counts[i] = rollup.transitions
+                i += 1
                 continue
-
-            if is_offline:
-                offline_seconds += e["ts"] - current_time
-
-            current_time = e["ts"]
-            is_offline = (e["type"] == "offline")
-
-        # Handle remainder of day
-        if is_offline:
-            offline_seconds += min(day_end, time.time()) - current_time
-
-        return offline_seconds
-
-    def _generate_empty_timeline(self, days: int) -> list[dict]:
-        """Generate timeline with 100% uptime for all days."""
+            # Sweep the whole run of days that have no rollup at once
+            j = i + 1
+            while j < days and rollups.get(day_edges[j].date().toordinal()) is None:
+                j += 1
+            offline[i:j], counts[i:j] = _sweep_offline(device.events, day_ts[i:j + 1], now)
+            i = j
+
+        if bucket == TIMELINE_BUCKET_DAY:
+            return offline, counts
+
+        # Fold days into the coarser buckets
+        bucket_ts = [edge.timestamp() for edge in edges]
+        bucket_offline = [0.0] * (len(edges) - 1)
+        bucket_counts = [0] * (len(edges) - 1)
+        b = 0
+        for d in range(days):
+            while day_ts[d] >= bucket_ts[b + 1]:
+                b += 1
+            bucket_offline[b] += offline[d]
+            bucket_counts[b] += counts[d]
+        return bucket_offline, bucket_counts
+
+    def close_days(self) -> int:
+        """Roll up every device's closed local days. Returns rollups written."""
+        written = 0
+        for written in self.iter_close_days():
+            pass
+        return written
+
+    def iter_close_days(self) -> Iterator[int]:
+        """Roll up closed days one device per step, yielding the rollups written so far.
+
+        Devices are looked up as they are reached, so readings may be
+        recorded between steps.
+        """
+        today = dt_util.now().date().toordinal()
+        yesterday = today - 1
+        if self._closed_through == yesterday:
+            return
+        oldest = today - DEFAULT_ROLLUP_RETENTION_DAYS
         now = time.time()
-        result = []
-        for day_offset in range(days):
-            day_start = now - ((days - day_offset) * 86400)
-            result.append({
-                "date": self._ts_to_date(day_start),
-                "uptime_pct": 100.0,
-                "events": 0,
-            })
-        return result
+        written = 0
+        for device_key in list(self._data):
+            device = self._data.get(device_key)
+            if device is not None:
+                added = self._roll_device(device, max(oldest, 0), yesterday, now)
+                if added:
+                    written += added
+                    self._mark_dirty(device_key)
+            yield written
+        self._closed_through = yesterday
+        if written:
+            _LOGGER.debug("Wrote %d daily rollups", written)
 
     @staticmethod
-    def _ts_to_date(ts: float) -> str:
-        """Convert timestamp to YYYY-MM-DD string."""
-        import datetime
-        return datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+    def _roll_device(device: _DeviceSeries, oldest: int, through: int, now: float) -> int:
+        """Append rollups for the device's days after its last rollup up to `through`."""
+        if not (len(device.events) or len(device.battery) or len(device.signal)):
+            # Nothing left to roll up from; don't extend rollups of stale devices
+            return 0
+        last = device.rollups.last_day
+        first = last + 1 if last is not None else device.first_day()
+        if first is None:
+            return 0
+        first = max(first, oldest)
+        if first > through:
+            return 0
+
+        tz = dt_util.DEFAULT_TIME_ZONE
+        edges = [
+            datetime.combine(date.fromordinal(day), dt_time(), tzinfo=tz).timestamp()
+            for day in range(first, through + 2)
+        ]
+        offline, counts = _sweep_offline(device.events, edges, now)
+
+        days = len(edges) - 1
+        battery_min: list[int | None] = [None] * days
+        d = 0
+        for ts, level in device.battery.items(edges[0]):
+            if ts >= edges[-1]:
+                break
+            while ts >= edges[d + 1]:
+                d += 1
+            if battery_min[d] is None or level < battery_min[d]:
+                battery_min[d] = level
+
+        signal_sum = [0.0] * days
+        signal_n = [0] * days
+        d = 0
+        for ts, value in device.signal.items(edges[0]):
+            if ts >= edges[-1]:
+                break
+            while ts >= edges[d + 1]:
+                d += 1
+            signal_sum[d] += value
+            signal_n[d] += 1
+
+        for d in range(days):
+            device.rollups.append(
+                first + d,
+                offline[d],
+                counts[d],
+                battery_min[d],
+                signal_sum[d] / signal_n[d] if signal_n[d] else None,
+            )
+        return days
 
     def get_offline_event_count(self, device_key: str, days: int = 30) -> int:
         """Count offline events in the last N days."""
@@ -205,7 +851,7 @@ class DeviceHistory:
         if not device:
             return 0
         cutoff = time.time() - (days * 86400)
-        return sum(1 for e in device["events"] if e["ts"] >= cutoff and e["type"] == "offline")
+        return sum(1 for _, code in device.events.items(cutoff) if code == EVENT_OFFLINE)
 
     def get_battery_readings(self, device_key: str, days: int = 30) -> list[dict]:
         """Get battery readings for the last N days."""
@@ -213,7 +859,7 @@ class DeviceHistory:
         if not device:
             return []
         cutoff = time.time() - (days * 86400)
-        return [r for r in device["battery_readings"] if r["ts"] >= cutoff]
+        return [{"ts": ts, "level": level} for ts, level in device.battery.items(cutoff)]
 
     def get_signal_readings(self, device_key: str, days: int = 30) -> list[dict]:
         """Get signal readings for the last N days."""
@@ -221,87 +867,115 @@ class DeviceHistory:
         if not device:
             return []
         cutoff = time.time() - (days * 86400)
-        return [r for r in device["signal_readings"] if r["ts"] >= cutoff]
+        return [{"ts": ts, "value": value} for ts, value in device.signal.items(cutoff)]
 
-    def predict_battery_days(self, device_key: str) -> int | None:
-        """Predict days until battery reaches 0% using linear regression.
+    def predict_battery(self, device_key: str) -> dict[str, Any] | None:
+        """Predict when the battery reaches 0% using linear regression.
 
-        Returns None if insufficient data.
+        Returns {"days", "low", "high", "confidence"} where low/high bound an
+        approximate 95% interval from the fit residuals, or None if there is
+        not enough data or the battery is not draining.
         """
         device = self._data.get(device_key)
         if not device:
             return None
 
-        readings = device["battery_readings"]
-        if len(readings) < MIN_BATTERY_READINGS_FOR_PREDICTION:
-            return None
-
+        fit = device.battery_fit
         # Use last 30 days of readings
-        cutoff = time.time() - (30 * 86400)
-        recent = [r for r in readings if r["ts"] >= cutoff]
-        if len(recent) < MIN_BATTERY_READINGS_FOR_PREDICTION:
-            return None
-
-        # Linear regression: level = slope * time + intercept
-        times = [r["ts"] for r in recent]
-        levels = [r["level"] for r in recent]
-
-        n = len(times)
-        t_mean = sum(times) / n
-        v_mean = sum(levels) / n
-
-        numerator = sum((t - t_mean) * (v - v_mean) for t, v in zip(times, levels))
-        denominator = sum((t - t_mean) ** 2 for t in times)
+        fit.expire(device.battery, time.time() - BATTERY_PREDICTION_WINDOW_DAYS * 86400)
+        if fit.cached is None:
+            if fit.n < MIN_BATTERY_READINGS_FOR_PREDICTION:
+                return None
+            # Current level is the last reading
+            fit.cached = fit.predict(device.battery.last()[1]) or {}
+        return fit.cached or None
 
-        if denominator == 0:
-            return None
-
-        slope = numerator / denominator  # level change per second
+    def predict_battery_days(self, device_key: str) -> int | None:
+        """Predict days until battery reaches 0% using linear regression.
 
-        if slope >= 0:
-            # Battery not draining
-            return None
+        Returns None if insufficient data.
+        """
+        prediction = self.predict_battery(device_key)
+        return prediction["days"] if prediction else None
 
-        # Current level (use last reading)
-        current_level = recent[-1]["level"]
-        if current_level <= 0:
-            return 0
+    def purge_old_data(self, retention_days: int = DEFAULT_HISTORY_RETENTION_DAYS) -> None:
+        """Remove raw events older than retention period and expired rollups.
 
-        # Time to reach 0
-        seconds_remaining = -current_level / slope
-        days_remaining = int(seconds_remaining / 86400)
+        Closed days are rolled up first, so purged raw data is never lost from
+        the daily uptime history.
+        """
+        for _ in self.iter_purge(retention_days):
+            pass
 
-        # Sanity check: cap at 365 days
-        return min(days_remaining, 365)
+    def iter_purge(self, retention_days: int = DEFAULT_HISTORY_RETENTION_DAYS) -> Iterator[None]:
+        """Purge like purge_old_data, one device per step.
 
-    def purge_old_data(self, retention_days: int = DEFAULT_HISTORY_RETENTION_DAYS) -> None:
-        """Remove events older than retention period."""
+        The caller can yield to the event loop between steps; devices are
+        looked up as they are reached, so readings may be recorded meanwhile.
+        """
+        for _ in self.iter_close_days():
+            yield
         cutoff = time.time() - (retention_days * 86400)
-        keys_to_remove = []
+        oldest_day = dt_util.now().date().toordinal() - DEFAULT_ROLLUP_RETENTION_DAYS
+        removed_devices = 0
 
-        for device_key, device in self._data.items():
-            device["events"] = [e for e in device["events"] if e["ts"] >= cutoff]
-            device["battery_readings"] = [r for r in device["battery_readings"] if r["ts"] >= cutoff]
-            device["signal_readings"] = [r for r in device["signal_readings"] if r["ts"] >= cutoff]
+        for device_key in list(self._data):
+            yield
+            device = self._data.get(device_key)
+            if device is None:
+                continue
+            # Keep the last offline event before the cutoff: it still defines
+            # the state of a device that has been offline ever since
+            events = device.events
+            first_kept = events.bisect(cutoff)
+            events_cutoff = cutoff
+            if first_kept and events.at(first_kept - 1)[1] == EVENT_OFFLINE:
+                events_cutoff = events.at(first_kept - 1)[0]
+
+            battery_removed = device.battery.drop_before(cutoff)
+            if battery_removed and device.battery_fit.n > len(device.battery):
+                device.battery_fit.rebuild(
+                    device.battery, time.time() - BATTERY_PREDICTION_WINDOW_DAYS * 86400
+                )
+            removed = (
+                events.drop_before(events_cutoff)
+                + battery_removed
+                + device.signal.drop_before(cutoff)
+                + device.rollups.drop_before(oldest_day)
+            )
+            if removed:
+                self._mark_dirty(device_key)
 
             # Remove device entry if no data left
-            if not device["events"] and not device["battery_readings"] and not device["signal_readings"]:
-                keys_to_remove.append(device_key)
-
-        for key in keys_to_remove:
-            del self._data[key]
-
-        if keys_to_remove:
-            self._dirty = True
-            _LOGGER.debug("Purged history for %d devices with no recent data", len(keys_to_remove))
+            if not device:
+                del self._data[device_key]
+                self._shard_keys[self._shard_of(device_key)].discard(device_key)
+                removed_devices += 1
+
+        if removed_devices:
+            _LOGGER.debug("Purged history for %d devices with no recent data", removed_devices)
+
+    def memory_usage(self) -> int:
+        """Return the bytes held by all reading buffers."""
+        return sum(
+            device.events.nbytes + device.battery.nbytes + device.signal.nbytes
+            + device.rollups.nbytes
+            for device in self._data.values()
+        )
 
     def clear_device(self, device_key: str) -> None:
         """Clear all history for a specific device."""
         if device_key in self._data:
             del self._data[device_key]
-            self._dirty = True
+            self._shard_keys[self._shard_of(device_key)].discard(device_key)
+            self._mark_dirty(device_key)
+            self.flaky.clear_device(device_key)
 
     def clear_all(self) -> None:
         """Clear all device history."""
         self._data = {}
-        self._dirty = True
+        self._dirty_shards.update(
+            shard for shard, keys in enumerate(self._shard_keys) if keys
+        )
+        self._shard_keys = [set() for _ in range(DEVICE_HISTORY_SHARDS)]
+        self.flaky.clear()
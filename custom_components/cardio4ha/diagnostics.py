@@ -0,0 +1,64 @@
+"""Diagnostics support for Cardio4HA."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CURRENT_VERSION,
+    DOMAIN,
+    CONF_EXCLUDE_AREAS,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_ENTITY_WILDCARDS,
+)
+from .coordinator import Cardio4HACoordinator
+
+# User-entered exclusions name entities and areas
+TO_REDACT = {CONF_EXCLUDE_ENTITIES, CONF_EXCLUDE_ENTITY_WILDCARDS, CONF_EXCLUDE_AREAS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Only counts, timings and options are included, no device names;
+    options that name entities or areas are redacted.
+    """
+    coordinator: Cardio4HACoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data or {}
+    history = coordinator.device_history
+
+    return {
+        "version": CURRENT_VERSION,
+        "options": async_redact_data(entry.options, TO_REDACT),
+        "summary": data.get("summary"),
+        "last_scan": {
+            "mode": data.get("scan_mode"),
+            "entities_scanned": data.get("entities_scanned"),
+            "duration": data.get("scan_duration"),
+            "slices": data.get("scan_slices"),
+            "entities_per_second": data.get("entities_per_second"),
+            "stale": data.get("stale", False),
+        },
+        "scan_stats": {
+            "summary": coordinator.scan_stats.summary(),
+            "scans": coordinator.scan_stats.as_list(),
+        },
+        "persistence": {
+            "pending": sorted(coordinator.persistence.pending),
+            "last_save_ms": dict(coordinator.persistence.last_save_ms),
+        },
+        "last_purge_ms": coordinator.last_purge_ms,
+        "analytics_updated": data.get("analytics_updated"),
+        "history": {
+            "devices": history.device_count,
+            "memory_bytes": history.memory_usage(),
+        },
+        "issue_index_rows": len(coordinator.issue_index),
+        "maintenance_count": len(coordinator.maintenance_devices),
+        "ignored_count": len(coordinator.ignored_devices),
+    }
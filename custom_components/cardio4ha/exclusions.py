@@ -0,0 +1,155 @@
+"""Compiled exclusion rules for Cardio4HA."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import fnmatch
+import re
+from typing import Any
+
+from .const import (
+    CONF_EXCLUDE_DOMAINS,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_EXCLUDE_ENTITY_WILDCARDS,
+    CONF_EXCLUDE_INTEGRATIONS,
+    CONF_EXCLUDE_AREAS,
+    CONF_MONITOR_ZIGBEE2MQTT,
+    DEFAULT_EXCLUDE_DOMAINS,
+    DEFAULT_EXCLUDE_ENTITIES,
+    DEFAULT_EXCLUDE_ENTITY_WILDCARDS,
+    DEFAULT_EXCLUDE_INTEGRATIONS,
+    DEFAULT_EXCLUDE_AREAS,
+    DEFAULT_MONITOR_ZIGBEE2MQTT,
+)
+
+# Substrings that identify Zigbee2MQTT entities for the monitoring override
+ZIGBEE2MQTT_MARKERS = ("zigbee", "z2m", "0x")
+
+_WILDCARD_CHARS = frozenset("*?[")
+_TERMINAL = ""
+
+
+class PrefixTrie:
+    """Character trie answering "does any stored prefix start this string"."""
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        """Initialize the trie."""
+        self._root: dict[str, Any] = {}
+        self._size = 0
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def __len__(self) -> int:
+        """Return the number of stored prefixes."""
+        return self._size
+
+    def add(self, prefix: str) -> None:
+        """Store a prefix."""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if _TERMINAL not in node:
+            node[_TERMINAL] = True
+            self._size += 1
+
+    def matches(self, value: str) -> bool:
+        """Return True if a stored prefix is a prefix of value."""
+        node = self._root
+        if _TERMINAL in node:
+            return True
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                return False
+            if _TERMINAL in node:
+                return True
+        return False
+
+
+class ExclusionRules:
+    """Exclusion options compiled once per options change.
+
+    Exact entity ids and domain/integration/area names become sets, every
+    "prefix*" rule (from exclude_entities or a wildcard that only ends in *)
+    goes into one prefix trie, and the remaining wildcards are joined into a
+    single regex, so matching an entity no longer loops over the rules.
+    """
+
+    def __init__(
+        self,
+        *,
+        domains: Iterable[str] = (),
+        entities: Iterable[str] = (),
+        wildcards: Iterable[str] = (),
+        integrations: Iterable[str] = (),
+        areas: Iterable[str] = (),
+        monitor_zigbee2mqtt: bool = DEFAULT_MONITOR_ZIGBEE2MQTT,
+    ) -> None:
+        """Compile the rules."""
+        self.domains = frozenset(domains)
+        self.integrations = frozenset(integrations)
+        self.areas = frozenset(areas)
+        self.monitor_zigbee2mqtt = monitor_zigbee2mqtt
+
+        exact: set[str] = set()
+        self._prefixes = PrefixTrie()
+        patterns: list[str] = []
+
+        for pattern in entities:
+            if pattern.endswith("*"):
+                self._prefixes.add(pattern[:-1])
+            else:
+                exact.add(pattern)
+
+        for pattern in wildcards:
+            body = pattern[:-1] if pattern.endswith("*") else None
+            if body is not None and not _WILDCARD_CHARS.intersection(body):
+                self._prefixes.add(body)
+            elif not _WILDCARD_CHARS.intersection(pattern):
+                exact.add(pattern)
+            else:
+                patterns.append(fnmatch.translate(pattern))
+
+        self._exact = frozenset(exact)
+        self._regex = (
+            re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+        )
+
+    @classmethod
+    def from_config(cls, get_value: Callable[[str, Any], Any]) -> ExclusionRules:
+        """Compile rules from a config getter like Cardio4HACoordinator._get_config_value."""
+        return cls(
+            domains=get_value(CONF_EXCLUDE_DOMAINS, DEFAULT_EXCLUDE_DOMAINS),
+            entities=get_value(CONF_EXCLUDE_ENTITIES, DEFAULT_EXCLUDE_ENTITIES),
+            wildcards=get_value(CONF_EXCLUDE_ENTITY_WILDCARDS, DEFAULT_EXCLUDE_ENTITY_WILDCARDS),
+            integrations=get_value(CONF_EXCLUDE_INTEGRATIONS, DEFAULT_EXCLUDE_INTEGRATIONS),
+            areas=get_value(CONF_EXCLUDE_AREAS, DEFAULT_EXCLUDE_AREAS),
+            monitor_zigbee2mqtt=get_value(CONF_MONITOR_ZIGBEE2MQTT, DEFAULT_MONITOR_ZIGBEE2MQTT),
+        )
+
+    def matches(
+        self,
+        entity_id: str,
+        domain: str,
+        platform: str | None = None,
+        area_name: str | None = None,
+    ) -> bool:
+        """Return True if the entity is excluded by the configured rules."""
+        # Zigbee2MQTT override wins over every other rule
+        if self.monitor_zigbee2mqtt and platform == "mqtt":
+            lower_id = entity_id.lower()
+            if any(marker in lower_id for marker in ZIGBEE2MQTT_MARKERS):
+                return False
+
+        if domain in self.domains:
+            return True
+        if platform and platform in self.integrations:
+            return True
+        if area_name and area_name in self.areas:
+            return True
+        if entity_id in self._exact:
+            return True
+        if self._prefixes.matches(entity_id):
+            return True
+        if self._regex is not None and self._regex.match(entity_id):
+            return True
+        return False
@@ -0,0 +1,141 @@
+"""Sliding-window flaky device detection for Cardio4HA."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+
+from .const import FLAKY_MIN_EVENTS, FLAKY_STDDEV_MULTIPLIER, FLAKY_WINDOW_DAYS
+
+
+class FlakyTracker:
+    """Per-device offline event counts over a sliding time window.
+
+    Offline events sit in one time-ordered deque and are expired lazily from
+    its head. Counts of monitored devices with at least one event feed a
+    running sum and sum of squares (for the fleet mean/stddev) and a
+    count -> devices histogram, so finding the devices above the threshold
+    only touches the distinct counts, and the flaky set is recomputed only
+    after some count or the monitored set changed.
+    """
+
+    def __init__(self, window_days: int = FLAKY_WINDOW_DAYS) -> None:
+        """Initialize an empty tracker."""
+        self._window = window_days * 86400
+        self._events: deque[tuple[float, str]] = deque()
+        self._counts: dict[str, int] = {}
+        self._monitored: set[str] = set()
+        # Statistics over monitored devices with count > 0
+        self._n = 0
+        self._sum = 0
+        self._sumsq = 0
+        self._by_count: dict[int, set[str]] = {}
+        self._version = 0
+        self._flaky_version = -1
+        self._flaky: frozenset[str] = frozenset()
+
+    def count(self, device_key: str) -> int:
+        """Return the device's offline events inside the window."""
+        return self._counts.get(device_key, 0)
+
+    def _stat_add(self, device_key: str, count: int) -> None:
+        """Add a monitored device's count to the running statistics."""
+        self._n += 1
+        self._sum += count
+        self._sumsq += count * count
+        self._by_count.setdefault(count, set()).add(device_key)
+
+    def _stat_remove(self, device_key: str, count: int) -> None:
+        """Remove a monitored device's count from the running statistics."""
+        self._n -= 1
+        self._sum -= count
+        self._sumsq -= count * count
+        keys = self._by_count[count]
+        keys.discard(device_key)
+        if not keys:
+            del self._by_count[count]
+
+    def _set_count(self, device_key: str, count: int) -> None:
+        """Change a device's count, keeping the statistics in step."""
+        old = self._counts.get(device_key, 0)
+        if old == count:
+            return
+        if device_key in self._monitored:
+            if old:
+                self._stat_remove(device_key, old)
+            if count:
+                self._stat_add(device_key, count)
+        if count:
+            self._counts[device_key] = count
+        else:
+            self._counts.pop(device_key, None)
+        self._version += 1
+
+    def add_event(self, device_key: str, ts: float) -> None:
+        """Record an offline event (events must arrive in time order)."""
+        self._events.append((ts, device_key))
+        self._set_count(device_key, self._counts.get(device_key, 0) + 1)
+
+    def load(self, events: Iterable[tuple[float, str]]) -> None:
+        """Replace all events with (ts, device_key) pairs in any order."""
+        self.clear()
+        for ts, device_key in sorted(events):
+            self.add_event(device_key, ts)
+
+    def expire(self, now: float) -> None:
+        """Drop events that fell out of the window."""
+        cutoff = now - self._window
+        events = self._events
+        while events and events[0][0] < cutoff:
+            _, device_key = events.popleft()
+            count = self._counts.get(device_key, 0)
+            if count:
+                self._set_count(device_key, count - 1)
+
+    def clear_device(self, device_key: str) -> None:
+        """Forget a device's events."""
+        if device_key not in self._counts:
+            return
+        self._set_count(device_key, 0)
+        self._events = deque(e for e in self._events if e[1] != device_key)
+
+    def clear(self) -> None:
+        """Forget all events."""
+        for device_key in list(self._counts):
+            self._set_count(device_key, 0)
+        self._events.clear()
+
+    def set_monitored(self, device_key: str, monitored: bool) -> None:
+        """Include or exclude a device from the fleet statistics."""
+        if monitored == (device_key in self._monitored):
+            return
+        count = self._counts.get(device_key, 0)
+        if monitored:
+            self._monitored.add(device_key)
+            if count:
+                self._stat_add(device_key, count)
+        else:
+            self._monitored.discard(device_key)
+            if count:
+                self._stat_remove(device_key, count)
+        self._version += 1
+
+    def flaky_keys(self) -> frozenset[str]:
+        """Return monitored devices whose count exceeds mean + k * stddev."""
+        if self._flaky_version == self._version:
+            return self._flaky
+        self._flaky_version = self._version
+        n = self._n
+        if not n:
+            self._flaky = frozenset()
+            return self._flaky
+        mean = self._sum / n
+        # Population variance from integer sums, exact up to the final division
+        variance = max(0, n * self._sumsq - self._sum * self._sum) / (n * n)
+        threshold = mean + FLAKY_STDDEV_MULTIPLIER * variance ** 0.5
+        self._flaky = frozenset(
+            device_key
+            for count, keys in self._by_count.items()
+            if count > threshold and count >= FLAKY_MIN_EVENTS
+            for device_key in keys
+        )
+        return self._flaky
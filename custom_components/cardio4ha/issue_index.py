@@ -0,0 +1,279 @@
+"""Filterable, sortable index of current issues for Cardio4HA queries."""
+from __future__ import annotations
+
+import base64
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime
+import json
+import math
+from typing import Any
+
+from .const import SEVERITY_RANK
+
+# Row id: (category, device_key)
+RowId = tuple[str, str]
+# Comparable sort key: (type rank, value) so mixed and missing values still order
+SortKey = tuple[int, Any]
+
+# Fields with posting sets; area and integration hold every value of the device
+_FILTER_FIELDS = ("category", "severity", "area", "integration")
+# Fields searched by the text filter
+_TEXT_FIELDS = ("name", "entity_id", "device", "area", "device_key")
+# Cached sort orders kept per index version
+_MAX_CACHED_ORDERS = 32
+
+
+def sort_key(field: str, value: Any) -> SortKey:
+    """Return the comparable key of a field value.
+
+    Numbers (and datetimes, by timestamp) sort before text, which sorts
+    case-insensitively; missing values sort last. Severity sorts by rank.
+    """
+    if field == "severity" and value in SEVERITY_RANK:
+        return (0, SEVERITY_RANK[value])
+    if isinstance(value, datetime):
+        return (0, value.timestamp())
+    if isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value)):
+        return (0, float(value))
+    if value is None or isinstance(value, float):
+        return (2, "")
+    return (1, str(value).casefold())
+
+
+class _Row:
+    """One indexed issue."""
+
+    __slots__ = ("record", "terms", "text")
+
+    def __init__(self, record: dict[str, Any], terms: dict[str, frozenset], text: str) -> None:
+        """Initialize the row."""
+        self.record = record
+        self.terms = terms
+        self.text = text
+
+
+class IssueIndex:
+    """Issue records by category with posting sets for every filter field.
+
+    The coordinator syncs each category after a scan. A re-evaluated
+    device keeps its ResultRecord object when its fields still match
+    (reuse_or_create) and gets a new one otherwise; the fields the
+    coordinator updates in place (unavailable durations and severities in
+    _refresh_unavailable_records, battery predictions) are not search or
+    filter terms, except severity. So a row whose record is the same
+    object only needs its severity re-checked, and terms and search text
+    are re-derived only for new or replaced records. Sorted orders are built on
+    first use per filter/sort combination and reused until the next sync,
+    and pages are cut from them with keyset cursors, so paging costs a
+    bisect plus the page itself.
+    """
+
+    def __init__(
+        self,
+        describe: Callable[[str, dict[str, Any]], tuple[Iterable[str | None], Iterable[str]]],
+    ) -> None:
+        """Initialize an empty index.
+
+        describe(device_key, record) returns the (areas, integrations) of a device.
+        """
+        self._describe = describe
+        self._rows: dict[RowId, _Row] = {}
+        self._postings: dict[str, dict[Any, set[RowId]]] = {f: {} for f in _FILTER_FIELDS}
+        self._orders: dict[tuple, list[tuple[SortKey, RowId]]] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        """Return the number of indexed issues."""
+        return len(self._rows)
+
+    def _post(self, row_id: RowId, terms: dict[str, frozenset]) -> None:
+        """Add a row to the posting sets of its terms."""
+        for field, values in terms.items():
+            postings = self._postings[field]
+            for value in values:
+                postings.setdefault(value, set()).add(row_id)
+
+    def _unpost(self, row_id: RowId, terms: dict[str, frozenset]) -> None:
+        """Remove a row from the posting sets of its terms."""
+        for field, values in terms.items():
+            postings = self._postings[field]
+            for value in values:
+                ids = postings.get(value)
+                if ids is not None:
+                    ids.discard(row_id)
+                    if not ids:
+                        del postings[value]
+
+    def _build_row(self, category: str, key: str, record: dict[str, Any]) -> _Row:
+        """Derive the terms and search text of a record."""
+        areas, integrations = self._describe(key, record)
+        areas = set(areas)
+        areas.add(record.get("area"))
+        terms = {
+            "category": frozenset((category,)),
+            "severity": frozenset((record.get("severity"),)),
+            "area": frozenset(areas),
+            "integration": frozenset(integrations),
+        }
+        text = "\n".join(
+            str(record[field]).casefold()
+            for field in _TEXT_FIELDS if record.get(field)
+        )
+        if "device_key" not in record:
+            text = f"{text}\n{key.casefold()}"
+        return _Row(record, terms, text)
+
+    def sync(self, category: str, records: Mapping[str, dict[str, Any]]) -> None:
+        """Make the rows of a category match records keyed by record_key()."""
+        postings = self._postings["category"].get(category, set())
+        for row_id in [row_id for row_id in postings if row_id[1] not in records]:
+            self._unpost(row_id, self._rows.pop(row_id).terms)
+
+        for key, record in records.items():
+            row_id = (category, key)
+            row = self._rows.get(row_id)
+            if row is not None and row.record is record:
+                # Same record: only its severity can have changed in place
+                severity = frozenset((record.get("severity"),))
+                if row.terms["severity"] != severity:
+                    self._unpost(row_id, {"severity": row.terms["severity"]})
+                    row.terms["severity"] = severity
+                    self._post(row_id, {"severity": severity})
+                continue
+            if row is not None:
+                self._unpost(row_id, row.terms)
+            row = self._rows[row_id] = self._build_row(category, key, record)
+            self._post(row_id, row.terms)
+
+        # Sort values may have changed in place, so cached orders are stale
+        self.version += 1
+        self._orders.clear()
+
+    def _match(
+        self,
+        categories: Iterable[str] | None,
+        filters: Mapping[str, Any],
+        text: str | None,
+    ) -> set[RowId] | Iterable[RowId]:
+        """Return the ids of rows matching every filter."""
+        candidates: list[set[RowId]] = []
+        if categories is not None:
+            by_category = self._postings["category"]
+            candidates.append(set().union(*(by_category.get(c, ()) for c in categories)))
+        for field, value in filters.items():
+            candidates.append(self._postings[field].get(value, set()))
+        if candidates:
+            candidates.sort(key=len)
+            matched = candidates[0].intersection(*candidates[1:])
+        else:
+            matched = self._rows.keys()
+        if text:
+            needle = text.casefold()
+            matched = {row_id for row_id in matched if needle in self._rows[row_id].text}
+        return matched
+
+    def _order(
+        self,
+        categories: Iterable[str] | None,
+        filters: Mapping[str, Any],
+        text: str | None,
+        sort: str,
+    ) -> list[tuple[SortKey, RowId]]:
+        """Return matching rows sorted ascending, cached until the next sync."""
+        cache_key = (
+            frozenset(categories) if categories is not None else None,
+            tuple(sorted(filters.items(), key=lambda item: item[0])),
+            text.casefold() if text else None,
+            sort,
+        )
+        order = self._orders.get(cache_key)
+        if order is None:
+            rows = self._rows
+            order = sorted(
+                (sort_key(sort, rows[row_id].record.get(sort)), row_id)
+                for row_id in self._match(categories, filters, text)
+            )
+            if len(self._orders) >= _MAX_CACHED_ORDERS:
+                self._orders.clear()
+            self._orders[cache_key] = order
+        return order
+
+    def query(
+        self,
+        *,
+        categories: Iterable[str] | None = None,
+        severity: str | None = None,
+        area: str | None = None,
+        integration: str | None = None,
+        text: str | None = None,
+        sort: str = "name",
+        descending: bool = False,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Return one page of matching issues.
+
+        Each item is the record plus its category (and device_key). The
+        returned next_cursor continues after the last item, even if the index
+        was synced in between; it is None on the last page. Raises ValueError
+        for a cursor that is malformed or was issued for another sort.
+        """
+        filters = {
+            field: value
+            for field, value in (("severity", severity), ("area", area), ("integration", integration))
+            if value is not None
+        }
+        order = self._order(categories, filters, text, sort)
+
+        if cursor is None:
+            start, end = (len(order) - limit, len(order)) if descending else (0, limit)
+        else:
+            position = self._decode_cursor(cursor, sort, descending)
+            if descending:
+                end = bisect_left(order, position)
+                start = end - limit
+            else:
+                start = bisect_right(order, position)
+                end = start + limit
+        start = max(start, 0)
+        page = order[start:end]
+        if descending:
+            page.reverse()
+            more = start > 0
+        else:
+            more = end < len(order)
+
+        items = []
+        for _sort_key, (category, key) in page:
+            record = self._rows[(category, key)].record
+            items.append({**record, "device_key": key, "category": category})
+        return {
+            "items": items,
+            "total": len(order),
+            "next_cursor": self._encode_cursor(page[-1], sort, descending) if more and page else None,
+            "version": self.version,
+        }
+
+    @staticmethod
+    def _encode_cursor(position: tuple[SortKey, RowId], sort: str, descending: bool) -> str:
+        """Return an opaque cursor for a position in a sort order."""
+        (rank, value), (category, key) = position
+        raw = json.dumps([sort, descending, rank, value, category, key], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, descending: bool) -> tuple[SortKey, RowId]:
+        """Return the position a cursor points at."""
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            cursor_sort, cursor_descending, rank, value, category, key = raw
+        except (ValueError, TypeError) as err:
+            raise ValueError("Invalid cursor") from err
+        if cursor_sort != sort or cursor_descending != descending:
+            raise ValueError("Cursor belongs to a different sort order")
+        if rank == 0 and isinstance(value, (int, float)):
+            value = float(value)
+        elif rank not in (1, 2) or not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        return ((rank, value), (str(category), str(key)))
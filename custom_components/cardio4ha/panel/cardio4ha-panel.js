@@ -28,6 +28,8 @@ class Cardio4HAPanel extends HTMLElement {
     this._expandedRows = new Set();
     this._timelineCache = {};
     this._flakyKeys = new Set();
+    this._seq = null;
+    this._resyncing = false;
     this._startupTimer = null;
     this._criticalExpanded = false;
   }
@@ -69,8 +71,8 @@ class Cardio4HAPanel extends HTMLElement {
     if (this._unsub || !this._hass) return;
     try {
       this._unsub = await this._hass.connection.subscribeMessage(
-        (msg) => this._handleUpdate(msg),
-        { type: "cardio4ha/subscribe" }
+        (msg) => this._handleMessage(msg),
+        { type: "cardio4ha/subscribe", delta: true }
       );
       this._connected = true;
     } catch (e) {
@@ -85,6 +87,65 @@ class Cardio4HAPanel extends HTMLElement {
       this._unsub = null;
     }
     this._connected = false;
+    this._seq = null;
+  }
+
+  _handleMessage(msg) {
+    if (msg.type === "snapshot") {
+      this._seq = msg.seq;
+      this._resyncing = false;
+      this._handleUpdate(msg.data);
+      return;
+    }
+    if (msg.type !== "patch") return;
+    if (!this._data || this._seq === null || msg.seq !== this._seq + 1) {
+      // Missed a patch: ask for a fresh snapshot and drop patches until it arrives
+      this._requestResync();
+      return;
+    }
+    this._seq = msg.seq;
+    this._handleUpdate(this._applyPatch(this._data, msg.patch));
+  }
+
+  async _requestResync() {
+    if (this._resyncing || !this._hass) return;
+    this._resyncing = true;
+    try {
+      await this._hass.callWS({ type: "cardio4ha/resync" });
+    } catch (e) {
+      console.error("Cardio4HA: resync failed", e);
+      this._resyncing = false;
+    }
+  }
+
+  _applyPatch(data, patch) {
+    const next = { ...data, ...(patch.set || {}) };
+    for (const name of ["unavailable", "low_battery", "weak_signal", "flaky_devices"]) {
+      const p = patch[name];
+      if (!p) continue;
+      // Mirrors record_key(): a standalone entity can have a Zigbee and a WiFi signal record
+      const keyOf = (r) => {
+        const key = r.device_key || r.entity_id || "";
+        return r.signal_type && !r.device_id ? `${key}|${r.signal_type}` : key;
+      };
+      const removed = new Set(p.removed || []);
+      const changed = p.changed || {};
+      const unset = p.unset || {};
+      let list = (data[name] || []).filter(r => !removed.has(keyOf(r))).map(r => {
+        const key = keyOf(r);
+        if (!changed[key] && !unset[key]) return r;
+        const rec = { ...r, ...(changed[key] || {}) };
+        for (const f of unset[key] || []) delete rec[f];
+        return rec;
+      });
+      list = list.concat(p.added || []);
+      if (p.order) {
+        const byKey = new Map(list.map(r => [keyOf(r), r]));
+        list = p.order.map(k => byKey.get(k)).filter(Boolean);
+      }
+      next[name] = list;
+    }
+    return next;
   }
 
   _handleUpdate(msg) {
@@ -377,7 +438,7 @@ class Cardio4HAPanel extends HTMLElement {
   _renderContent() {
     if (!this._data) return `<div class="loading"><div class="spinner"></div><p>Loading device data...</p></div>`;
     const startupRemaining = this._data.startup_remaining || 0;
-    if (startupRemaining > 0) {
+    if (startupRemaining > 0 && !this._data.stale) {
       const m = Math.floor(startupRemaining / 60);
       const s = startupRemaining % 60;
       const pct = ((120 - startupRemaining) / 120) * 100;
@@ -395,6 +456,16 @@ class Cardio4HAPanel extends HTMLElement {
           <p class="startup-hint">First scan starts automatically when countdown reaches zero</p>
         </div>`;
     }
+    // Warm start: last results from before the restart, until the first scan
+    const staleHtml = this._data.stale ? `
+      <div class="update-banner">
+        <ha-icon icon="mdi:history"></ha-icon>
+        <span>Showing results from ${this._formatTime(this._data.last_update)} until the first scan after startup</span>
+      </div>` : "";
+    return staleHtml + this._renderView();
+  }
+
+  _renderView() {
     switch (this._view) {
       case "overview": return this._renderOverview();
       case "unavailable": return this._renderUnavailable();
@@ -636,7 +707,7 @@ class Cardio4HAPanel extends HTMLElement {
               ${this._renderBatteryBar(level, dev.severity)}
               <span class="battery-pct">${Math.round(level)}%</span>
             </div>
-            ${daysRemaining !== null ? `<span class="prediction-badge">${daysRemaining}d left</span>` : ""}
+            ${daysRemaining !== null ? `<span class="prediction-badge ${dev.prediction_confidence === "low" ? "low-confidence" : ""}" title="${this._predictionRange(dev) || ""}">${dev.prediction_confidence === "low" ? "~" : ""}${daysRemaining}d left</span>` : ""}
             <ha-icon icon="mdi:chevron-${expanded ? "up" : "down"}" class="expand-icon"></ha-icon>
           </div>
         </div>
@@ -644,6 +715,12 @@ class Cardio4HAPanel extends HTMLElement {
       </div>`;
   }
 
+  _predictionRange(dev) {
+    const range = dev.days_remaining_range;
+    if (!range) return null;
+    return `${range[0]}–${range[1]} days, ${dev.prediction_confidence || "unknown"} confidence`;
+  }
+
   _renderBatteryBar(level, severity) {
     let color = "#4caf50";
     if (severity === "critical") color = "var(--error-color, #db4437)";
@@ -665,7 +742,7 @@ class Cardio4HAPanel extends HTMLElement {
           <div class="detail-item"><span class="detail-label">Entity</span><span class="detail-value entity-link" data-entity="${dev.entity_id}">${dev.entity_id}</span></div>
           <div class="detail-item"><span class="detail-label">Level</span><span class="detail-value">${Math.round(dev.battery_level)}%</span></div>
           <div class="detail-item"><span class="detail-label">Area</span><span class="detail-value">${this._escapeHtml(dev.area || "None")}</span></div>
-          ${daysRemaining !== null ? `<div class="detail-item"><span class="detail-label">Predicted Empty</span><span class="detail-value">${daysRemaining} days</span></div>` : ""}
+          ${daysRemaining !== null ? `<div class="detail-item"><span class="detail-label">Predicted Empty</span><span class="detail-value">${daysRemaining} days${this._predictionRange(dev) ? ` (${this._predictionRange(dev)})` : ""}</span></div>` : ""}
         </div>
         <div class="action-buttons">
           <button class="action-btn ignore-btn" data-key="${dk}" data-name="${this._escapeHtml(dev.name || "")}" data-area="${this._escapeHtml(dev.area || "")}">
@@ -987,8 +1064,8 @@ class Cardio4HAPanel extends HTMLElement {
 
     try {
       await this._hass.callWS(payload);
-      this._showSettingsToast("Settings saved! Reconnecting...");
-      this._reconnectAfterReload();
+      // Applied in place; the refreshed results arrive on the open subscription
+      this._showSettingsToast("Settings applied!");
     } catch (e) {
       console.error("Save settings failed", e);
       this._showSettingsToast("Error saving settings");
@@ -1010,31 +1087,13 @@ class Cardio4HAPanel extends HTMLElement {
 
     try {
       await this._hass.callWS(defaults);
-      this._showSettingsToast("Reset to defaults! Reconnecting...");
-      this._reconnectAfterReload();
+      this._showSettingsToast("Reset to defaults!");
     } catch (e) {
       console.error("Reset settings failed", e);
       this._showSettingsToast("Error resetting settings");
     }
   }
 
-  async _reconnectAfterReload() {
-    this._unsubscribe();
-    for (let i = 0; i < 10; i++) {
-      await new Promise(r => setTimeout(r, 1500));
-      try {
-        this._unsub = await this._hass.connection.subscribeMessage(
-          (msg) => this._handleUpdate(msg),
-          { type: "cardio4ha/subscribe" }
-        );
-        this._connected = true;
-        this._showSettingsToast("Settings applied!");
-        return;
-      } catch (e) { /* integration still reloading */ }
-    }
-    this._showSettingsToast("Reload timed out. Please refresh the page.");
-  }
-
   _showSettingsToast(message) {
     const toast = this.shadowRoot.querySelector(".settings-toast");
     if (toast) {
@@ -1785,6 +1844,10 @@ class Cardio4HAPanel extends HTMLElement {
         font-weight: 600;
         white-space: nowrap;
       }
+      .prediction-badge.low-confidence {
+        opacity: 0.6;
+        font-style: italic;
+      }
 
       /* ── Signal Bars ── */
       .signal-bars {
@@ -0,0 +1,140 @@
+"""Write-behind persistence for Cardio4HA stores."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import PERSIST_DELAY, PERSIST_MAX_LATENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+# Store names registered by the coordinator
+PERSIST_UNAVAILABLE = "unavailable"
+PERSIST_MAINTENANCE = "maintenance"
+PERSIST_IGNORE = "ignore"
+PERSIST_HISTORY = "history"
+PERSIST_SNAPSHOT = "snapshot"
+
+
+class PersistenceManager:
+    """Coalesces saves of several stores behind one delayed flush.
+
+    Callers mark a store dirty instead of saving it. A flush runs PERSIST_DELAY
+    seconds after the last change, but never later than PERSIST_MAX_LATENCY
+    seconds after the first unsaved change, and writes only the dirty stores.
+    Everything pending is flushed on unload and when Home Assistant stops;
+    stores registered with flush_on_stop are written then even if not dirty.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        delay: float = PERSIST_DELAY,
+        max_latency: float = PERSIST_MAX_LATENCY,
+    ) -> None:
+        """Initialize the manager."""
+        self._hass = hass
+        self._delay = delay
+        self._max_latency = max_latency
+        self._savers: dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._flush_on_stop: set[str] = set()
+        self._dirty: set[str] = set()
+        self._first_dirty: float | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+        # Duration of each store's most recent save, for diagnostics
+        self.last_save_ms: dict[str, float] = {}
+
+    def register(
+        self,
+        name: str,
+        save: Callable[[], Awaitable[Any]],
+        flush_on_stop: bool = False,
+    ) -> None:
+        """Register a store's save coroutine under a name."""
+        self._savers[name] = save
+        if flush_on_stop:
+            self._flush_on_stop.add(name)
+
+    @property
+    def pending(self) -> frozenset[str]:
+        """Return the names of stores waiting to be written."""
+        return frozenset(self._dirty)
+
+    @callback
+    def async_start(self) -> None:
+        """Flush pending writes when Home Assistant stops."""
+        if self._unsub_stop is None:
+            self._unsub_stop = self._hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+            )
+
+    @callback
+    def mark_dirty(self, *names: str) -> None:
+        """Schedule the named stores to be written."""
+        self._dirty.update(names)
+        now = time.monotonic()
+        if self._first_dirty is None:
+            self._first_dirty = now
+        # Debounce, but never past the max latency of the oldest change
+        delay = min(self._delay, self._first_dirty + self._max_latency - now)
+        self._arm(max(0.0, delay))
+
+    def _arm(self, delay: float) -> None:
+        """(Re)point the flush timer."""
+        if self._unsub_timer:
+            self._unsub_timer()
+        self._unsub_timer = async_call_later(self._hass, delay, self._async_on_timer)
+
+    @callback
+    def _async_on_timer(self, _now: Any) -> None:
+        """Run the delayed flush."""
+        self._unsub_timer = None
+        self._hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Write every dirty store now."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        dirty, self._dirty = self._dirty, set()
+        self._first_dirty = None
+        failed = []
+        for name in sorted(dirty):
+            started = time.perf_counter()
+            try:
+                # Savers log their own errors; an explicit False means "retry later"
+                if await self._savers[name]() is False:
+                    failed.append(name)
+            except Exception as err:
+                _LOGGER.error("Error saving Cardio4HA %s data: %s", name, err)
+                failed.append(name)
+            self.last_save_ms[name] = round((time.perf_counter() - started) * 1000, 2)
+        if failed:
+            self.mark_dirty(*failed)
+        elif dirty:
+            _LOGGER.debug("Flushed Cardio4HA stores: %s", ", ".join(sorted(dirty)))
+
+    async def _async_on_stop(self, _event: Event) -> None:
+        """Flush pending writes before Home Assistant shuts down."""
+        self._unsub_stop = None
+        self._dirty.update(self._flush_on_stop)
+        await self.async_flush()
+
+    async def async_stop(self) -> None:
+        """Flush pending writes and stop listening."""
+        if self._unsub_stop:
+            self._unsub_stop()
+            self._unsub_stop = None
+        self._dirty.update(self._flush_on_stop)
+        await self.async_flush()
+        # A failed save re-arms the timer; don't leave it running after unload
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
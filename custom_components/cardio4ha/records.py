@@ -0,0 +1,278 @@
+"""Slotted scan records for Cardio4HA.
+
+Scans keep one classification record per monitored entity and one result
+record per unavailable, low battery and weak signal device. At tens of
+thousands of entities per-record dicts dominate the memory of a scan, so
+these are __slots__ classes instead.
+
+Result records still read like dicts (record["name"], record.get(...),
+{**record}) for the sensors, services and WebSocket API, and produce
+their JSON form lazily: as_dict() is built on first use and cached until
+a field changes, so unchanged records are not copied again for every
+payload.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+
+class EntityRecord:
+    """Classification of one monitored entity, cached between scans."""
+
+    __slots__ = (
+        "entity_id",
+        "name",
+        "domain",
+        "device_id",
+        "device_key",
+        "device_name",
+        "area_name",
+        "integration",
+        "state",
+        "unavailable",
+        "last_updated",
+        "battery_level",
+        "linkquality",
+        "rssi",
+    )
+
+    def __init__(
+        self,
+        entity_id: str,
+        name: str,
+        device_id: str | None,
+        device_key: str,
+        device_name: str | None,
+        area_name: str | None,
+        integration: str,
+        state: str,
+        unavailable: bool,
+        last_updated: datetime,
+    ) -> None:
+        """Initialize a record without battery or signal readings."""
+        self.entity_id = entity_id
+        self.name = name
+        self.domain = entity_id.split(".")[0]
+        self.device_id = device_id
+        self.device_key = device_key
+        self.device_name = device_name
+        self.area_name = area_name
+        self.integration = integration
+        self.state = state
+        self.unavailable = unavailable
+        self.last_updated = last_updated
+        self.battery_level: float | None = None
+        self.linkquality: float | None = None
+        self.rssi: float | None = None
+
+
+class _Missing:
+    """Marker for an optional field that is not set."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        """Return the marker name."""
+        return "MISSING"
+
+
+MISSING: Any = _Missing()
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a field value for JSON transport."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    return value
+
+
+class ResultRecord(Mapping):
+    """A scan result that reads like a dict and serializes lazily.
+
+    Subclasses list their fields in FIELDS; fields not passed to the
+    constructor are left out of the mapping until they are set.
+    """
+
+    __slots__ = ("_json",)
+
+    FIELDS: tuple[str, ...] = ()
+    _FIELD_SET: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Index the field names of a record class."""
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, **fields: Any) -> None:
+        """Initialize from field values."""
+        setattr_ = object.__setattr__
+        for name in self.FIELDS:
+            setattr_(self, name, fields.pop(name, MISSING))
+        if fields:
+            raise TypeError(f"Unknown fields for {type(self).__name__}: {sorted(fields)}")
+        setattr_(self, "_json", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set a field, dropping the cached JSON form if the value changed."""
+        if getattr(self, name, MISSING) == value:
+            return
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_json", None)
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a set field."""
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            if value is not MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Set a field, dict style."""
+        if key not in self._FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the set fields."""
+        return (name for name in self.FIELDS if getattr(self, name) is not MISSING)
+
+    def __len__(self) -> int:
+        """Return the number of set fields."""
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare set fields; records also compare equal to plain dicts."""
+        if type(other) is type(self):
+            return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        """Return the class name and set fields."""
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Unset a field and return its value."""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            return default
+        setattr(self, key, MISSING)
+        return value
+
+    def matches(self, fields: Mapping[str, Any]) -> bool:
+        """Return whether the given fields already hold these values.
+
+        Fields maintained in place (durations, severities, predictions) are
+        only compared if passed, so a re-evaluated device whose inputs did
+        not change keeps its record.
+        """
+        return all(getattr(self, name) == value for name, value in fields.items())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the JSON-ready form, built once per change.
+
+        The returned dict is shared; treat it as read-only.
+        """
+        if self._json is None:
+            json = {}
+            for name in self.FIELDS:
+                value = getattr(self, name)
+                if value is not MISSING:
+                    json[name] = _json_value(value)
+            object.__setattr__(self, "_json", json)
+        return self._json
+
+
+class UnavailableRecord(ResultRecord):
+    """A device (or standalone entity) whose entities are all unavailable."""
+
+    FIELDS = (
+        "entity_id",
+        "name",
+        "domain",
+        "area",
+        "device",
+        "device_id",
+        "device_key",
+        "since",
+        "last_seen",
+        "integration",
+        "unavailable_count",
+        "total_count",
+        "duration_seconds",
+        "duration_human",
+        "severity",
+    )
+    __slots__ = FIELDS
+
+
+class BatteryRecord(ResultRecord):
+    """The lowest battery of a device below the low threshold."""
+
+    FIELDS = (
+        "entity_id",
+        "name",
+        "battery_level",
+        "severity",
+        "area",
+        "device",
+        "device_id",
+        "device_key",
+        "last_updated",
+        "days_remaining",
+        "days_remaining_range",
+        "prediction_confidence",
+    )
+    __slots__ = FIELDS
+
+
+class SignalRecord(ResultRecord):
+    """The weakest signal reading of a device below its threshold."""
+
+    FIELDS = (
+        "entity_id",
+        "name",
+        "signal_type",
+        "linkquality",
+        "rssi",
+        "severity",
+        "area",
+        "device",
+        "device_id",
+        "device_key",
+    )
+    __slots__ = FIELDS
+
+
+def record_key(record: Mapping[str, Any]) -> str:
+    """Return the key a result record is stored, indexed and patched by.
+
+    That is its device key, except for the weak signal records of a
+    standalone entity, which can report a Zigbee and a WiFi reading.
+    """
+    key = record.get("device_key") or record.get("entity_id") or ""
+    if "signal_type" in record and not record.get("device_id"):
+        return f"{key}|{record['signal_type']}"
+    return key
+
+
+def reuse_or_create(
+    old: ResultRecord | None, cls: type[ResultRecord], fields: dict[str, Any]
+) -> ResultRecord:
+    """Return the old record if it already holds these fields, else a new one.
+
+    Keeping the object means its cached JSON form stays valid and consumers
+    that track records by identity (the issue index, the payload diff) see
+    no change.
+    """
+    if old is not None and type(old) is cls and old.matches(fields):
+        return old
+    return cls(**fields)
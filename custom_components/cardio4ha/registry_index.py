@@ -0,0 +1,201 @@
+"""Registry snapshot index for Cardio4HA."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RegistryIndexEntry(NamedTuple):
+    """Registry facts about one entity that the scan needs."""
+
+    device_id: str | None
+    device_name: str | None
+    area_name: str | None
+    platform: str | None
+    is_physical: bool
+    disabled: bool
+
+
+class _DeviceInfo(NamedTuple):
+    """Registry facts about one device."""
+
+    name: str | None
+    area_id: str | None
+    area_name: str | None
+    is_physical: bool
+
+
+# Entities without an entity registry entry (e.g. legacy or YAML-only entities)
+_NO_ENTRY = RegistryIndexEntry(None, None, None, None, True, False)
+
+
+class RegistryIndex:
+    """Maps entity_id to the device, area and platform facts used by the scan.
+
+    Entries are resolved from the entity, device and area registries on first
+    lookup and then served from a dict until a registry-updated event
+    invalidates them, so the scan does one dict lookup per entity instead of
+    three registry calls.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        on_invalidate: Callable[[set[str]], None],
+    ) -> None:
+        """Initialize the index."""
+        self._hass = hass
+        self._on_invalidate = on_invalidate
+        self._entries: dict[str, RegistryIndexEntry] = {}
+        self._devices: dict[str, _DeviceInfo | None] = {}
+        self._device_entities: dict[str, set[str]] = {}
+        self._area_devices: dict[str, set[str]] = {}
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening for registry changes."""
+        if self._unsubs:
+            return
+        self._unsubs = [
+            self._hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_updated
+            ),
+            self._hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_updated
+            ),
+            self._hass.bus.async_listen(
+                ar.EVENT_AREA_REGISTRY_UPDATED, self._async_area_updated
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for registry changes."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+
+    def __len__(self) -> int:
+        """Return the number of indexed entities."""
+        return len(self._entries)
+
+    def get(self, entity_id: str) -> RegistryIndexEntry:
+        """Return the index entry for an entity, resolving it on first use."""
+        entry = self._entries.get(entity_id)
+        if entry is None:
+            entry = self._resolve(entity_id)
+            self._entries[entity_id] = entry
+        return entry
+
+    def device_info(self, device_id: str) -> tuple[str | None, str | None]:
+        """Return (device name, area name) for a device."""
+        info = self._get_device(device_id)
+        if info is None:
+            return None, None
+        return info.name, info.area_name
+
+    def _resolve(self, entity_id: str) -> RegistryIndexEntry:
+        """Build an index entry from the registries."""
+        entity_entry = er.async_get(self._hass).async_get(entity_id)
+        if entity_entry is None:
+            return _NO_ENTRY
+
+        device_id = entity_entry.device_id
+        device_name = None
+        area_name = None
+        is_physical = True
+
+        if device_id:
+            self._device_entities.setdefault(device_id, set()).add(entity_id)
+            info = self._get_device(device_id)
+            if info is not None:
+                device_name = info.name
+                area_name = info.area_name
+                is_physical = info.is_physical
+
+        return RegistryIndexEntry(
+            device_id=device_id,
+            device_name=device_name,
+            area_name=area_name,
+            platform=entity_entry.platform,
+            is_physical=is_physical,
+            disabled=entity_entry.disabled,
+        )
+
+    def _get_device(self, device_id: str) -> _DeviceInfo | None:
+        """Return cached device facts, resolving them on first use."""
+        if device_id in self._devices:
+            return self._devices[device_id]
+
+        info = None
+        device_entry = dr.async_get(self._hass).async_get(device_id)
+        if device_entry:
+            area_name = None
+            if device_entry.area_id:
+                self._area_devices.setdefault(device_entry.area_id, set()).add(device_id)
+                area_entry = ar.async_get(self._hass).async_get_area(device_entry.area_id)
+                if area_entry:
+                    area_name = area_entry.name
+            info = _DeviceInfo(
+                name=device_entry.name_by_user or device_entry.name,
+                area_id=device_entry.area_id,
+                area_name=area_name,
+                # Virtual/software devices have no physical connections like MAC/Zigbee IEEE
+                is_physical=bool(device_entry.connections),
+            )
+        self._devices[device_id] = info
+        return info
+
+    def _invalidate_device(self, device_id: str, changed: set[str]) -> None:
+        """Drop a device and every entity entry that copied its facts."""
+        info = self._devices.pop(device_id, None)
+        if info is not None and info.area_id:
+            devices = self._area_devices.get(info.area_id)
+            if devices is not None:
+                devices.discard(device_id)
+        for entity_id in self._device_entities.pop(device_id, set()):
+            self._entries.pop(entity_id, None)
+            changed.add(entity_id)
+
+    @callback
+    def _async_entity_updated(self, event: Event) -> None:
+        """Invalidate an entity whose registry entry changed."""
+        changed: set[str] = set()
+        for key in ("entity_id", "old_entity_id"):
+            entity_id = event.data.get(key)
+            if not entity_id:
+                continue
+            entry = self._entries.pop(entity_id, None)
+            if entry is not None and entry.device_id:
+                entities = self._device_entities.get(entry.device_id)
+                if entities is not None:
+                    entities.discard(entity_id)
+            changed.add(entity_id)
+        if changed:
+            self._on_invalidate(changed)
+
+    @callback
+    def _async_device_updated(self, event: Event) -> None:
+        """Invalidate all entities of a device whose registry entry changed."""
+        changed: set[str] = set()
+        self._invalidate_device(event.data["device_id"], changed)
+        if changed:
+            self._on_invalidate(changed)
+
+    @callback
+    def _async_area_updated(self, event: Event) -> None:
+        """Invalidate all entities of devices in an area that changed."""
+        changed: set[str] = set()
+        for device_id in list(self._area_devices.pop(event.data["area_id"], set())):
+            self._invalidate_device(device_id, changed)
+        if changed:
+            self._on_invalidate(changed)
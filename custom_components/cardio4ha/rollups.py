@@ -0,0 +1,143 @@
+"""Daily per-device rollups for Cardio4HA history."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+import math
+from typing import Any, NamedTuple
+
+# Stored in place of a missing minimum battery level
+_NO_BATTERY = -1
+
+
+class DailyRollup(NamedTuple):
+    """One closed local calendar day of a device."""
+
+    day: int  # date.toordinal() of the local day
+    offline_seconds: float
+    transitions: int
+    battery_min: int | None
+    signal_mean: float | None
+
+
+class DailyRollups:
+    """Append-only columns of closed days, ordered by day ordinal.
+
+    Each day costs a few bytes, so rollups are kept far longer than the raw
+    events and readings they are computed from.
+    """
+
+    __slots__ = ("_days", "_offline", "_transitions", "_battery_min", "_signal_mean")
+
+    def __init__(self) -> None:
+        """Initialize empty columns."""
+        self._days = array("l")
+        self._offline = array("f")
+        self._transitions = array("H")
+        self._battery_min = array("b")
+        self._signal_mean = array("f")
+
+    def __len__(self) -> int:
+        """Return the number of stored days."""
+        return len(self._days)
+
+    def copy(self) -> DailyRollups:
+        """Return an independent copy."""
+        other = DailyRollups()
+        for name in self.__slots__:
+            column = getattr(self, name)
+            setattr(other, name, array(column.typecode, column))
+        return other
+
+    @property
+    def first_day(self) -> int | None:
+        """Return the oldest stored day ordinal."""
+        return self._days[0] if self._days else None
+
+    @property
+    def last_day(self) -> int | None:
+        """Return the newest stored day ordinal."""
+        return self._days[-1] if self._days else None
+
+    def append(
+        self,
+        day: int,
+        offline_seconds: float,
+        transitions: int,
+        battery_min: int | None,
+        signal_mean: float | None,
+    ) -> None:
+        """Add a closed day; days must be appended in increasing order."""
+        if self._days and day <= self._days[-1]:
+            return
+        self._days.append(day)
+        self._offline.append(offline_seconds)
+        self._transitions.append(min(transitions, 65535))
+        self._battery_min.append(_NO_BATTERY if battery_min is None else battery_min)
+        self._signal_mean.append(math.nan if signal_mean is None else signal_mean)
+
+    def _row(self, i: int) -> DailyRollup:
+        """Build the rollup stored at index i."""
+        battery_min = self._battery_min[i]
+        signal_mean = self._signal_mean[i]
+        return DailyRollup(
+            day=self._days[i],
+            offline_seconds=self._offline[i],
+            transitions=self._transitions[i],
+            battery_min=None if battery_min == _NO_BATTERY else battery_min,
+            signal_mean=None if math.isnan(signal_mean) else signal_mean,
+        )
+
+    def get(self, day: int) -> DailyRollup | None:
+        """Return the rollup of one day, if stored."""
+        i = bisect_left(self._days, day)
+        if i < len(self._days) and self._days[i] == day:
+            return self._row(i)
+        return None
+
+    def items(self, first_day: int, last_day: int) -> Iterator[DailyRollup]:
+        """Yield stored rollups between two day ordinals (inclusive)."""
+        days = self._days
+        for i in range(bisect_left(days, first_day), len(days)):
+            if days[i] > last_day:
+                break
+            yield self._row(i)
+
+    def drop_before(self, day: int) -> int:
+        """Remove days older than the given ordinal and return how many."""
+        removed = bisect_left(self._days, day)
+        if removed:
+            for name in self.__slots__:
+                column = getattr(self, name)
+                del column[:removed]
+        return removed
+
+    def as_dict(self) -> dict[str, list]:
+        """Return a JSON-serializable columnar copy."""
+        return {
+            "day": self._days.tolist(),
+            "offline": [round(v, 1) for v in self._offline],
+            "transitions": self._transitions.tolist(),
+            "battery_min": [None if v == _NO_BATTERY else v for v in self._battery_min],
+            "signal_mean": [None if math.isnan(v) else round(v, 2) for v in self._signal_mean],
+        }
+
+    def load(self, stored: dict[str, Any]) -> None:
+        """Fill the columns from storage."""
+        for row in zip(
+            stored.get("day", []),
+            stored.get("offline", []),
+            stored.get("transitions", []),
+            stored.get("battery_min", []),
+            stored.get("signal_mean", []),
+        ):
+            self.append(*row)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the bytes used by the columns."""
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name in self.__slots__)
+        )
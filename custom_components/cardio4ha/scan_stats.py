@@ -0,0 +1,162 @@
+"""Per-phase scan profiling for Cardio4HA."""
+from __future__ import annotations
+
+from collections import deque
+import time
+from typing import Any
+
+from .const import SCAN_STATS_HISTORY
+
+# Scan phases in the order they run. Registry lookups and exclusion
+# matching are interleaved with classification per entity, so they are
+# accumulated with add() and carved out of the classify phase.
+PHASE_REGISTRY = "registry"
+PHASE_EXCLUSION = "exclusion"
+PHASE_CLASSIFY = "classify"
+PHASE_EVALUATE = "evaluate"
+PHASE_SEVERITY = "severity"
+PHASE_HISTORY = "history_events"
+PHASE_FLAKY = "flaky"
+PHASE_PREDICTIONS = "predictions"
+PHASE_INDEX = "index_rollups"
+PHASES = [
+    PHASE_REGISTRY,
+    PHASE_EXCLUSION,
+    PHASE_CLASSIFY,
+    PHASE_EVALUATE,
+    PHASE_SEVERITY,
+    PHASE_HISTORY,
+    PHASE_FLAKY,
+    PHASE_PREDICTIONS,
+    PHASE_INDEX,
+]
+
+# Counters kept per scan
+COUNTER_VISITED = "entities_visited"
+COUNTER_EXCLUDED = "excluded"
+COUNTER_CLASSIFIED = "classified"
+COUNTER_DEVICES = "devices_evaluated"
+COUNTER_HISTORY_WRITES = "history_writes"
+
+
+class ScanProfile:
+    """Phase timings and counters of one scan.
+
+    mark(phase) charges the time since the previous mark to a phase, so a
+    scan is profiled with one call at the end of each phase. add(phase, t)
+    charges time measured inside the running phase to another one; it is
+    left out of the running phase's next mark. Times are wall clock and
+    include the yields between slices.
+    """
+
+    __slots__ = (
+        "started", "mode", "analytics", "phases", "counters", "slices", "_last", "_carved",
+    )
+
+    def __init__(self, mode: str) -> None:
+        """Start profiling a scan."""
+        self.started = time.time()
+        self.mode = mode
+        # Whether flaky detection, predictions and rollups ran in this scan
+        self.analytics = False
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = dict.fromkeys(
+            (COUNTER_VISITED, COUNTER_EXCLUDED, COUNTER_CLASSIFIED,
+             COUNTER_DEVICES, COUNTER_HISTORY_WRITES),
+            0,
+        )
+        self.slices = 1
+        self._last = time.perf_counter()
+        self._carved = 0.0
+
+    def mark(self, phase: str) -> None:
+        """Charge the time since the previous mark, less added time, to a phase."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last - self._carved
+        self._last = now
+        self._carved = 0.0
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Charge time measured within the running phase to another phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self._carved += seconds
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[counter] += amount
+
+    @property
+    def total(self) -> float:
+        """Return the summed time of all phases."""
+        return sum(self.phases.values())
+
+    @property
+    def entities_per_second(self) -> float | None:
+        """Return the classification throughput of the scan, lookups included."""
+        classify = sum(
+            self.phases.get(name, 0.0) for name in (PHASE_REGISTRY, PHASE_EXCLUSION, PHASE_CLASSIFY)
+        )
+        if not classify or not self.counters[COUNTER_VISITED]:
+            return None
+        return round(self.counters[COUNTER_VISITED] / classify, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable copy, times in milliseconds."""
+        return {
+            "started": self.started,
+            "mode": self.mode,
+            "analytics": self.analytics,
+            "total_ms": round(self.total * 1000, 2),
+            "phases_ms": {name: round(value * 1000, 2) for name, value in self.phases.items()},
+            "counters": dict(self.counters),
+            "slices": self.slices,
+            "entities_per_second": self.entities_per_second,
+        }
+
+
+class ScanStats:
+    """Ring buffer of the most recent scan profiles."""
+
+    def __init__(self, size: int = SCAN_STATS_HISTORY) -> None:
+        """Initialize an empty buffer."""
+        self._profiles: deque[ScanProfile] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of buffered scans."""
+        return len(self._profiles)
+
+    def add(self, profile: ScanProfile) -> None:
+        """Keep a finished scan, dropping the oldest when full."""
+        self._profiles.append(profile)
+
+    @property
+    def last(self) -> ScanProfile | None:
+        """Return the most recent scan."""
+        return self._profiles[-1] if self._profiles else None
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return all buffered scans, oldest first."""
+        return [profile.as_dict() for profile in self._profiles]
+
+    def summary(self) -> dict[str, Any]:
+        """Return per-phase mean and max over the buffered scans, in milliseconds."""
+        profiles = list(self._profiles)
+        if not profiles:
+            return {"scans": 0, "phases_ms": {}}
+        phases = {}
+        for name in PHASES:
+            values = [p.phases[name] for p in profiles if name in p.phases]
+            if values:
+                phases[name] = {
+                    "mean": round(sum(values) / len(values) * 1000, 2),
+                    "max": round(max(values) * 1000, 2),
+                }
+        totals = [p.total for p in profiles]
+        return {
+            "scans": len(profiles),
+            "phases_ms": phases,
+            "total_ms": {
+                "mean": round(sum(totals) / len(totals) * 1000, 2),
+                "max": round(max(totals) * 1000, 2),
+            },
+        }
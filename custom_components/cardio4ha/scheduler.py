@@ -0,0 +1,112 @@
+"""Deadline scheduler for Cardio4HA."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import heapq
+import itertools
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Deadline kinds
+DEADLINE_MAINTENANCE = "maintenance"
+DEADLINE_ESCALATION = "escalation"
+
+
+class DeadlineScheduler:
+    """Min-heap of (deadline, kind, key) entries driven by a single HA timer.
+
+    Each (kind, key) has at most one live deadline; rescheduling or
+    cancelling leaves the old heap entry behind and it is skipped when it
+    reaches the top. Due entries are handed to on_due grouped by kind.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        on_due: Callable[[dict[str, set[str]]], None],
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._on_due = on_due
+        self._heap: list[tuple[datetime, int, str, str]] = []
+        self._deadlines: dict[tuple[str, str], datetime] = {}
+        self._counter = itertools.count()
+        self._timer_at: datetime | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    def __len__(self) -> int:
+        """Return the number of live deadlines."""
+        return len(self._deadlines)
+
+    def get(self, kind: str, key: str) -> datetime | None:
+        """Return the live deadline for (kind, key), if any."""
+        return self._deadlines.get((kind, key))
+
+    @callback
+    def schedule(self, kind: str, key: str, when: datetime) -> None:
+        """Set the deadline for (kind, key), replacing any earlier one."""
+        if self._deadlines.get((kind, key)) == when:
+            return
+        self._deadlines[(kind, key)] = when
+        heapq.heappush(self._heap, (when, next(self._counter), kind, key))
+        if self._timer_at is None or when < self._timer_at:
+            self._arm(when)
+
+    @callback
+    def cancel(self, kind: str, key: str) -> None:
+        """Drop the deadline for (kind, key), if any."""
+        self._deadlines.pop((kind, key), None)
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the timer and forget all deadlines."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_at = None
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def _arm(self, when: datetime) -> None:
+        """Point the single timer at the given deadline."""
+        if self._unsub_timer:
+            self._unsub_timer()
+        self._timer_at = when
+        self._unsub_timer = async_track_point_in_utc_time(
+            self._hass, self._async_fire, when
+        )
+
+    @callback
+    def _async_fire(self, _now: datetime) -> None:
+        """Pop every due deadline, hand them over and re-arm for the next one."""
+        self._unsub_timer = None
+        self._timer_at = None
+        now = dt_util.utcnow()
+        due: dict[str, set[str]] = {}
+
+        while self._heap:
+            when, _, kind, key = self._heap[0]
+            if self._deadlines.get((kind, key)) != when:
+                # Stale entry: cancelled or rescheduled since it was pushed
+                heapq.heappop(self._heap)
+                continue
+            if when > now:
+                break
+            heapq.heappop(self._heap)
+            del self._deadlines[(kind, key)]
+            due.setdefault(kind, set()).add(key)
+
+        if self._heap:
+            self._arm(self._heap[0][0])
+
+        if due:
+            try:
+                self._on_due(due)
+            except Exception:
+                _LOGGER.exception("Error handling Cardio4HA deadlines")
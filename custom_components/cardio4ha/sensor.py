@@ -1,11 +1,18 @@
 """Sensor platform for Cardio4HA."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from typing import Any
+
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import slugify
 
 from .const import (
     DOMAIN,
@@ -19,9 +26,67 @@ from .const import (
     SENSOR_LAST_SCAN_DURATION,
     SENSOR_HEALTH_SCORE,
     SENSOR_FLAKY_DEVICES_COUNT,
+    SENSOR_GROUP_HEALTH,
+    SENSOR_SCAN_THROUGHPUT,
+    CONF_GROUP_SENSORS,
+    DEFAULT_GROUP_SENSORS,
+    GROUP_BY_AREA,
 )
 from .coordinator import Cardio4HACoordinator
 
+# Devices listed in a count sensor's attributes
+ATTRIBUTE_MAX_DEVICES = 10
+
+
+def _unavailable_ref(device: dict[str, Any]) -> dict[str, Any]:
+    """Return a compact reference to an unavailable device."""
+    since = device.get("since")
+    return {
+        "name": device.get("name"),
+        "entity_id": device.get("entity_id"),
+        "severity": device.get("severity"),
+        "since": since.isoformat() if hasattr(since, "isoformat") else since,
+    }
+
+
+def _battery_ref(device: dict[str, Any]) -> dict[str, Any]:
+    """Return a compact reference to a low battery device."""
+    return {
+        "name": device.get("name"),
+        "entity_id": device.get("entity_id"),
+        "battery_level": device.get("battery_level"),
+        "severity": device.get("severity"),
+    }
+
+
+def _signal_ref(device: dict[str, Any]) -> dict[str, Any]:
+    """Return a compact reference to a weak signal device."""
+    return {
+        "name": device.get("name"),
+        "entity_id": device.get("entity_id"),
+        "signal_type": device.get("signal_type"),
+        "value": device.get("linkquality") if device.get("linkquality") is not None else device.get("rssi"),
+        "severity": device.get("severity"),
+    }
+
+
+def _flaky_ref(device: dict[str, Any]) -> dict[str, Any]:
+    """Return a compact reference to a flaky device."""
+    return {
+        "name": device.get("name"),
+        "device_key": device.get("device_key"),
+        "offline_count_30d": device.get("offline_count_30d"),
+    }
+
+
+# sensor type -> (coordinator data list, compact reference builder)
+_COMPACT_DEVICE: dict[str, tuple[str, Callable[[dict[str, Any]], dict[str, Any]]]] = {
+    SENSOR_UNAVAILABLE_COUNT: ("unavailable", _unavailable_ref),
+    SENSOR_LOW_BATTERY_COUNT: ("low_battery", _battery_ref),
+    SENSOR_WEAK_SIGNAL_COUNT: ("weak_signal", _signal_ref),
+    SENSOR_FLAKY_DEVICES_COUNT: ("flaky_devices", _flaky_ref),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -41,10 +106,75 @@ async def async_setup_entry(
         Cardio4HASensor(coordinator, SENSOR_LAST_SCAN_DURATION),
         Cardio4HASensor(coordinator, SENSOR_HEALTH_SCORE),
         Cardio4HASensor(coordinator, SENSOR_FLAKY_DEVICES_COUNT),
+        Cardio4HASensor(coordinator, SENSOR_SCAN_THROUGHPUT),
     ]
 
     async_add_entities(sensors)
 
+    # One health sensor per area / integration while the option is on and the
+    # group has monitored devices. Sensors of groups that leave are removed
+    # from the platform and keep their registry entries (and customisations)
+    # for when the group comes back; only groups deleted from Home Assistant
+    # lose their registry entries as well.
+    group_sensors: dict[tuple[str, str], Cardio4HAGroupSensor] = {}
+
+    @callback
+    def _async_sync_group_sensors() -> None:
+        """Add sensors for new groups and remove those of groups that left."""
+        wanted: set[tuple[str, str]] = set()
+        if entry.options.get(CONF_GROUP_SENSORS, DEFAULT_GROUP_SENSORS):
+            area_registry = ar.async_get(hass)
+            rollups = (coordinator.data or {}).get("group_rollups", {})
+            for group_by, groups in rollups.items():
+                for name in groups:
+                    if name is None:
+                        continue
+                    if group_by == GROUP_BY_AREA:
+                        # Areas are keyed by id: names can be renamed and slugify alike
+                        area = area_registry.async_get_area_by_name(name)
+                        if area is not None:
+                            wanted.add((group_by, area.id))
+                    else:
+                        wanted.add((group_by, name))
+
+        entity_registry = er.async_get(hass)
+        for group_key in [key for key in group_sensors if key not in wanted]:
+            sensor = group_sensors.pop(group_key)
+            if sensor.registry_entry is not None and not _group_exists(hass, *group_key):
+                entity_registry.async_remove(sensor.entity_id)
+            else:
+                hass.async_create_task(sensor.async_remove())
+
+        new_sensors = []
+        for group_by, group_id in wanted - group_sensors.keys():
+            sensor = Cardio4HAGroupSensor(coordinator, group_by, group_id)
+            _migrate_group_unique_id(entity_registry, sensor)
+            group_sensors[(group_by, group_id)] = sensor
+            new_sensors.append(sensor)
+        if new_sensors:
+            async_add_entities(new_sensors)
+
+    _async_sync_group_sensors()
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_group_sensors))
+
+
+def _group_exists(hass: HomeAssistant, group_by: str, group_id: str) -> bool:
+    """Return whether an area or integration still exists in Home Assistant."""
+    if group_by == GROUP_BY_AREA:
+        return ar.async_get(hass).async_get_area(group_id) is not None
+    return group_id in hass.config.components
+
+
+@callback
+def _migrate_group_unique_id(entity_registry: er.EntityRegistry, sensor: Cardio4HAGroupSensor) -> None:
+    """Move a registry entry from the old name-slug unique_id to the sensor's."""
+    if entity_registry.async_get_entity_id("sensor", DOMAIN, sensor.unique_id):
+        return
+    old_unique_id = f"{DOMAIN}_{sensor.group_by}_{slugify(sensor.group_name)}_health"
+    entity_id = entity_registry.async_get_entity_id("sensor", DOMAIN, old_unique_id)
+    if entity_id:
+        entity_registry.async_update_entity(entity_id, new_unique_id=sensor.unique_id)
+
 
 class Cardio4HASensor(CoordinatorEntity, SensorEntity):
     """Cardio4HA Sensor."""
@@ -95,10 +225,20 @@ class Cardio4HASensor(CoordinatorEntity, SensorEntity):
         elif sensor_type == SENSOR_FLAKY_DEVICES_COUNT:
             self._attr_name = "Flaky Devices"
             self._attr_icon = "mdi:swap-horizontal"
+        elif sensor_type == SENSOR_SCAN_THROUGHPUT:
+            self._attr_name = "Scan Throughput"
+            self._attr_icon = "mdi:speedometer"
+            self._attr_native_unit_of_measurement = "entities/s"
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
+            # Changes every scan, so it only records when asked for
+            self._attr_entity_registry_enabled_default = False
 
-    @property
-    def native_value(self) -> int | float | None:
-        """Return the state of the sensor."""
+        self._fingerprint: tuple | None = None
+        self._update_state()
+
+    def _compute_value(self) -> int | float | None:
+        """Return the state of the sensor from the coordinator data."""
         if not self.coordinator.data:
             return None
 
@@ -120,36 +260,102 @@ class Cardio4HASensor(CoordinatorEntity, SensorEntity):
             return self.coordinator.data.get("health_score", 100)
         elif self._sensor_type == SENSOR_FLAKY_DEVICES_COUNT:
             return self.coordinator.data.get("flaky_count", 0)
+        elif self._sensor_type == SENSOR_SCAN_THROUGHPUT:
+            return self.coordinator.data.get("entities_per_second")
 
         return None
 
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return additional attributes."""
+    def _compute_attributes(self) -> dict[str, Any]:
+        """Return compact references to the top devices of the sensor's list."""
         if not self.coordinator.data:
             return {}
 
-        if self._sensor_type == SENSOR_UNAVAILABLE_COUNT:
-            devices = self.coordinator.data["unavailable"][:10]
-            return {
-                "devices": devices,
-                "count": len(self.coordinator.data["unavailable"]),
-            }
-        elif self._sensor_type == SENSOR_LOW_BATTERY_COUNT:
-            devices = self.coordinator.data["low_battery"][:10]
-            return {
-                "devices": devices,
-                "count": len(self.coordinator.data["low_battery"]),
-            }
-        elif self._sensor_type == SENSOR_WEAK_SIGNAL_COUNT:
-            devices = self.coordinator.data["weak_signal"][:10]
-            return {
-                "devices": devices,
-                "count": len(self.coordinator.data["weak_signal"]),
-            }
-        elif self._sensor_type == SENSOR_FLAKY_DEVICES_COUNT:
-            return {
-                "devices": self.coordinator.data.get("flaky_devices", []),
-            }
+        compact = _COMPACT_DEVICE.get(self._sensor_type)
+        if compact is None:
+            return {}
+        list_key, to_ref = compact
+        devices = self.coordinator.data.get(list_key, [])
+        return {
+            "devices": [to_ref(device) for device in devices[:ATTRIBUTE_MAX_DEVICES]],
+            "count": len(devices),
+        }
+
+    @callback
+    def _update_state(self) -> bool:
+        """Recompute value and attributes; return whether they changed."""
+        value = self._compute_value()
+        attributes = self._compute_attributes()
+        # Attribute values are plain tuples/strings/numbers, so equality is cheap
+        fingerprint = (self.available, value, attributes)
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when it changed."""
+        if self._update_state():
+            self.async_write_ha_state()
+
+
+class Cardio4HAGroupSensor(Cardio4HASensor):
+    """Health score of one area or integration."""
 
-        return {}
+    def __init__(self, coordinator: Cardio4HACoordinator, group_by: str, group_id: str) -> None:
+        """Initialize the sensor for an area id or integration domain."""
+        self.group_by = group_by
+        self._group_id = group_id
+        super().__init__(coordinator, SENSOR_GROUP_HEALTH)
+        self._attr_unique_id = f"{coordinator.entry.entry_id}_{group_by}_{group_id}_health"
+        if group_by == GROUP_BY_AREA:
+            self._attr_icon = "mdi:home-heart"
+        else:
+            self._attr_icon = "mdi:puzzle-heart"
+        self._attr_native_unit_of_measurement = "%"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def group_name(self) -> str:
+        """Return the current area name, or the integration domain."""
+        if self.group_by == GROUP_BY_AREA:
+            area = ar.async_get(self.coordinator.hass).async_get_area(self._group_id)
+            return area.name if area is not None else self._group_id
+        return self._group_id
+
+    @property
+    def name(self) -> str:
+        """Return the name, following area renames."""
+        if self.group_by == GROUP_BY_AREA:
+            return f"{self.group_name} Health Score"
+        return f"{self.group_name} Integration Health Score"
+
+    def _group_rollup(self) -> dict[str, int] | None:
+        """Return this group's rollup from the last scan, if it still exists."""
+        rollups = (self.coordinator.data or {}).get("group_rollups", {})
+        return rollups.get(self.group_by, {}).get(self.group_name)
+
+    @property
+    def available(self) -> bool:
+        """Return True while the group still has monitored devices."""
+        return super().available and self._group_rollup() is not None
+
+    def _compute_value(self) -> int | None:
+        """Return the group's health score."""
+        rollup = self._group_rollup()
+        return rollup["health_score"] if rollup else None
+
+    def _compute_attributes(self) -> dict[str, Any]:
+        """Return the group's device counts."""
+        rollup = self._group_rollup()
+        if not rollup:
+            return {}
+        return {
+            "monitored": rollup["monitored"],
+            "unavailable": rollup["unavailable"],
+            "low_battery": rollup["low_battery"],
+            "weak_signal": rollup["weak_signal"],
+            "flaky": rollup["flaky"],
+        }
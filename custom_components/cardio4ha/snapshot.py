@@ -0,0 +1,78 @@
+"""Persisted last-scan snapshot for Cardio4HA warm starts.
+
+The snapshot holds what the panel and sensors show (summary, issue lists,
+flaky devices, predictions, rollups) so a restart or reload can serve the
+last known results, marked stale, until the first real scan completes.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import GROUP_BY
+from .records import ResultRecord
+
+# Result lists stored as JSON rows
+SNAPSHOT_LISTS = ("unavailable", "low_battery", "weak_signal", "flaky_devices")
+
+
+def _row(record: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the JSON form of a result row."""
+    if isinstance(record, ResultRecord):
+        return record.as_dict()
+    return {
+        key: value.isoformat() if hasattr(value, "isoformat") else value
+        for key, value in record.items()
+    }
+
+
+def build_snapshot(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the storable snapshot of a completed scan result."""
+    snapshot: dict[str, Any] = {
+        name: [_row(record) for record in data.get(name, [])] for name in SNAPSHOT_LISTS
+    }
+    snapshot.update({
+        "last_update": data["last_update"].isoformat(),
+        "scan_duration": data.get("scan_duration", 0),
+        "summary": data["summary"],
+        "health_score": data["health_score"],
+        "battery_predictions": data.get("battery_predictions", {}),
+        # Lists of [name, counts] pairs: group names can be None, which JSON keys can't
+        "group_rollups": {
+            group_by: [[name, counts] for name, counts in data.get("group_rollups", {}).get(group_by, {}).items()]
+            for group_by in GROUP_BY
+        },
+    })
+    return snapshot
+
+
+def restore_snapshot(stored: Mapping[str, Any]) -> dict[str, Any] | None:
+    """Return coordinator data rebuilt from a stored snapshot, or None if unusable."""
+    try:
+        last_update = dt_util.parse_datetime(stored["last_update"])
+        data: dict[str, Any] = {name: list(stored.get(name, [])) for name in SNAPSHOT_LISTS}
+        data.update({
+            "summary": dict(stored["summary"]),
+            "health_score": stored["health_score"],
+            "flaky_device_keys": {dev["device_key"] for dev in data["flaky_devices"]},
+            "flaky_count": len(data["flaky_devices"]),
+            "battery_predictions": dict(stored.get("battery_predictions", {})),
+            "group_rollups": {
+                group_by: {name: counts for name, counts in stored.get("group_rollups", {}).get(group_by, [])}
+                for group_by in GROUP_BY
+            },
+            "analytics_updated": None,
+            "last_update": last_update,
+            "scan_duration": stored.get("scan_duration", 0),
+            "scan_mode": "snapshot",
+            "entities_scanned": 0,
+            "scan_slices": 0,
+            "entities_per_second": None,
+        })
+    except (KeyError, TypeError, ValueError):
+        return None
+    if last_update is None:
+        return None
+    return data
@@ -0,0 +1,238 @@
+"""Shared, delta-encoded payload feed for Cardio4HA WebSocket subscribers."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import JSON_DUMP
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import PAYLOAD_COALESCE_WINDOW
+from .records import record_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# Payload lists whose records are patched individually, keyed by device_key
+KEYED_LISTS = ("unavailable", "low_battery", "weak_signal", "flaky_devices")
+
+# Message kinds sent to delta subscribers
+MESSAGE_SNAPSHOT = "snapshot"
+MESSAGE_PATCH = "patch"
+# Internal kind for the plain payload sent to full subscribers
+MESSAGE_FULL = "full"
+
+
+def diff_payload(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Return the patch turning one serialized payload into another.
+
+    Keyed lists become {added: [records], removed: [keys], changed: {key:
+    {field: value}}, unset: {key: [fields]}, order: [keys]}. changed sets
+    fields (null is a value like any other), unset lists fields a record no
+    longer has, and order is only present when the order of keys changed.
+    Other top-level fields that differ are listed under "set". An empty dict
+    means nothing changed.
+    """
+    patch: dict[str, Any] = {}
+    for name in KEYED_LISTS:
+        old_records = {record_key(r): r for r in old.get(name, [])}
+        new_list = new.get(name, [])
+        new_keys = [record_key(r) for r in new_list]
+        list_patch: dict[str, Any] = {}
+
+        added = [r for k, r in zip(new_keys, new_list) if k not in old_records]
+        if added:
+            list_patch["added"] = added
+        new_key_set = set(new_keys)
+        removed = [k for k in old_records if k not in new_key_set]
+        if removed:
+            list_patch["removed"] = removed
+
+        changed = {}
+        unset = {}
+        for key, record in zip(new_keys, new_list):
+            previous = old_records.get(key)
+            if previous is None or previous == record:
+                continue
+            fields = {
+                f: v for f, v in record.items() if f not in previous or previous[f] != v
+            }
+            if fields:
+                changed[key] = fields
+            gone = [f for f in previous if f not in record]
+            if gone:
+                unset[key] = gone
+        if changed:
+            list_patch["changed"] = changed
+        if unset:
+            list_patch["unset"] = unset
+
+        old_order = [k for k in old_records if k in new_key_set]
+        old_order.extend(k for k in new_keys if k not in old_records)
+        if old_order != new_keys:
+            list_patch["order"] = new_keys
+
+        if list_patch:
+            patch[name] = list_patch
+
+    updates = {
+        name: value for name, value in new.items()
+        if name not in KEYED_LISTS and old.get(name) != value
+    }
+    if updates:
+        patch["set"] = updates
+    return patch
+
+
+class PayloadFeed:
+    """Builds the panel payload once per coordinator update for every subscriber.
+
+    Full subscribers receive the payload itself; delta subscribers receive a
+    snapshot with a sequence number once and then only sequence-numbered
+    patches. A client that sees a gap in the sequence asks for a resync and
+    gets a fresh snapshot.
+
+    Each message kind is JSON-encoded at most once per sequence number and the
+    same string goes to every subscriber. Coordinator updates arriving within
+    PAYLOAD_COALESCE_WINDOW of each other are pushed once.
+    """
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        build: Callable[[], dict[str, Any]],
+    ) -> None:
+        """Initialize the feed."""
+        self.coordinator = coordinator
+        self._build = build
+        self.seq = 0
+        self.payload: dict[str, Any] | None = None
+        self._patch: dict[str, Any] | None = None
+        self._encoded: dict[str, str] = {}
+        self._subscribers: dict[int, tuple[Any, bool, Callable[[str], None]]] = {}
+        self._next_token = 0
+        self._unsub_coordinator: CALLBACK_TYPE | None = None
+        self._unsub_push: CALLBACK_TYPE | None = None
+
+    @callback
+    def subscribe(
+        self,
+        owner: Any,
+        delta: bool,
+        send: Callable[[str], None],
+    ) -> CALLBACK_TYPE:
+        """Register a subscriber and send it the current state.
+
+        send receives the JSON-encoded event of each message.
+        """
+        if not self._subscribers:
+            # Nobody was listening, so the cached payload may be stale
+            self._set_payload(None, None)
+            self._unsub_coordinator = self.coordinator.async_add_listener(
+                self._async_on_update
+            )
+        token = self._next_token
+        self._next_token += 1
+        self._subscribers[token] = (owner, delta, send)
+
+        if self.coordinator.data:
+            if self.payload is None:
+                self._set_payload(self._build(), None)
+            send(self._encode(MESSAGE_SNAPSHOT if delta else MESSAGE_FULL))
+
+        @callback
+        def unsubscribe() -> None:
+            self._subscribers.pop(token, None)
+            if self._subscribers:
+                return
+            if self._unsub_coordinator:
+                self._unsub_coordinator()
+                self._unsub_coordinator = None
+            if self._unsub_push:
+                self._unsub_push()
+                self._unsub_push = None
+
+        return unsubscribe
+
+    @callback
+    def close(self) -> None:
+        """Drop every subscriber and cancel the listener and pending push.
+
+        Called when the config entry unloads; the subscriptions' own
+        unsubscribe callbacks become no-ops.
+        """
+        self._subscribers.clear()
+        if self._unsub_coordinator:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+        if self._unsub_push:
+            self._unsub_push()
+            self._unsub_push = None
+        self._set_payload(None, None)
+
+    @callback
+    def resync(self, owner: Any) -> int:
+        """Send a fresh snapshot to every delta subscription of an owner."""
+        count = 0
+        if self.payload is None:
+            return count
+        for sub_owner, delta, send in self._subscribers.values():
+            if sub_owner is owner and delta:
+                send(self._encode(MESSAGE_SNAPSHOT))
+                count += 1
+        return count
+
+    def _set_payload(
+        self, payload: dict[str, Any] | None, patch: dict[str, Any] | None
+    ) -> None:
+        """Make a payload current and drop the encodings of the previous one."""
+        self.payload = payload
+        self._patch = patch
+        self._encoded = {}
+        if payload is not None:
+            self.seq += 1
+
+    def _encode(self, kind: str) -> str:
+        """Return the current message of one kind, encoding it on first use."""
+        encoded = self._encoded.get(kind)
+        if encoded is None:
+            if kind == MESSAGE_FULL:
+                message = self.payload
+            elif kind == MESSAGE_SNAPSHOT:
+                message = {"type": MESSAGE_SNAPSHOT, "seq": self.seq, "data": self.payload}
+            else:
+                message = {"type": MESSAGE_PATCH, "seq": self.seq, "patch": self._patch}
+            encoded = self._encoded[kind] = JSON_DUMP(message)
+        return encoded
+
+    @callback
+    def _async_on_update(self) -> None:
+        """Schedule a push, gathering updates that follow closely."""
+        if self._unsub_push is None:
+            self._unsub_push = async_call_later(
+                self.coordinator.hass, PAYLOAD_COALESCE_WINDOW, self._async_push
+            )
+
+    @callback
+    def _async_push(self, _now: Any) -> None:
+        """Rebuild the payload and push it (or the patch) to subscribers."""
+        self._unsub_push = None
+        try:
+            new = self._build()
+        except Exception:
+            _LOGGER.exception("Error building WebSocket payload")
+            return
+        old = self.payload
+        patch = diff_payload(old, new) if old is not None else None
+        if patch == {}:
+            return
+        self._set_payload(new, patch)
+
+        for _owner, delta, send in list(self._subscribers.values()):
+            kind = MESSAGE_FULL if not delta else MESSAGE_SNAPSHOT if patch is None else MESSAGE_PATCH
+            try:
+                send(self._encode(kind))
+            except Exception:
+                _LOGGER.exception("Error sending WebSocket update")
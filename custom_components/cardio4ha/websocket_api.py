@@ -3,12 +3,16 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 import logging
+import math
+import time
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -29,7 +33,23 @@ from .const import (
     DEFAULT_UNAVAILABLE_WARNING,
     DEFAULT_UNAVAILABLE_CRITICAL,
     DEFAULT_UPDATE_INTERVAL,
+    TIMELINE_BUCKET_DAY,
+    TIMELINE_BUCKETS,
+    TIMELINE_MAX_BUCKETS,
+    FLEET_TIMELINE_MAX_CELLS,
+    QUERY_CATEGORIES,
+    QUERY_DEFAULT_LIMIT,
+    QUERY_MAX_LIMIT,
+    GROUP_BY,
+    SEVERITY_CRITICAL,
+    SEVERITY_WARNING,
+    SEVERITY_LOW,
+    SEVERITY_OK,
 )
+from .device_history import timeline_edges
+from .subscription import PayloadFeed
+from .persistence import PERSIST_HISTORY, PERSIST_UNAVAILABLE
+from .records import ResultRecord
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,11 +57,16 @@ _LOGGER = logging.getLogger(__name__)
 def async_register_websocket_api(hass: HomeAssistant) -> None:
     """Register WebSocket API commands."""
     websocket_api.async_register_command(hass, websocket_subscribe)
+    websocket_api.async_register_command(hass, websocket_resync)
     websocket_api.async_register_command(hass, websocket_force_scan)
     websocket_api.async_register_command(hass, websocket_set_maintenance)
     websocket_api.async_register_command(hass, websocket_clear_maintenance)
     websocket_api.async_register_command(hass, websocket_clear_history)
     websocket_api.async_register_command(hass, websocket_get_device_timeline)
+    websocket_api.async_register_command(hass, websocket_get_fleet_timeline)
+    websocket_api.async_register_command(hass, websocket_query)
+    websocket_api.async_register_command(hass, websocket_get_group_rollups)
+    websocket_api.async_register_command(hass, websocket_scan_stats)
     websocket_api.async_register_command(hass, websocket_set_ignore)
     websocket_api.async_register_command(hass, websocket_clear_ignore)
     websocket_api.async_register_command(hass, websocket_update_config)
@@ -61,6 +86,9 @@ def _get_coordinator(hass: HomeAssistant):
 
 def _serialize_value(v: Any) -> Any:
     """Recursively serialize values for JSON transport."""
+    if isinstance(v, ResultRecord):
+        # Built once per change and shared; never mutated downstream
+        return v.as_dict()
     if isinstance(v, datetime):
         return v.isoformat()
     if isinstance(v, timedelta):
@@ -70,10 +98,46 @@ def _serialize_value(v: Any) -> Any:
     if isinstance(v, list):
         return [_serialize_value(item) for item in v]
     if isinstance(v, set):
-        return list(v)
+        # Sorted so unchanged sets compare equal between payloads
+        return sorted(v)
     return v
 
 
+def _parse_local_datetime(value: str) -> datetime | None:
+    """Parse an ISO date/datetime, reading naive values as HA local time."""
+    parsed = dt_util.parse_datetime(value)
+    if parsed is None:
+        day = dt_util.parse_date(value)
+        if day is None:
+            return None
+        return dt_util.start_of_local_day(day)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return parsed
+
+
+def _resolve_range(msg: dict) -> tuple[datetime, datetime, list[datetime]]:
+    """Return (start, end, bucket edges) for a timeline request.
+
+    Explicit start/end are ISO dates or datetimes; otherwise the range is the
+    last `days` days up to now. Raises ValueError for an invalid or too
+    finely bucketed range.
+    """
+    days = msg.get("days", 30)
+    bucket = msg["bucket"]
+    end = _parse_local_datetime(msg["end"]) if "end" in msg else dt_util.now()
+    start = (
+        _parse_local_datetime(msg["start"]) if "start" in msg
+        else end - timedelta(days=days) if end else None
+    )
+    if start is None or end is None or start >= end:
+        raise ValueError("Invalid start/end")
+    edges = timeline_edges(start, end, bucket)
+    if len(edges) - 1 > TIMELINE_MAX_BUCKETS:
+        raise ValueError(f"Range spans more than {TIMELINE_MAX_BUCKETS} {bucket} buckets")
+    return start, end, edges
+
+
 def _build_payload(hass: HomeAssistant, coordinator) -> dict:
     """Build the full data payload for the panel."""
     data = coordinator.data or {}
@@ -122,13 +186,26 @@ def _build_payload(hass: HomeAssistant, coordinator) -> dict:
         "last_update": data.get("last_update"),
         "scan_duration": data.get("scan_duration", 0),
         "startup_remaining": coordinator.startup_remaining,
+        "stale": data.get("stale", False),
     }
 
     return _serialize_value(payload)
 
 
+def _get_feed(hass: HomeAssistant, coordinator) -> PayloadFeed:
+    """Return the shared payload feed of a coordinator, creating it on first use."""
+    feeds: dict[str, PayloadFeed] = hass.data.setdefault(f"{DOMAIN}_feeds", {})
+    feed = feeds.get(coordinator.entry.entry_id)
+    if feed is None or feed.coordinator is not coordinator:
+        # First subscriber, or the entry was reloaded with a new coordinator
+        feed = PayloadFeed(coordinator, lambda: _build_payload(hass, coordinator))
+        feeds[coordinator.entry.entry_id] = feed
+    return feed
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): "cardio4ha/subscribe",
+    vol.Optional("delta", default=False): bool,
 })
 @websocket_api.async_response
 async def websocket_subscribe(
@@ -136,33 +213,46 @@ async def websocket_subscribe(
     connection: websocket_api.ActiveConnection,
     msg: dict,
 ) -> None:
-    """Subscribe to Cardio4HA data updates."""
+    """Subscribe to Cardio4HA data updates.
+
+    With delta=True the client gets {type: snapshot, seq, data} once and then
+    {type: patch, seq, patch} messages; otherwise every update is the full
+    payload.
+    """
     coordinator = _get_coordinator(hass)
     if not coordinator:
         connection.send_error(msg["id"], "not_found", "Cardio4HA coordinator not found")
         return
 
     @callback
-    def async_on_update():
-        """Forward coordinator updates to the WebSocket client."""
-        try:
-            payload = _build_payload(hass, coordinator)
-            connection.send_message(
-                websocket_api.event_message(msg["id"], payload)
-            )
-        except Exception:
-            _LOGGER.exception("Error sending WebSocket update")
-
-    unsub = coordinator.async_add_listener(async_on_update)
-    connection.subscriptions[msg["id"]] = unsub
-
-    connection.send_result(msg["id"])
-    if coordinator.data:
-        payload = _build_payload(hass, coordinator)
+    def send(event_json: str) -> None:
+        """Wrap a pre-encoded feed message in this subscription's event envelope."""
         connection.send_message(
-            websocket_api.event_message(msg["id"], payload)
+            f'{{"id":{msg["id"]},"type":"event","event":{event_json}}}'
         )
 
+    feed = _get_feed(hass, coordinator)
+    connection.send_result(msg["id"])
+    connection.subscriptions[msg["id"]] = feed.subscribe(connection, msg["delta"], send)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "cardio4ha/resync",
+})
+@callback
+def websocket_resync(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Send fresh snapshots to this connection's delta subscriptions."""
+    coordinator = _get_coordinator(hass)
+    if not coordinator:
+        connection.send_error(msg["id"], "not_found", "Coordinator not found")
+        return
+    count = _get_feed(hass, coordinator).resync(connection)
+    connection.send_result(msg["id"], {"resynced": count})
+
 
 @websocket_api.websocket_command({
     vol.Required("type"): "cardio4ha/force_scan",
@@ -179,6 +269,7 @@ async def websocket_force_scan(
         connection.send_error(msg["id"], "not_found", "Coordinator not found")
         return
 
+    coordinator.request_full_scan()
     await coordinator.async_refresh()
     connection.send_result(msg["id"], {"success": True})
 
@@ -262,8 +353,7 @@ async def websocket_clear_history(
         coordinator.unavailable_tracking = {}
         coordinator.device_history.clear_all()
 
-    await coordinator.async_save_unavailable_data()
-    await coordinator.device_history.async_save()
+    coordinator.persistence.mark_dirty(PERSIST_UNAVAILABLE, PERSIST_HISTORY)
     connection.send_result(msg["id"], {"success": True})
 
 
@@ -271,6 +361,9 @@ async def websocket_clear_history(
     vol.Required("type"): "cardio4ha/get_device_timeline",
     vol.Required("device_key"): str,
     vol.Optional("days", default=30): int,
+    vol.Optional("start"): str,
+    vol.Optional("end"): str,
+    vol.Optional("bucket", default=TIMELINE_BUCKET_DAY): vol.In(TIMELINE_BUCKETS),
 })
 @websocket_api.async_response
 async def websocket_get_device_timeline(
@@ -286,14 +379,25 @@ async def websocket_get_device_timeline(
 
     device_key = msg["device_key"]
     days = msg.get("days", 30)
+    bucket = msg["bucket"]
 
-    timeline = coordinator.device_history.get_device_timeline(device_key, days)
+    if "start" in msg or "end" in msg or bucket != TIMELINE_BUCKET_DAY:
+        try:
+            start, end, _edges = _resolve_range(msg)
+        except ValueError as err:
+            connection.send_error(msg["id"], "invalid_format", str(err))
+            return
+        timeline = coordinator.device_history.get_timeline(device_key, start, end, bucket)
+        days = max(1, math.ceil((end - start).total_seconds() / 86400))
+    else:
+        timeline = coordinator.device_history.get_device_timeline(device_key, days)
     battery_readings = coordinator.device_history.get_battery_readings(device_key, days)
     signal_readings = coordinator.device_history.get_signal_readings(device_key, days)
     battery_prediction = coordinator.device_history.predict_battery_days(device_key)
 
     connection.send_result(msg["id"], {
         "device_key": device_key,
+        "bucket": bucket,
         "timeline": timeline,
         "battery_readings": battery_readings,
         "signal_readings": signal_readings,
@@ -301,6 +405,72 @@ async def websocket_get_device_timeline(
     })
 
 
+@websocket_api.websocket_command({
+    vol.Required("type"): "cardio4ha/get_fleet_timeline",
+    vol.Optional("device_keys"): [str],
+    vol.Optional("area"): str,
+    vol.Optional("integration"): str,
+    vol.Optional("severity"): vol.In(
+        [SEVERITY_CRITICAL, SEVERITY_WARNING, SEVERITY_LOW, SEVERITY_OK]
+    ),
+    vol.Optional("days", default=30): int,
+    vol.Optional("start"): str,
+    vol.Optional("end"): str,
+    vol.Optional("bucket", default=TIMELINE_BUCKET_DAY): vol.In(TIMELINE_BUCKETS),
+})
+@websocket_api.async_response
+async def websocket_get_fleet_timeline(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Get timelines of many devices in one columnar response."""
+    coordinator = _get_coordinator(hass)
+    if not coordinator:
+        connection.send_error(msg["id"], "not_found", "Coordinator not found")
+        return
+
+    try:
+        _start, _end, edges = _resolve_range(msg)
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_format", str(err))
+        return
+
+    if "device_keys" in msg:
+        device_keys = list(dict.fromkeys(msg["device_keys"]))
+    else:
+        device_keys = coordinator.filter_device_keys(
+            area=msg.get("area"),
+            integration=msg.get("integration"),
+            severity=msg.get("severity"),
+        )
+    if len(device_keys) * (len(edges) - 1) > FLEET_TIMELINE_MAX_CELLS:
+        connection.send_error(
+            msg["id"], "invalid_format",
+            f"Request spans more than {FLEET_TIMELINE_MAX_CELLS} device buckets",
+        )
+        return
+
+    # Copy the inputs on the event loop, then sweep them in the executor
+    history = coordinator.device_history
+    snapshot = history.snapshot_timelines(device_keys)
+    result = await hass.async_add_executor_job(
+        history.fleet_timeline, snapshot, edges, msg["bucket"], time.time()
+    )
+
+    names = []
+    areas = []
+    for device_key in device_keys:
+        name, area = coordinator.describe_device_key(device_key)
+        names.append(name)
+        areas.append(area)
+    result["names"] = names
+    result["areas"] = areas
+    result["battery_days"] = [history.predict_battery_days(key) for key in device_keys]
+
+    connection.send_result(msg["id"], result)
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): "cardio4ha/set_ignore",
     vol.Required("device_key"): str,
@@ -387,3 +557,123 @@ async def websocket_update_config(
 
     hass.config_entries.async_update_entry(entry, options=new_options)
     connection.send_result(msg["id"], {"success": True})
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "cardio4ha/query",
+    vol.Optional("category"): vol.All(cv.ensure_list, [vol.In(QUERY_CATEGORIES)]),
+    vol.Optional("severity"): vol.In(
+        [SEVERITY_CRITICAL, SEVERITY_WARNING, SEVERITY_LOW, SEVERITY_OK]
+    ),
+    vol.Optional("area"): str,
+    vol.Optional("integration"): str,
+    vol.Optional("text"): str,
+    vol.Optional("sort", default="name"): str,
+    vol.Optional("descending", default=False): bool,
+    vol.Optional("limit", default=QUERY_DEFAULT_LIMIT): vol.All(
+        int, vol.Range(min=1, max=QUERY_MAX_LIMIT)
+    ),
+    vol.Optional("cursor"): str,
+})
+@callback
+def websocket_query(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Return one filtered, sorted page of current issues.
+
+    Categories are unavailable, low_battery, weak_signal, flaky, maintenance
+    and ignored (all of them when omitted). Pass the returned next_cursor
+    with the same filters and sort to get the following page.
+    """
+    coordinator = _get_coordinator(hass)
+    if not coordinator:
+        connection.send_error(msg["id"], "not_found", "Coordinator not found")
+        return
+
+    try:
+        result = coordinator.issue_index.query(
+            categories=msg.get("category"),
+            severity=msg.get("severity"),
+            area=msg.get("area"),
+            integration=msg.get("integration"),
+            text=msg.get("text") or None,
+            sort=msg["sort"],
+            descending=msg["descending"],
+            limit=msg["limit"],
+            cursor=msg.get("cursor"),
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_format", str(err))
+        return
+    result["items"] = _serialize_value(result["items"])
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "cardio4ha/get_group_rollups",
+    vol.Optional("group_by"): vol.In(GROUP_BY),
+})
+@callback
+def websocket_get_group_rollups(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Get per-area and per-integration health rollups from the last scan.
+
+    Each grouping is a list of {name, monitored, unavailable, low_battery,
+    weak_signal, flaky, health_score} sorted by name; devices without an
+    area have name null.
+    """
+    coordinator = _get_coordinator(hass)
+    if not coordinator:
+        connection.send_error(msg["id"], "not_found", "Coordinator not found")
+        return
+
+    rollups = (coordinator.data or {}).get("group_rollups", {})
+    group_bys = [msg["group_by"]] if "group_by" in msg else GROUP_BY
+    result = {
+        group_by: [
+            {"name": name, **counts}
+            for name, counts in sorted(
+                rollups.get(group_by, {}).items(),
+                key=lambda item: (item[0] is None, item[0] or ""),
+            )
+        ]
+        for group_by in group_bys
+    }
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "cardio4ha/scan_stats",
+    vol.Optional("limit"): vol.All(int, vol.Range(min=1)),
+})
+@callback
+def websocket_scan_stats(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Get per-phase timings and counters of recent scans.
+
+    scans is oldest first, times in milliseconds; limit returns only the
+    most recent scans.
+    """
+    coordinator = _get_coordinator(hass)
+    if not coordinator:
+        connection.send_error(msg["id"], "not_found", "Coordinator not found")
+        return
+
+    scans = coordinator.scan_stats.as_list()
+    if "limit" in msg:
+        scans = scans[-msg["limit"]:]
+    connection.send_result(msg["id"], {
+        "scans": scans,
+        "summary": coordinator.scan_stats.summary(),
+        "last_save_ms": dict(coordinator.persistence.last_save_ms),
+        "last_purge_ms": coordinator.last_purge_ms,
+        "pending_saves": sorted(coordinator.persistence.pending),
+    })